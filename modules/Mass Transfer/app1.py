@@ -10,6 +10,10 @@ def run():
     # ✅ Add tools folder to sys.path
     tools_folder = os.path.join(os.path.dirname(__file__), "tools")
     sys.path.append(tools_folder)
+    # ✅ Repo root too: tools share helpers as modules.<Suite>.tools.<name>
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    if repo_root not in sys.path:
+        sys.path.insert(0, repo_root)
 
     # === Streamlit Page Config ===
     st.set_page_config(page_title="🧪 MassTransferAI Suite", layout="centered")
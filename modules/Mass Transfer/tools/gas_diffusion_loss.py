@@ -6,7 +6,9 @@ import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 from fpdf import FPDF
-import io
+
+# Shared background report service lives with the Thermodynamics tools
+from modules.Thermodynamics.tools import report_service
 
 # 🌐 GAS DATABASE
 GAS_DATA = {
@@ -17,6 +19,31 @@ GAS_DATA = {
     "Carbon Dioxide (CO2)": 44.01
 }
 
+def build_diffusion_report(payload):
+    """Render the diffusion loss PDF from the report payload; returns bytes."""
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, "Gas Diffusion Loss Report", ln=True, align='C')
+    pdf.ln(10)
+    pdf.multi_cell(0, 10, f"""
+Gas Type: {payload['gas_type']}
+Molar Mass: {payload['molar_mass']} g/mol
+
+Leak Area: {payload['A_cm2']} cm²
+Initial Concentration: {payload['C1']} mol/m³
+Diffusivity: {payload['D_cm2_s']} cm²/s
+Distance of Leak: {payload['length_cm']} cm
+Time Duration: {payload['t_min']} minutes
+
+Moles Lost: {payload['n_loss']:.2f} mol
+Mass Lost: {payload['mass_loss']:.2f} g
+
+Use: Estimating inventory loss from diffusion-based microleaks.
+        """)
+    return report_service.pdf_bytes(pdf)
+
+
 def run():
     st.title("🌬️ Gas Diffusion Loss Estimator")
 
@@ -66,31 +93,14 @@ def run():
     ax.legend()
     st.pyplot(fig)
 
-    # 📄 PDF Report Generator
-    if st.button("📤 Generate PDF Report"):
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
-        pdf.cell(200, 10, "Gas Diffusion Loss Report", ln=True, align='C')
-        pdf.ln(10)
-        pdf.multi_cell(0, 10, f"""
-Gas Type: {gas_type}
-Molar Mass: {molar_mass} g/mol
-
-Leak Area: {A_cm2} cm²
-Initial Concentration: {C1} mol/m³
-Diffusivity: {D_cm2_s} cm²/s
-Distance of Leak: {length_cm} cm
-Time Duration: {t_min} minutes
-
-Moles Lost: {n_loss:.2f} mol
-Mass Lost: {mass_loss:.2f} g
-
-Use: Estimating inventory loss from diffusion-based microleaks.
-        """)
-        pdf_output = io.BytesIO()
-        pdf.output(pdf_output)
-        st.download_button("📥 Download PDF", data=pdf_output.getvalue(), file_name="Gas_Diffusion_Report.pdf")
+    # 📄 PDF Report Generator (background render, cached per input values)
+    report_service.download_report(
+        "📥 Download PDF", "gas_diffusion_loss", build_diffusion_report,
+        {"gas_type": gas_type, "molar_mass": molar_mass, "A_cm2": A_cm2, "C1": C1,
+         "D_cm2_s": D_cm2_s, "length_cm": length_cm, "t_min": t_min,
+         "n_loss": n_loss, "mass_loss": mass_loss},
+        "Gas_Diffusion_Report.pdf"
+    )
 
     # 🧠 Notes & Assumptions
     with st.expander("📘 Engineering Notes"):
@@ -2,33 +2,56 @@
 # 🚨 Detects sensor anomalies using Isolation Forest (unsupervised)
 # 📦 Author: Ved Thakur | BTech ChemEng | IPS Academy Indore
 
+import os
+import numpy as np
 import pandas as pd
+import joblib
 from sklearn.ensemble import IsolationForest
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
 import streamlit as st
 
+from sensor_schema import DEFAULT_SCHEMA
+
 # Create Isolation Forest model globally (can be reused)
 model = IsolationForest(n_estimators=100, contamination=0.05, random_state=42)
 
-def detect_anomalies(df):
+# Persisted scaler + Isolation Forest used for offline scoring (e.g. backfills)
+MODEL_PATH = "ai_model/anomaly_model.pkl"
+SENSOR_COLS = DEFAULT_SCHEMA.names
+
+def detect_anomalies_matrix(X_scaled):
+    """
+    Label rows of an already-scaled float32 matrix (see data_processor.process_matrix).
+
+    Returns:
+        np.ndarray: -1 for anomalies, 1 for normal rows
+    """
+    return model.fit_predict(X_scaled)
+
+
+def detect_anomalies(df, schema=DEFAULT_SCHEMA):
     """
     Detect anomalies in scaled sensor data using Isolation Forest.
 
     Args:
-        df (pd.DataFrame): DataFrame with 'Temp_scaled', 'Press_scaled', 'Flow_scaled'
+        df (pd.DataFrame): DataFrame with the schema's scaled columns
+            (default 'Temp_scaled', 'Press_scaled', 'Flow_scaled')
+        schema (SensorSchema): Which scaled columns to use
 
     Returns:
         pd.DataFrame: Original DataFrame + 'anomaly' and 'status' columns
     """
     try:
         # Ensure required scaled columns exist
-        required = ["Temp_scaled", "Press_scaled", "Flow_scaled"]
+        required = schema.scaled_names
         if not all(col in df.columns for col in required):
             raise ValueError("❌ Required scaled columns not found for anomaly detection.")
 
-        features = df[required]
-        df["anomaly"] = model.fit_predict(features)  # -1 = anomaly, 1 = normal
+        features = df[required].to_numpy(dtype=np.float32)
+        df["anomaly"] = detect_anomalies_matrix(features)  # -1 = anomaly, 1 = normal
 
-        df["status"] = df["anomaly"].apply(lambda x: "⚠️ Fault" if x == -1 else "✅ Normal")
+        df["status"] = np.where(df["anomaly"] == -1, "⚠️ Fault", "✅ Normal")
 
         return df
 
@@ -37,6 +60,58 @@ def detect_anomalies(df):
         return df
 
 
+def fit_persisted_model(df, model_path=MODEL_PATH):
+    """
+    Fit a scaler + Isolation Forest pipeline on raw sensor readings and save it.
+
+    Args:
+        df (pd.DataFrame): Historical data with 'Temperature', 'Pressure', 'FlowRate'
+        model_path (str): Where to persist the fitted pipeline
+
+    Returns:
+        Pipeline: The fitted pipeline
+    """
+    pipeline = Pipeline([
+        ("scaler", StandardScaler()),
+        ("iforest", IsolationForest(n_estimators=100, contamination=0.05, random_state=42))
+    ])
+    pipeline.fit(df[SENSOR_COLS])
+
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    joblib.dump(pipeline, model_path)
+    return pipeline
+
+
+def load_persisted_model(model_path=MODEL_PATH):
+    """
+    Load the persisted anomaly pipeline.
+
+    Returns:
+        Pipeline or None: The fitted pipeline, or None if nothing has been saved yet
+    """
+    if not os.path.exists(model_path):
+        return None
+    return joblib.load(model_path)
+
+
+def score_batch(df, pipeline):
+    """
+    Label raw sensor rows with an already-fitted pipeline (no refitting).
+
+    Args:
+        df (pd.DataFrame): DataFrame with 'Temperature', 'Pressure', 'FlowRate'
+        pipeline (Pipeline): Model returned by fit_persisted_model / load_persisted_model
+
+    Returns:
+        pd.DataFrame: Copy of df with 'anomaly' and 'status' columns
+    """
+    out = df.copy()
+    labels = pipeline.predict(out[SENSOR_COLS])
+    out["anomaly"] = labels
+    out["status"] = np.where(labels == -1, "⚠️ Fault", "✅ Normal")
+    return out
+
+
 def run():
     """
     Streamlit demo runner for anomaly detection module.
@@ -30,7 +30,11 @@ def run():
         "6️⃣ Logger Module": "logger_module",
         "7️⃣ Notification Bot": "notification_bot",
         "8️⃣ Report Generator": "report_generator1",
-        "9️⃣ Stream Simulator": "stream_simulator"
+        "9️⃣ Stream Simulator": "stream_simulator",
+        "🔟 Historical Backfill": "backfill",
+        "1️⃣1️⃣ Window Aggregator": "window_aggregator",
+        "1️⃣2️⃣ Rollup Compactor": "rollup_compactor",
+        "1️⃣3️⃣ Sensor Schema": "sensor_schema"
     }
 
     selected = st.sidebar.radio("🧭 Select Tool", list(modules.keys()))
@@ -0,0 +1,207 @@
+# 📦 Module 10: Historical Backfill | SensorGuardAI Suite
+# ⏪ Re-labels the historical sensor log in parallel time chunks with the persisted model
+# 📦 Author: Ved Thakur | BTech ChemEng | IPS Academy Indore
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import pandas as pd
+from joblib import Parallel, delayed
+import streamlit as st
+
+from anomaly_detector import MODEL_PATH, SENSOR_COLS, fit_persisted_model, load_persisted_model, score_batch
+from logger_module import LOG_FILE
+
+BACKFILL_DIR = "logs/backfill"
+CHECKPOINT_FILE = "_checkpoint.json"
+
+
+def model_fingerprint(model_path=MODEL_PATH):
+    """
+    Hash the persisted model file so a checkpoint is only reused with the same model.
+    """
+    digest = hashlib.md5()
+    with open(model_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def split_into_chunks(df, freq="1D"):
+    """
+    Split the log into event-time chunks keyed by the bucket start.
+
+    Args:
+        df (pd.DataFrame): Sensor log with a 'log_time' column
+        freq (str): Pandas offset alias for the chunk size (e.g. '1h', '1D', '7D')
+
+    Returns:
+        list of (str, pd.DataFrame): Chunk key and rows, in time order
+    """
+    times = pd.to_datetime(df["log_time"], errors="coerce")
+    df = df[times.notna()]
+    buckets = times[times.notna()].dt.floor(freq)
+    return [(key.strftime("%Y%m%dT%H%M%S"), chunk) for key, chunk in df.groupby(buckets, sort=True)]
+
+
+def _load_checkpoint(path, fingerprint, freq):
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    # A different model or chunk size invalidates everything written so far
+    if state.get("model") != fingerprint or state.get("freq") != freq:
+        return set()
+    return set(state.get("done", []))
+
+
+def _save_checkpoint(path, fingerprint, freq, done):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"model": fingerprint, "freq": freq, "done": sorted(done)}, f)
+    os.replace(tmp_path, path)
+
+
+def _clear_chunks(out_dir):
+    """Delete chunk files from an earlier run so they are not mixed into a fresh one."""
+    for name in os.listdir(out_dir):
+        if name.startswith("chunk_") and (name.endswith(".csv") or name.endswith(".csv.tmp")):
+            os.remove(os.path.join(out_dir, name))
+
+
+def _score_and_write(key, chunk, pipeline, out_dir):
+    """Score one chunk and atomically overwrite its output file."""
+    scored = score_batch(chunk, pipeline)
+    out_path = os.path.join(out_dir, f"chunk_{key}.csv")
+    tmp_path = out_path + ".tmp"
+    scored.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, out_path)
+    return key, len(scored)
+
+
+def backfill_history(log_path=LOG_FILE, out_dir=BACKFILL_DIR, freq="1D", n_jobs=4,
+                     model_path=MODEL_PATH, resume=True, progress_callback=None):
+    """
+    Re-label the historical log with the current persisted anomaly model.
+
+    Each time chunk is written to its own file and replaced atomically, so reruns
+    overwrite earlier results instead of duplicating them. Finished chunks are
+    recorded in a checkpoint and skipped when resuming with the same model and
+    chunk size; otherwise the old chunk files are deleted before scoring.
+
+    Args:
+        log_path (str): Historical sensor log (CSV with 'log_time')
+        out_dir (str): Directory for per-chunk results and the checkpoint
+        freq (str): Chunk size as a pandas offset alias
+        n_jobs (int): Parallel workers used to score chunks
+        model_path (str): Persisted model; fitted on the full log if missing
+        resume (bool): Skip chunks already recorded in the checkpoint
+        progress_callback (callable): Called as f(done, total, rows_per_sec)
+
+    Returns:
+        dict: Summary with chunk counts, rows scored, elapsed time and throughput
+    """
+    df = pd.read_csv(log_path)
+    missing = set(SENSOR_COLS + ["log_time"]) - set(df.columns)
+    if missing:
+        raise ValueError(f"❌ Log is missing columns: {sorted(missing)}")
+
+    pipeline = load_persisted_model(model_path)
+    if pipeline is None:
+        pipeline = fit_persisted_model(df, model_path)
+    fingerprint = model_fingerprint(model_path)
+
+    os.makedirs(out_dir, exist_ok=True)
+    checkpoint_path = os.path.join(out_dir, CHECKPOINT_FILE)
+    done = _load_checkpoint(checkpoint_path, fingerprint, freq) if resume else set()
+    if not done:
+        # No valid checkpoint (new model, new chunk size or no resume): start from an empty
+        # output directory, otherwise chunks keyed by the old settings would be read back too
+        _clear_chunks(out_dir)
+        _save_checkpoint(checkpoint_path, fingerprint, freq, done)
+
+    chunks = split_into_chunks(df, freq)
+    pending = [(key, chunk) for key, chunk in chunks if key not in done]
+    total = len(chunks)
+
+    start = time.perf_counter()
+    rows_scored = 0
+    # Threads avoid pickling the model per task; tree scoring releases the GIL
+    results = Parallel(n_jobs=n_jobs, prefer="threads", return_as="generator_unordered")(
+        delayed(_score_and_write)(key, chunk, pipeline, out_dir) for key, chunk in pending
+    )
+    for key, n_rows in results:
+        done.add(key)
+        rows_scored += n_rows
+        _save_checkpoint(checkpoint_path, fingerprint, freq, done)
+        if progress_callback:
+            elapsed = time.perf_counter() - start
+            progress_callback(len(done), total, rows_scored / elapsed if elapsed > 0 else 0.0)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "chunks_total": total,
+        "chunks_skipped": total - len(pending),
+        "chunks_scored": len(pending),
+        "rows_scored": rows_scored,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_sec": round(rows_scored / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+def load_backfill_results(out_dir=BACKFILL_DIR):
+    """
+    Concatenate all chunk files from a backfill into one DataFrame.
+    """
+    files = sorted(f for f in os.listdir(out_dir) if f.startswith("chunk_") and f.endswith(".csv"))
+    if not files:
+        return pd.DataFrame()
+    return pd.concat([pd.read_csv(os.path.join(out_dir, f)) for f in files], ignore_index=True)
+
+
+def run():
+    """
+    Streamlit runner for the historical backfill.
+    """
+    st.header("⏪ Historical Backfill")
+    st.markdown("Re-label the sensor log with the current persisted anomaly model, in parallel time chunks.")
+
+    log_path = st.text_input("📁 Sensor log path", value=LOG_FILE)
+    freq = st.selectbox("🧩 Chunk size", ["1h", "6h", "1D", "7D"], index=2)
+    n_jobs = st.slider("⚙️ Parallel workers", 1, 16, 4)
+    resume = st.checkbox("♻️ Resume from checkpoint", value=True)
+
+    if st.button("▶️ Start Backfill"):
+        progress = st.progress(0.0)
+        status = st.empty()
+
+        def on_progress(done, total, rate):
+            progress.progress(done / total if total else 1.0)
+            status.text(f"Chunks {done}/{total} | {rate:,.0f} rows/s")
+
+        try:
+            summary = backfill_history(log_path, freq=freq, n_jobs=n_jobs, resume=resume,
+                                       progress_callback=on_progress)
+            progress.progress(1.0)
+            st.success(f"✅ Backfill complete: {summary['rows_scored']} rows in {summary['chunks_scored']} chunk(s)")
+            st.json(summary)
+        except Exception as e:
+            st.error(f"❌ Backfill Error: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-label the historical sensor log with the persisted model.")
+    parser.add_argument("--log", default=LOG_FILE, help="Historical sensor log CSV")
+    parser.add_argument("--out", default=BACKFILL_DIR, help="Output directory for chunk results")
+    parser.add_argument("--freq", default="1D", help="Chunk size as a pandas offset alias")
+    parser.add_argument("--jobs", type=int, default=4, help="Parallel workers")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore the checkpoint and rescore everything")
+    args = parser.parse_args()
+
+    def print_progress(done, total, rate):
+        print(f"[{done}/{total}] {rate:,.0f} rows/s")
+
+    print(backfill_history(args.log, args.out, args.freq, args.jobs,
+                           resume=not args.no_resume, progress_callback=print_progress))
@@ -37,6 +37,53 @@ def show_dashboard(df):
         st.success("✅ No faults detected in recent data.")
 
 
+def show_window_stats(stats_df):
+    """
+    Displays windowed statistics produced by window_aggregator.WindowAggregator.
+
+    Args:
+        stats_df (pd.DataFrame): Long-format rows with window_start, channel, min, mean, max, std
+    """
+    st.subheader("🪟 Windowed Sensor Statistics")
+    if stats_df.empty:
+        st.info("ℹ️ No closed windows yet.")
+        return
+
+    st.dataframe(stats_df.tail(10), use_container_width=True)
+    _plot_channel_bands(stats_df, "window_start", "Window Start", "per Window")
+
+
+def show_rollup_trend(trend_df):
+    """
+    Displays a long-range trend read from the rollup tiers (see rollup_compactor).
+
+    Args:
+        trend_df (pd.DataFrame): Rows with bucket, channel, count, min, mean, max, std
+    """
+    st.subheader("🗜️ Long-Range Sensor Trend")
+    if trend_df.empty:
+        st.info("ℹ️ No rollup data in the selected range.")
+        return
+
+    st.caption(f"{len(trend_df)} rollup rows from {trend_df['count'].sum():,} raw readings")
+    _plot_channel_bands(trend_df, "bucket", "Time", "Trend")
+
+
+def _plot_channel_bands(df, time_col, xlabel, title_suffix):
+    """Mean line with a min–max band, one chart per channel."""
+    for channel, group in df.groupby("channel", sort=False):
+        fig, ax = plt.subplots()
+        ax.plot(group[time_col], group["mean"], color='teal', label="Mean")
+        ax.fill_between(group[time_col], group["min"], group["max"], color='teal', alpha=0.2, label="Min–Max")
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(channel)
+        ax.set_title(f"{channel} {title_suffix}")
+        ax.legend()
+        ax.grid(True)
+        fig.autofmt_xdate()
+        st.pyplot(fig)
+
+
 def run():
     """
     Streamlit demo runner for the dashboard module using sample labeled data.
@@ -60,3 +107,9 @@ def run():
 
     if st.button("📊 Show Sample Dashboard"):
         show_dashboard(sample_df)
+
+    # Windows closed by the live aggregator as the logger appends rows
+    from logger_module import read_window_stats, WINDOW_LOG_FILE
+
+    if st.checkbox(f"🪟 Show live window statistics from `{WINDOW_LOG_FILE}`"):
+        show_window_stats(read_window_stats())
@@ -3,38 +3,47 @@
 # 📦 Author: Ved Thakur | BTech ChemEng | IPS Academy Indore
 
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
 import streamlit as st
 
-# Create a global StandardScaler instance
-scaler = StandardScaler()
+from sensor_schema import DEFAULT_SCHEMA
 
-def process_batch(data_batch):
+def process_matrix(data_batch, schema=DEFAULT_SCHEMA):
+    """
+    Scale a batch straight to float32 matrices, with no per-batch DataFrame assembly.
+
+    Args:
+        data_batch (pd.DataFrame, list of dict or np.ndarray): Sensor rows
+        schema (SensorSchema): Tags, dtypes and scaling policies
+
+    Returns:
+        tuple: (raw, scaled) float32 matrices of shape (n_rows, n_tags)
+    """
+    raw = schema.to_matrix(data_batch)
+    return raw, schema.fit_transform(raw)
+
+
+def process_batch(data_batch, schema=DEFAULT_SCHEMA):
     """
     Process a list of sensor data dicts into a scaled DataFrame.
 
     Args:
-        data_batch (list of dict): List of sensor data rows.
+        data_batch (list of dict or pd.DataFrame): List of sensor data rows.
+        schema (SensorSchema): Tags to scale (default: Temperature, Pressure, FlowRate)
 
     Returns:
         pd.DataFrame: Original + scaled features + ready for ML
     """
     try:
         # Convert to DataFrame
-        df = pd.DataFrame(data_batch)
-
-        # Validate required columns
-        required = ["Temperature", "Pressure", "FlowRate"]
-        if not all(col in df.columns for col in required):
-            raise ValueError("Missing required columns in input data.")
+        df = data_batch if isinstance(data_batch, pd.DataFrame) else pd.DataFrame(data_batch)
 
-        # Scale data
-        scaled = scaler.fit_transform(df[required])
-        df_scaled = pd.DataFrame(scaled, columns=["Temp_scaled", "Press_scaled", "Flow_scaled"])
+        # Scale data (raises if any schema tag is missing)
+        _, scaled = process_matrix(df, schema)
 
-        # Merge and return
-        final_df = pd.concat([df.reset_index(drop=True), df_scaled], axis=1)
-        return final_df
+        # Build the output once: original columns followed by the scaled block
+        columns = {col: df[col].to_numpy() for col in df.columns}
+        columns.update(zip(schema.scaled_names, scaled.T))
+        return pd.DataFrame(columns)
 
     except Exception as e:
         st.error(f"❌ Data Processor Error: {e}")
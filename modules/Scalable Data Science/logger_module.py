@@ -8,17 +8,22 @@ import streamlit as st
 from datetime import datetime
 
 LOG_FILE = "logs/sensor_log.csv"
+WINDOW_LOG_FILE = "logs/sensor_windows.csv"
 
-def log_data(df, log_path=LOG_FILE):
+def log_data(df, log_path=LOG_FILE, window_log_path=WINDOW_LOG_FILE):
     """
     Appends sensor data (with anomaly status) to a persistent CSV log file.
 
+    The rows also update the rollup tiers and the live window aggregator;
+    windows it closes are appended to the window log.
+
     Args:
         df (pd.DataFrame): Final processed DataFrame with status column.
         log_path (str): Path to save the log file (default: logs/sensor_log.csv)
+        window_log_path (str): Closed-window log (default: logs/sensor_windows.csv)
 
     Returns:
-        bool: True if saved successfully.
+        bool: True if the raw rows were saved (even if the rollup update failed).
     """
     try:
         os.makedirs(os.path.dirname(log_path), exist_ok=True)
@@ -32,14 +37,69 @@ def log_data(df, log_path=LOG_FILE):
         else:
             df.to_csv(log_path, mode='w', header=True, index=False)
 
-        st.success(f"📁 Logged {len(df)} rows to `{log_path}`")
+    except Exception as e:
+        st.error(f"❌ Logging Error: {e}")
+        return False
+
+    # Keep the 1-minute / 1-hour / 1-day rollup tiers in step with the raw log.
+    # The raw rows are already written, so a rollup failure must not report the
+    # append as failed (callers would retry and log the rows twice);
+    # rollup_compactor.rebuild_rollups() can regenerate the tiers later.
+    try:
+        from rollup_compactor import update_rollups
+        update_rollups(df, log_path)
+    except Exception as e:
+        st.warning(f"⚠️ Rows logged, but the rollup update failed: {e}")
+
+    # Windowed stats are computed incrementally as rows arrive, not from the raw history
+    try:
+        from window_aggregator import live_aggregator
+        log_window_stats(live_aggregator(log_path).add_batch(df), window_log_path)
+    except Exception as e:
+        st.warning(f"⚠️ Rows logged, but the window statistics update failed: {e}")
+
+    st.success(f"📁 Logged {len(df)} rows to `{log_path}`")
+    return True
+
+
+def log_window_stats(stats_df, log_path=WINDOW_LOG_FILE):
+    """
+    Appends closed-window statistics (from window_aggregator) to a CSV log.
+
+    Args:
+        stats_df (pd.DataFrame): Long-format window statistics
+        log_path (str): Path to the window log (default: logs/sensor_windows.csv)
+
+    Returns:
+        bool: True if saved successfully.
+    """
+    try:
+        if stats_df.empty:
+            return True
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        write_header = not os.path.exists(log_path)
+        stats_df.to_csv(log_path, mode='a' if not write_header else 'w', header=write_header, index=False)
         return True
 
     except Exception as e:
-        st.error(f"❌ Logging Error: {e}")
+        st.error(f"❌ Window Logging Error: {e}")
         return False
 
 
+def read_window_stats(log_path=WINDOW_LOG_FILE):
+    """
+    Closed-window statistics written by log_data / log_window_stats.
+
+    Returns:
+        pd.DataFrame: Window rows, empty if nothing has been logged yet
+    """
+    from window_aggregator import STAT_COLS
+
+    if not os.path.exists(log_path):
+        return pd.DataFrame(columns=STAT_COLS)
+    return pd.read_csv(log_path, parse_dates=["window_start", "window_end"])
+
+
 def run():
     """
     Streamlit demo runner for Logger module.
@@ -0,0 +1,173 @@
+# 📦 Module 12: Rollup Compactor | SensorGuardAI Suite
+# 🗜️ Maintains 1-minute / 1-hour / 1-day rollup tiers next to the raw sensor log
+# 📦 Author: Ved Thakur | BTech ChemEng | IPS Academy Indore
+
+import os
+import pandas as pd
+import streamlit as st
+
+from logger_module import LOG_FILE
+from sensor_schema import DEFAULT_SCHEMA
+
+SENSOR_COLS = DEFAULT_SCHEMA.names
+# Finest to coarsest; each tier stores count, min, max, mean, M2 per bucket and channel
+TIERS = ["1min", "1h", "1D"]
+ROLLUP_COLS = ["bucket", "channel", "count", "min", "max", "mean", "m2"]
+
+
+def tier_path(tier, log_path=LOG_FILE):
+    """Rollup tables live next to the raw log, e.g. logs/sensor_log_rollup_1h.csv."""
+    return f"{os.path.splitext(log_path)[0]}_rollup_{tier}.csv"
+
+
+def merge_partials(df, keys):
+    """
+    Combine partial aggregates that share the same keys (Chan et al. merge).
+
+    Args:
+        df (pd.DataFrame): Rows with count, min, max, mean, m2
+        keys (list): Grouping columns, e.g. ['bucket', 'channel']
+
+    Returns:
+        pd.DataFrame: One row per key combination
+    """
+    work = df.assign(_sum=df["count"] * df["mean"])
+    g = work.groupby(keys, sort=True)
+    out = g.agg(count=("count", "sum"), min=("min", "min"), max=("max", "max"),
+                _sum=("_sum", "sum"), m2=("m2", "sum"))
+    out["mean"] = out["_sum"] / out["count"]
+    # Between-group term: sum(n_i * (mean_i - mean)^2)
+    grand = out["mean"].reindex(pd.MultiIndex.from_frame(work[keys])).to_numpy()
+    work["_between"] = work["count"] * (work["mean"].to_numpy() - grand) ** 2
+    out["m2"] += work.groupby(keys, sort=True)["_between"].sum()
+    return out.drop(columns="_sum").reset_index()[keys + ["count", "min", "max", "mean", "m2"]]
+
+
+def summarize(df, tier, time_col="log_time", channels=SENSOR_COLS):
+    """
+    Aggregate raw rows into one tier's buckets.
+
+    Returns:
+        pd.DataFrame: Rollup rows (bucket, channel, count, min, max, mean, m2)
+    """
+    buckets = pd.to_datetime(df[time_col]).dt.floor(tier)
+    long = df[channels].assign(bucket=buckets).melt(id_vars="bucket", var_name="channel", value_name="value")
+    g = long.groupby(["bucket", "channel"], sort=True)["value"]
+    out = g.agg(["count", "min", "max", "mean", "var"])
+    out["m2"] = out.pop("var").fillna(0.0) * (out["count"] - 1)
+    return out.reset_index()[ROLLUP_COLS]
+
+
+def update_rollups(df, log_path=LOG_FILE, time_col="log_time"):
+    """
+    Append partial aggregates for newly logged rows to every tier.
+
+    Only the new rows are read, so the cost is proportional to the append.
+    Buckets touched by several appends hold several partial rows until
+    compact_rollups() merges them; queries merge partials on read.
+    """
+    for tier in TIERS:
+        path = tier_path(tier, log_path)
+        part = summarize(df, tier, time_col)
+        part.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+
+def compact_rollups(log_path=LOG_FILE):
+    """
+    Merge duplicate partial rows in every tier and rewrite the tables atomically.
+
+    Returns:
+        dict: Rows per tier before and after compaction
+    """
+    report = {}
+    for tier in TIERS:
+        path = tier_path(tier, log_path)
+        if not os.path.exists(path):
+            continue
+        table = pd.read_csv(path, parse_dates=["bucket"])
+        merged = merge_partials(table, ["bucket", "channel"])
+        tmp_path = path + ".tmp"
+        merged.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        report[tier] = (len(table), len(merged))
+    return report
+
+
+def rebuild_rollups(log_path=LOG_FILE, chunksize=500000):
+    """
+    Recreate all tiers from the raw log in chunks (first run or after corruption).
+    """
+    for tier in TIERS:
+        path = tier_path(tier, log_path)
+        if os.path.exists(path):
+            os.remove(path)
+    for chunk in pd.read_csv(log_path, chunksize=chunksize):
+        update_rollups(chunk, log_path)
+    return compact_rollups(log_path)
+
+
+def pick_tier(resolution):
+    """
+    Coarsest stored tier that is still at least as fine as the requested resolution.
+    """
+    wanted = pd.Timedelta(resolution)
+    usable = [t for t in TIERS if pd.Timedelta(t) <= wanted]
+    if not usable:
+        raise ValueError(f"❌ No rollup tier is fine enough for {resolution}; finest is {TIERS[0]}")
+    return usable[-1]
+
+
+def query_rollup(resolution="1h", start=None, end=None, channels=SENSOR_COLS, log_path=LOG_FILE):
+    """
+    Trend statistics at the requested resolution, read from the coarsest usable tier.
+
+    Returns:
+        pd.DataFrame: bucket, channel, count, min, max, mean, std
+    """
+    tier = pick_tier(resolution)
+    table = pd.read_csv(tier_path(tier, log_path), parse_dates=["bucket"])
+    mask = table["channel"].isin(channels)
+    if start is not None:
+        mask &= table["bucket"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= table["bucket"] < pd.Timestamp(end)
+    table = table[mask]
+    # Re-bucket to the requested resolution and fold uncompacted partials together
+    table = table.assign(bucket=table["bucket"].dt.floor(resolution))
+    out = merge_partials(table, ["bucket", "channel"])
+    out["std"] = (out["m2"] / (out["count"] - 1)).where(out["count"] > 1) ** 0.5
+    return out.drop(columns="m2")
+
+
+def run():
+    """
+    Streamlit runner: build / compact rollups and view a long-range trend.
+    """
+    from dashboard_view import show_rollup_trend
+
+    st.header("🗜️ Rollup Compactor")
+    st.markdown("Maintains 1-minute, 1-hour and 1-day rollups of the sensor log for fast long-range trends.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🔁 Rebuild Rollups from Raw Log"):
+            try:
+                st.json(rebuild_rollups())
+            except Exception as e:
+                st.error(f"❌ Rollup Error: {e}")
+    with col2:
+        if st.button("🗜️ Compact Rollups"):
+            try:
+                st.json(compact_rollups())
+            except Exception as e:
+                st.error(f"❌ Compaction Error: {e}")
+
+    resolution = st.selectbox("📏 Trend resolution", ["1min", "15min", "1h", "6h", "1D", "7D"], index=2)
+    if st.button("📈 Show Trend"):
+        try:
+            st.caption(f"Reading tier: `{pick_tier(resolution)}`")
+            show_rollup_trend(query_rollup(resolution))
+        except FileNotFoundError:
+            st.warning("⚠️ No rollups yet. Rebuild them from the raw log first.")
+        except Exception as e:
+            st.error(f"❌ Query Error: {e}")
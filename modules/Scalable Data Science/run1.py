@@ -7,6 +7,109 @@ import pandas as pd
 import numpy as np
 import time
 
+# === Streaming Helpers ===
+class RingBuffer:
+    """
+    Fixed-size NumPy ring buffer: O(1) append, constant memory.
+    """
+
+    def __init__(self, capacity, dtype=np.float64):
+        self.capacity = capacity
+        self._data = np.empty(capacity, dtype=dtype)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value):
+        end = (self._start + self._size) % self.capacity
+        self._data[end] = value
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def values(self):
+        """Return the buffered values in arrival order (oldest first)."""
+        idx = (self._start + np.arange(self._size)) % self.capacity
+        return self._data[idx]
+
+
+class StreamingStats:
+    """
+    Running describe() over DataFrame chunks (Chan et al. parallel mean/variance merge).
+    Quartiles come from a fixed-size uniform reservoir sample, so they are approximate.
+    """
+
+    def __init__(self, columns, reservoir_size=10000, seed=42):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = 0
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        self._rng = np.random.default_rng(seed)
+        self._reservoir = np.empty((reservoir_size, k))
+        self._filled = 0
+
+    def update(self, chunk):
+        x = chunk[self.columns].to_numpy(dtype=np.float64)
+        n_b = len(x)
+        if n_b == 0:
+            return
+        mean_b = x.mean(axis=0)
+        m2_b = ((x - mean_b) ** 2).sum(axis=0)
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (n_b / n)
+        self.m2 = self.m2 + m2_b + delta ** 2 * (n_a * n_b / n)
+        self.count = n
+        self.min = np.minimum(self.min, x.min(axis=0))
+        self.max = np.maximum(self.max, x.max(axis=0))
+        self._sample(x, n_a)
+
+    def _sample(self, x, seen_before):
+        cap = len(self._reservoir)
+        take = min(cap - self._filled, len(x))
+        if take > 0:
+            self._reservoir[self._filled:self._filled + take] = x[:take]
+            self._filled += take
+        rest = x[take:]
+        if len(rest):
+            # Algorithm R, vectorized: row i replaces a slot with probability cap / (i + 1)
+            positions = seen_before + take + np.arange(len(rest))
+            slots = (self._rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+            keep = slots < cap
+            self._reservoir[slots[keep]] = rest[keep]
+
+    def describe(self):
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.full(len(self.columns), np.nan)
+        q = np.percentile(self._reservoir[:self._filled], [25, 50, 75], axis=0)
+        return pd.DataFrame(
+            [np.full(len(self.columns), self.count), self.mean, std, self.min, q[0], q[1], q[2], self.max],
+            index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+            columns=self.columns
+        )
+
+
+def generate_chunks(num_rows, chunk_size=100000, start="2025-01-01", seed=None):
+    """
+    Lazily yield the synthetic sensor dataset in chunks instead of materializing it.
+    """
+    rng = np.random.default_rng(seed)
+    t0 = pd.Timestamp(start)
+    for offset in range(0, num_rows, chunk_size):
+        n = min(chunk_size, num_rows - offset)
+        yield pd.DataFrame({
+            'timestamp': pd.date_range(start=t0 + pd.Timedelta(seconds=offset), periods=n, freq='s'),
+            'sensor_A': rng.standard_normal(n),
+            'sensor_B': rng.standard_normal(n) * 2 + 5
+        })
+
+
 def run():
     # === Page Config ===
     st.set_page_config(page_title="⚙️ Scalable Data Science App", layout="wide")
@@ -34,41 +137,49 @@ def run():
 
     if st.button("Generate Dataset"):
         st.info("Generating dataset...")
-        df = pd.DataFrame({
-            'timestamp': pd.date_range(start='2025-01-01', periods=num_rows, freq='S'),
-            'sensor_A': np.random.randn(num_rows),
-            'sensor_B': np.random.randn(num_rows) * 2 + 5
-        })
+        stats = StreamingStats(['sensor_A', 'sensor_B'])
+        first_chunk = None
+        for chunk in generate_chunks(num_rows):
+            if first_chunk is None:
+                first_chunk = chunk.head(1000)
+            stats.update(chunk)
         st.success(f"✅ Generated {num_rows} rows!")
-        st.write(df.head())
+        st.write(first_chunk.head())
 
         # Show summary
         st.subheader("📊 Summary Statistics")
-        st.write(df.describe())
+        st.write(stats.describe())
+        st.caption("Quartiles are estimated from a 10,000-row reservoir sample.")
 
         # Live line chart (first 1000 points)
         st.subheader("📈 Real-Time Simulation (Sensor A)")
-        st.line_chart(df['sensor_A'].head(1000))
+        st.line_chart(first_chunk['sensor_A'])
 
     # === Stream Simulation (Rolling Stats) ===
     st.header("📡 Simulated Streaming with Rolling Stats")
 
     stream_len = st.slider("Streaming Window Size", 10, 500, 100)
+    window = 50
 
     if st.button("Start Simulated Stream"):
         st.info("Simulating real-time data stream...")
         placeholder = st.empty()
 
-        data = []
+        buffer = RingBuffer(window)
+        chart = None
+        rows_on_chart = 0
 
         for i in range(stream_len):
             new_val = np.random.randn()
-            data.append(new_val)
-            if len(data) > 50:
-                data.pop(0)
-
-            df_stream = pd.DataFrame(data, columns=['Sensor A'])
-            placeholder.line_chart(df_stream)
+            buffer.append(new_val)
+
+            if chart is None or rows_on_chart >= 2 * window:
+                # Re-seed from the ring buffer so the chart never holds more than 2x the window
+                chart = placeholder.line_chart(pd.DataFrame({'Sensor A': buffer.values()}))
+                rows_on_chart = len(buffer)
+            else:
+                chart.add_rows(pd.DataFrame({'Sensor A': [new_val]}))
+                rows_on_chart += 1
             time.sleep(0.05)
 
         st.success("✅ Stream Complete")
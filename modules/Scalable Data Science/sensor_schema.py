@@ -0,0 +1,164 @@
+# 📦 Module 13: Sensor Schema | SensorGuardAI Suite
+# 🏷️ Declarative tag list (name, dtype, unit, scaling) driving a float32 matrix pipeline
+# 📦 Author: Ved Thakur | BTech ChemEng | IPS Academy Indore
+
+import json
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+SCALING_POLICIES = ("standard", "minmax", "none")
+
+
+@dataclass(frozen=True)
+class SensorTag:
+    """
+    One sensor channel.
+
+    Args:
+        name (str): Column name in the incoming data
+        dtype (str): Declared source dtype; the scaling matrix itself is always float32
+        unit (str): Engineering unit, for display only
+        scaling (str): 'standard', 'minmax' or 'none'
+        scaled_name (str): Output column name (defaults to '<name>_scaled')
+    """
+    name: str
+    dtype: str = "float32"
+    unit: str = ""
+    scaling: str = "standard"
+    scaled_name: str = None
+
+    def __post_init__(self):
+        if self.scaling not in SCALING_POLICIES:
+            raise ValueError(f"❌ Unknown scaling policy '{self.scaling}' for tag {self.name}")
+        if self.scaled_name is None:
+            object.__setattr__(self, "scaled_name", f"{self.name}_scaled")
+
+
+class SensorSchema:
+    """
+    Ordered set of tags, compiled once into per-column index and policy arrays.
+    """
+
+    def __init__(self, tags):
+        self.tags = list(tags)
+        if len({t.name for t in self.tags}) != len(self.tags):
+            raise ValueError("❌ Duplicate tag names in sensor schema.")
+        self.names = [t.name for t in self.tags]
+        self.scaled_names = [t.scaled_name for t in self.tags]
+        policies = np.array([t.scaling for t in self.tags])
+        self._standard = policies == "standard"
+        self._minmax = policies == "minmax"
+
+    def __len__(self):
+        return len(self.tags)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from a list of dicts, e.g. parsed from JSON."""
+        return cls(SensorTag(**r) for r in records)
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_records(json.load(f))
+
+    @classmethod
+    def from_columns(cls, columns, scaling="standard"):
+        """Every listed column becomes a float32 tag with the same scaling policy."""
+        return cls(SensorTag(name=c, scaling=scaling) for c in columns)
+
+    def to_matrix(self, data):
+        """
+        Extract the tag columns as one contiguous float32 (n_rows, n_tags) matrix.
+
+        Args:
+            data (pd.DataFrame, list of dict or np.ndarray): Incoming batch
+
+        Returns:
+            np.ndarray: float32 matrix in schema order
+        """
+        if isinstance(data, np.ndarray):
+            if data.ndim != 2 or data.shape[1] != len(self):
+                raise ValueError(f"❌ Expected a (n, {len(self)}) matrix, got {data.shape}.")
+            return np.ascontiguousarray(data, dtype=np.float32)
+        if not isinstance(data, pd.DataFrame):
+            records = list(data)
+            data = pd.DataFrame.from_records(records, columns=self.names)
+            # A tag absent from any record silently becomes NaN; reject it like a missing column.
+            # Records are only scanned when the frame has NaN (absent key or an explicit NaN value)
+            if data.isna().to_numpy().any():
+                need = set(self.names)
+                if any(not r.keys() >= need for r in records):
+                    missing = [n for n in self.names if any(n not in r for r in records)]
+                    raise ValueError(f"Missing required tags in input records: {missing[:5]}")
+        missing = [n for n in self.names if n not in data.columns]
+        if missing:
+            raise ValueError(f"Missing required columns in input data: {missing[:5]}")
+        return data[self.names].to_numpy(dtype=np.float32)
+
+    def fit_affine(self, X):
+        """
+        Per-column scale and offset so that scaled = X * scale + offset.
+
+        Standard: (x - mean) / std. Min-max: (x - min) / (max - min). None: identity.
+        Zero-variance columns keep scale 1 (as StandardScaler does).
+        """
+        scale = np.ones(X.shape[1], dtype=np.float32)
+        offset = np.zeros(X.shape[1], dtype=np.float32)
+        if self._standard.any():
+            # Boolean-mask indexing copies; skip it in the common all-standard case
+            cols = X if self._standard.all() else X[:, self._standard]
+            mean = cols.mean(axis=0, dtype=np.float64)
+            std = cols.std(axis=0, dtype=np.float64)
+            std[std == 0] = 1.0
+            scale[self._standard] = 1.0 / std
+            offset[self._standard] = -mean / std
+        if self._minmax.any():
+            cols = X if self._minmax.all() else X[:, self._minmax]
+            lo = cols.min(axis=0).astype(np.float64)
+            span = cols.max(axis=0).astype(np.float64) - lo
+            span[span == 0] = 1.0
+            scale[self._minmax] = 1.0 / span
+            offset[self._minmax] = -lo / span
+        return scale, offset
+
+    def fit_transform(self, X):
+        """Fit the affine scaling on this batch and apply it in one fused pass."""
+        scale, offset = self.fit_affine(X)
+        out = X * scale
+        out += offset
+        return out
+
+
+# Legacy three-tag skid; keeps the original *_scaled column names
+DEFAULT_SCHEMA = SensorSchema([
+    SensorTag("Temperature", unit="°C", scaled_name="Temp_scaled"),
+    SensorTag("Pressure", unit="bar", scaled_name="Press_scaled"),
+    SensorTag("FlowRate", unit="m³/h", scaled_name="Flow_scaled"),
+])
+
+
+def run():
+    """
+    Streamlit demo: build a wide synthetic schema and time the matrix pipeline.
+    """
+    import time
+
+    st.header("🏷️ Sensor Schema Demo")
+    st.markdown("Declarative tag list driving a vectorized float32 scaling pipeline.")
+
+    n_tags = st.slider("Number of tags", 3, 500, 200)
+    n_rows = st.slider("Rows per batch", 100, 100000, 10000, step=100)
+
+    if st.button("⚙️ Build & Process Batch"):
+        schema = SensorSchema.from_columns([f"TAG_{i:03d}" for i in range(n_tags)])
+        X = np.random.default_rng(0).normal(size=(n_rows, n_tags)).astype(np.float32)
+        start = time.perf_counter()
+        scaled = schema.fit_transform(X)
+        elapsed = time.perf_counter() - start
+        st.success(f"✅ Scaled {n_rows:,} × {n_tags} in {elapsed * 1000:.1f} ms "
+                   f"({n_rows / max(elapsed, 1e-9):,.0f} rows/s, {scaled.nbytes / 1e6:.1f} MB)")
+        st.dataframe(pd.DataFrame({"Tag": schema.names[:10], "Unit": [t.unit for t in schema.tags[:10]],
+                                   "Scaling": [t.scaling for t in schema.tags[:10]]}))
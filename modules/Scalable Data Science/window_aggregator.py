@@ -0,0 +1,302 @@
+# 📦 Module 11: Window Aggregator | SensorGuardAI Suite
+# 🪟 Tumbling, sliding and session windows over event time with watermarks
+# 📦 Author: Ved Thakur | BTech ChemEng | IPS Academy Indore
+
+import math
+import heapq
+import bisect
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sensor_schema import DEFAULT_SCHEMA
+
+SENSOR_COLS = DEFAULT_SCHEMA.names
+STAT_COLS = ["window_start", "window_end", "channel", "count", "min", "mean", "max", "std"]
+STAT_DTYPES = {"window_start": "datetime64[ns]", "window_end": "datetime64[ns]", "channel": object,
+               "count": "int64", "min": "float64", "mean": "float64", "max": "float64", "std": "float64"}
+
+
+def _to_frame(rows):
+    """Build a stats DataFrame with stable dtypes, even when no window closed."""
+    return pd.DataFrame(rows, columns=STAT_COLS).astype(STAT_DTYPES)
+
+
+class _RunningAgg:
+    """
+    Count / min / max / mean / M2 per channel, updated in O(1) per event (Welford).
+    """
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self, n_channels):
+        self.count = 0
+        self.mean = np.zeros(n_channels)
+        self.m2 = np.zeros(n_channels)
+        self.min = np.full(n_channels, np.inf)
+        self.max = np.full(n_channels, -np.inf)
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        np.minimum(self.min, x, out=self.min)
+        np.maximum(self.max, x, out=self.max)
+
+    def merge(self, other):
+        """Combine two partial aggregates (used when session windows merge)."""
+        n = self.count + other.count
+        if other.count == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / n)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / n)
+        self.count = n
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.full(len(self.mean), np.nan)
+
+
+class WindowAggregator:
+    """
+    Incremental windowed min/mean/max/std per channel over event time.
+
+    Args:
+        channels (list): Sensor columns to aggregate
+        kind (str): 'tumbling', 'sliding' or 'session'
+        size (str): Window length, e.g. '1min' or '1h' (tumbling/sliding)
+        slide (str): Slide interval for sliding windows (defaults to size)
+        gap (str): Inactivity gap that closes a session window
+        allowed_lateness (str): How far the watermark trails the latest event time
+
+    Windows are emitted once the watermark (max event time - allowed lateness)
+    passes their end. Events older than the watermark whose window has already
+    been emitted are counted in `late_events` and dropped.
+
+    Tumbling and sliding windows are built from panes of gcd(size, slide):
+    each event updates exactly one pane, and a window merges its panes once,
+    when it is emitted. Open pane starts sit in a heap, so emission only looks
+    at panes that are due. Session windows are disjoint and kept sorted by
+    start, so an event finds the (at most two) sessions it joins by bisection
+    and emission pops closed sessions from the front.
+    """
+
+    def __init__(self, channels=SENSOR_COLS, kind="tumbling", size="1min", slide=None,
+                 gap="5min", allowed_lateness="0s"):
+        if kind not in ("tumbling", "sliding", "session"):
+            raise ValueError(f"❌ Unknown window kind: {kind}")
+        self.channels = list(channels)
+        self.kind = kind
+        self.size = pd.Timedelta(size).value
+        self.slide = pd.Timedelta(slide).value if (kind == "sliding" and slide) else self.size
+        self.gap = pd.Timedelta(gap).value
+        self.lateness = pd.Timedelta(allowed_lateness).value
+        self.watermark = None
+        self.late_events = 0
+        self._max_time = None
+        # Tumbling / sliding: {pane start: _RunningAgg}, a heap of pane starts and
+        # the start of the next window to emit (every earlier window is done)
+        self.pane = math.gcd(self.size, self.slide)
+        self._panes = {}
+        self._pane_heap = []
+        self._next_start = None
+        # Session: parallel lists sorted by start; _sessions holds [start, end, _RunningAgg]
+        self._session_starts = []
+        self._sessions = []
+
+    # --- Window assignment ---
+    def _add_to_pane(self, t, x):
+        p = t - t % self.pane
+        agg = self._panes.get(p)
+        if agg is None:
+            agg = self._panes[p] = _RunningAgg(len(self.channels))
+            heapq.heappush(self._pane_heap, p)
+        agg.add(x)
+
+    def _add_to_session(self, t, x):
+        agg = _RunningAgg(len(self.channels))
+        agg.add(x)
+        start, end = t, t
+        # Sessions are more than `gap` apart, so only the neighbours on either
+        # side of t can absorb it (and it may bridge the two)
+        i = bisect.bisect_right(self._session_starts, t)
+        lo = i - 1 if i > 0 and self._sessions[i - 1][1] + self.gap >= t else i
+        hi = i + 1 if i < len(self._sessions) and self._sessions[i][0] - self.gap <= t else i
+        for other_start, other_end, other in self._sessions[lo:hi]:
+            other.merge(agg)
+            agg = other
+            start, end = min(start, other_start), max(end, other_end)
+        self._sessions[lo:hi] = [[start, end, agg]]
+        self._session_starts[lo:hi] = [start]
+
+    def _joins_session(self, t):
+        i = bisect.bisect_right(self._session_starts, t)
+        return ((i > 0 and self._sessions[i - 1][1] + self.gap >= t)
+                or (i < len(self._sessions) and self._sessions[i][0] - self.gap <= t))
+
+    def _is_late(self, t):
+        if self.kind == "session":
+            return not self._joins_session(t) and t + self.gap <= self.watermark
+        # The newest window containing t closes last; if it is gone, all are
+        return (t - t % self.slide) + self.size <= self.watermark
+
+    # --- Public API ---
+    def add(self, event_time, values):
+        """
+        Add one event and return the windows closed by the advancing watermark.
+
+        Args:
+            event_time: Anything pd.Timestamp accepts
+            values (sequence): One reading per channel, in `channels` order
+
+        Returns:
+            list of dict: Closed window statistics (one dict per channel)
+        """
+        t = pd.Timestamp(event_time).value
+        x = np.asarray(values, dtype=np.float64)
+
+        if self.watermark is not None and t < self.watermark and self._is_late(t):
+            self.late_events += 1
+            return []
+
+        if self.kind == "session":
+            self._add_to_session(t, x)
+        else:
+            self._add_to_pane(t, x)
+
+        if self._max_time is None or t > self._max_time:
+            self._max_time = t
+            self.watermark = t - self.lateness
+            return self._emit(self.watermark)
+        return []
+
+    def add_batch(self, df, time_col="log_time"):
+        """
+        Feed a DataFrame of events in row order.
+
+        Returns:
+            pd.DataFrame: Windows closed while processing the batch
+        """
+        times = pd.to_datetime(df[time_col])
+        values = df[self.channels].to_numpy(dtype=np.float64)
+        rows = []
+        for t, x in zip(times, values):
+            rows.extend(self.add(t, x))
+        return _to_frame(rows)
+
+    def flush(self):
+        """Close every open window regardless of the watermark."""
+        return _to_frame(self._emit(None))
+
+    def _emit(self, watermark):
+        if self.kind == "session":
+            return self._emit_sessions(watermark)
+        rows = []
+        heap = self._pane_heap
+        while heap:
+            # Earliest window that still has data: the first one covering the oldest pane
+            first_pane = heap[0]
+            start = (first_pane - self.size) // self.slide * self.slide + self.slide
+            if self._next_start is not None:
+                start = max(start, self._next_start)
+            end = start + self.size
+            if watermark is not None and end > watermark:
+                break
+            agg = _RunningAgg(len(self.channels))
+            for p in range(start, end, self.pane):
+                part = self._panes.get(p)
+                if part is not None:
+                    agg.merge(part)
+            self._append_rows(rows, start, end, agg)
+            self._advance(start + self.slide)
+        if watermark is not None:
+            # Windows ending at or before the watermark are closed even if they
+            # were empty; a late straggler must not reopen them
+            self._advance((watermark - self.size) // self.slide * self.slide + self.slide)
+        return rows
+
+    def _advance(self, next_start):
+        """Mark every window starting before next_start as emitted and drop its panes."""
+        if self._next_start is None or next_start > self._next_start:
+            self._next_start = next_start
+        # Panes before the next window start belong to no future window
+        heap = self._pane_heap
+        while heap and heap[0] < self._next_start:
+            del self._panes[heapq.heappop(heap)]
+
+    def _emit_sessions(self, watermark):
+        rows = []
+        n = 0
+        for start, end, agg in self._sessions:
+            if watermark is not None and end + self.gap > watermark:
+                break
+            self._append_rows(rows, start, end + self.gap, agg)
+            n += 1
+        del self._sessions[:n], self._session_starts[:n]
+        return rows
+
+    def _append_rows(self, rows, start, end, agg):
+        if agg.count == 0:
+            return
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        std = agg.std()
+        for i, ch in enumerate(self.channels):
+            rows.append({
+                "window_start": start, "window_end": end, "channel": ch, "count": agg.count,
+                "min": agg.min[i], "mean": agg.mean[i], "max": agg.max[i], "std": std[i]
+            })
+
+
+# Live aggregation of the logged sensor stream (fed by logger_module.log_data).
+# One aggregator per raw log, kept at module level so open windows survive
+# Streamlit reruns for the life of the process
+LIVE_WINDOW = "1min"
+LIVE_LATENESS = "0s"
+_LIVE_AGGREGATORS = {}
+
+
+def live_aggregator(log_path, size=LIVE_WINDOW, allowed_lateness=LIVE_LATENESS):
+    """Tumbling-window aggregator for the rows appended to `log_path`."""
+    agg = _LIVE_AGGREGATORS.get(log_path)
+    if agg is None:
+        agg = _LIVE_AGGREGATORS[log_path] = WindowAggregator(size=size, allowed_lateness=allowed_lateness)
+    return agg
+
+
+def run():
+    """
+    Streamlit demo runner: per-minute windows over a synthetic sensor stream.
+    """
+    from dashboard_view import show_window_stats
+    from logger_module import log_window_stats, WINDOW_LOG_FILE
+
+    st.header("🪟 Window Aggregator Demo")
+    st.markdown("Incremental min/mean/max/std per channel over event-time windows.")
+
+    kind = st.selectbox("🧩 Window type", ["tumbling", "sliding", "session"])
+    size = st.selectbox("⏱️ Window size", ["1min", "5min", "1h"])
+    slide = st.selectbox("↪️ Slide (sliding only)", ["30s", "1min", "5min"]) if kind == "sliding" else None
+    lateness = st.selectbox("🕰️ Allowed lateness", ["0s", "10s", "1min"])
+    persist = st.checkbox(f"💾 Append closed windows to `{WINDOW_LOG_FILE}`", value=True)
+
+    if st.button("▶️ Aggregate Sample Stream"):
+        rng = np.random.default_rng(0)
+        n = 600
+        times = pd.date_range("2025-07-24 10:00:00", periods=n, freq="2s")
+        # Shuffle a little so some events arrive out of order
+        jitter = pd.to_timedelta(rng.integers(-5, 5, n), unit="s")
+        df = pd.DataFrame({
+            "log_time": times + jitter,
+            "Temperature": rng.normal(75, 2, n),
+            "Pressure": rng.normal(10, 0.3, n),
+            "FlowRate": rng.normal(300, 5, n)
+        })
+
+        agg = WindowAggregator(kind=kind, size=size, slide=slide, gap="30s", allowed_lateness=lateness)
+        stats = pd.concat([agg.add_batch(df), agg.flush()], ignore_index=True)
+        st.info(f"Late events dropped: {agg.late_events}")
+        show_window_stats(stats)
+        if persist and log_window_stats(stats):
+            st.caption(f"📁 Logged {len(stats)} window rows to `{WINDOW_LOG_FILE}`")
@@ -10,6 +10,10 @@ def run():
     # ✅ Add tools folder to path
     tools_folder = os.path.join(os.path.dirname(__file__), "tools")
     sys.path.append(tools_folder)
+    # ✅ Repo root too: tools import modules.Thermodynamics.core / .tools
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    if repo_root not in sys.path:
+        sys.path.insert(0, repo_root)
 
     # === Page Config ===
     st.set_page_config(page_title="🛢️ PetroStream AI Suite", layout="centered")
@@ -33,7 +37,8 @@ def run():
         "9️⃣ Energy Loss Visualizer": "energy_loss_visualizer",
         "🔟 Process Variability Analyzer": "process_variability",
         "1️⃣1️⃣ Equipment Failure Predictor": "equipment_failure_predictor",
-        "1️⃣2️⃣ Yield Predictor": "yield_predictor"
+        "1️⃣2️⃣ Yield Predictor": "yield_predictor",
+        "1️⃣3️⃣ Adiabatic Flame Temperature": "flame_temperature"
     }
 
     selected = st.sidebar.radio("🧭 Select Module", list(modules.keys()))
@@ -41,6 +46,7 @@ def run():
     filepath = os.path.join(tools_folder, filename)
 
     # === Module Execution ===
+    # Tools defer heavy imports to the functions that use them (see tools/import_budget.py)
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             code = f.read()
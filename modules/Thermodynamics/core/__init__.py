@@ -0,0 +1,22 @@
+"""
+Thermodynamics compute core (pure NumPy)
+
+Array-native kernels shared by the Streamlit tools in ../tools and by batch
+jobs / worker processes. Nothing here imports Streamlit or pandas, and all
+public functions are plain module-level functions, so they pickle by
+reference into process pools.
+
+Modules:
+- properties: Cp and ΔH polynomials per fuel
+- combustion: fuel tables, efficiency kernel, heat balance per operating point
+- flame: adiabatic flame temperature solver
+- efficiency: energy efficiency and loss
+- optimization: process parameter bounds and rule checks
+- property_tables: memory-mapped Cp / H / S lookup tables
+"""
+
+from .properties import get_cp, delta_H
+from .combustion import simulate_combustion, efficiency_kernel
+from .flame import adiabatic_flame_temperature
+from .efficiency import calculate_efficiency, efficiency_percent
+from .optimization import evaluate_parameters, parameter_flags
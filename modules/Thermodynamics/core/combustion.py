@@ -0,0 +1,153 @@
+# combustion.py
+"""
+Combustion Kernels (pure NumPy)
+
+Features:
+- Calorific value, stoichiometric AFR and molar mass tables per fuel
+- Fuel lookups for one name or whole arrays of names (unknown fuels use defaults)
+- Gaussian efficiency proxy around the stoichiometric AFR
+- Heat release / useful energy / heat loss for arrays of operating points
+
+Used in: tools/combustion.py, tools/combustion_efficiency_simulator.py, core/flame.py
+"""
+
+import numpy as np
+
+# === CONSTANTS ===
+CALORIFIC_VALUES = {
+    "Methane (CH4)": 802.3,
+    "Propane (C3H8)": 2043.0,
+    "Octane (C8H18)": 5470.0,
+    "Hydrogen (H2)": 286.0,
+    "Carbon Monoxide (CO)": 283.0
+}
+
+STOICH_AFR = {
+    "Methane (CH4)": 17.2,
+    "Propane (C3H8)": 15.7,
+    "Octane (C8H18)": 15.1,
+    "Hydrogen (H2)": 34.3,
+    "Carbon Monoxide (CO)": 2.4
+}
+
+MOLAR_MASS = {
+    "Methane (CH4)": 16.04,
+    "Propane (C3H8)": 44.1,
+    "Octane (C8H18)": 114.2,
+    "Hydrogen (H2)": 2.02,
+    "Carbon Monoxide (CO)": 28.0
+}
+
+# Values used for fuels missing from the tables
+DEFAULT_CALORIFIC_VALUE = 0.0
+DEFAULT_STOICH_AFR = 14.7
+DEFAULT_MOLAR_MASS = 18.0
+WIDTH_FACTOR = 0.2  # Gaussian width as a fraction of the stoichiometric AFR
+
+
+# === FUEL LOOKUPS ===
+def _lookup(table, fuel, default):
+    """
+    Table value for one fuel name (float) or an array of names (ndarray).
+    Each distinct name is looked up once and broadcast back.
+    """
+    if isinstance(fuel, str):
+        return table.get(fuel, default)
+    names, inverse = np.unique(np.asarray(fuel).astype(str), return_inverse=True)
+    values = np.array([table.get(n, default) for n in names], dtype=np.float64)
+    return values[inverse].reshape(np.shape(fuel))
+
+
+def calorific_value(fuel, default=DEFAULT_CALORIFIC_VALUE):
+    """Heat of combustion (kJ/mol)."""
+    return _lookup(CALORIFIC_VALUES, fuel, default)
+
+
+def stoich_afr(fuel, default=DEFAULT_STOICH_AFR):
+    """Stoichiometric mass air-fuel ratio."""
+    return _lookup(STOICH_AFR, fuel, default)
+
+
+def molar_mass(fuel, default=DEFAULT_MOLAR_MASS):
+    """Molar mass (g/mol)."""
+    return _lookup(MOLAR_MASS, fuel, default)
+
+
+# === KERNELS ===
+def efficiency_kernel(afr, stoich):
+    """
+    Gaussian efficiency proxy around stoichiometric AFR, in %.
+    Works element-wise on scalars or NumPy arrays; non-positive inputs give 0.
+    """
+    afr = np.asarray(afr, dtype=np.float64)
+    stoich = np.asarray(stoich, dtype=np.float64)
+    valid = (afr > 0) & (stoich > 0)
+    sigma = np.where(valid, stoich * WIDTH_FACTOR, 1.0)
+    return np.where(valid, np.exp(-((afr - stoich) ** 2) / (2 * sigma ** 2)) * 100, 0.0)
+
+
+def convert_flow_rate_array(values, units, molar_mass):
+    """
+    Fuel flow in mol/s from kg/h or kg/s (one unit string per value, or one
+    for all); any other unit is taken as mol/s already.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    units = np.asarray(units)
+    return np.select(
+        [units == "kg/h", units == "kg/s"],
+        [values * 1000 / 3600 / molar_mass, values * 1000 / molar_mass],
+        default=values
+    )
+
+
+def simulate_combustion(fuel, afr, fuel_flow_rate, flow_unit="mol/s"):
+    """
+    Heat balance for arrays of operating points.
+
+    All arguments broadcast against each other. Values are rounded to 2
+    decimals in the same order as the Streamlit tool reports them.
+
+    Returns:
+        dict of arrays keyed by the report column names
+    """
+    stoich = stoich_afr(fuel)
+    cv = calorific_value(fuel)
+    afr = np.asarray(afr, dtype=np.float64)
+    flow_mol_s = convert_flow_rate_array(fuel_flow_rate, flow_unit, molar_mass(fuel))
+    heat_release = np.round(flow_mol_s * cv, 2)
+    efficiency = np.round(efficiency_kernel(afr, stoich), 2)
+    useful = np.round(efficiency / 100 * heat_release, 2)
+    waste = np.round(heat_release - useful, 2)
+
+    return {
+        "Fuel": np.asarray(fuel),
+        "AFR": afr,
+        "Stoichiometric AFR": np.asarray(stoich, dtype=np.float64),
+        "Calorific Value (kJ/mol)": np.asarray(cv, dtype=np.float64),
+        "Fuel Flow Rate (mol/s)": flow_mol_s,
+        "Total Heat Released (kJ/s)": heat_release,
+        "Combustion Efficiency (%)": efficiency,
+        "Useful Energy (kJ/s)": useful,
+        "Heat Loss (kJ/s)": waste
+    }
+
+
+def response_surface(fuel_name, afr_values, flow_values, flow_unit="mol/s"):
+    """
+    Useful energy (kJ/s) over an AFR × flow grid in one broadcast.
+
+    Returns:
+        (efficiency, useful): efficiency has shape (n_afr,), useful (n_afr, n_flow)
+    """
+    afr_values = np.asarray(afr_values, dtype=np.float64)
+    flow_mol_s = convert_flow_rate_array(flow_values, flow_unit, molar_mass(fuel_name))
+    efficiency = efficiency_kernel(afr_values, stoich_afr(fuel_name))
+    heat_release = flow_mol_s * calorific_value(fuel_name)
+    useful = (efficiency / 100)[:, None] * heat_release[None, :]
+    return efficiency, useful
+
+
+def efficiency_curve(fuel_name, afr_range=(5, 40), points=100):
+    """Efficiency (%, 2 decimals) over an evenly spaced AFR range."""
+    afrs = np.linspace(*afr_range, points)
+    return afrs, np.round(efficiency_kernel(afrs, stoich_afr(fuel_name)), 2)
@@ -0,0 +1,35 @@
+# efficiency.py
+"""
+Energy Efficiency Kernels (pure NumPy)
+
+Features:
+- Efficiency and loss (%) from input / useful output energy
+- float32 efficiency for large meter logs, with NaN for zero or missing input
+
+Used in: tools/energy_efficiency_analyzer.py, tools/Equipment_Efficiency_Analyzer.py
+"""
+
+import numpy as np
+
+
+def calculate_efficiency(input_energy, output_energy):
+    """
+    Efficiency = output / input × 100 and loss = 100 − efficiency, in %.
+
+    Scalars give floats; arrays broadcast and give ndarrays.
+    """
+    efficiency = (output_energy / np.asarray(input_energy, dtype=np.float64)) * 100
+    loss = 100 - efficiency
+    if np.ndim(efficiency) == 0:
+        return float(efficiency), float(loss)
+    return efficiency, loss
+
+
+def efficiency_percent(input_values, output_values):
+    """Output / input × 100 as float32; zero or missing input gives NaN."""
+    inp = np.asarray(input_values, dtype=np.float32)
+    out = np.asarray(output_values, dtype=np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eff = out / inp * np.float32(100)
+    eff[~np.isfinite(eff)] = np.nan
+    return eff
@@ -0,0 +1,161 @@
+# flame.py
+"""
+Adiabatic Flame Temperature Kernel (pure NumPy)
+
+Features:
+- Energy balance per mol of fuel for lean and rich mixtures
+- Vectorized Newton solve over arrays of fuels, AFRs and inlet temperatures
+- Flue-gas mole fractions and stack-loss efficiency
+
+Used in: tools/flame_temperature.py
+"""
+
+import numpy as np
+
+from .properties import CP_COEFFICIENTS, PRODUCT_CP_COEFFICIENTS, T_MAX
+from .combustion import STOICH_AFR
+
+# ===== Constants =====
+T_REF = 298.15  # K
+N2_PER_O2 = 3.76  # mol N2 per mol O2 in air
+
+# Fuel formula (C, H, O atoms) and lower heating value (kJ/mol, water as vapour)
+FUEL_DATA = {
+    "Methane (CH4)": (1, 4, 0, 802.3),
+    "Propane (C3H8)": (3, 8, 0, 2043.1),
+    "Octane (C8H18)": (8, 18, 0, 5074.1),
+    "Hydrogen (H2)": (0, 2, 0, 241.8),
+    "Carbon Monoxide (CO)": (1, 0, 1, 283.0)
+}
+
+FUELS = list(FUEL_DATA.keys())
+_FUEL_TABLE = np.array(list(FUEL_DATA.values()), dtype=np.float64)          # (n_fuels, 4)
+_FUEL_CP = np.array([CP_COEFFICIENTS[f] for f in FUELS], dtype=np.float64)  # (n_fuels, 3)
+_PRODUCT_CP = np.array(list(PRODUCT_CP_COEFFICIENTS.values()), dtype=np.float64)  # CO2, H2O, N2, O2
+
+
+# ===== Polynomial helpers (Cp = a + bT + cT²) =====
+def _h_poly(coeffs, T):
+    """Sensible enthalpy H(T) − H(T_REF) in J/mol; coeffs has a, b, c in the last axis."""
+    a, b, c = coeffs[..., 0], coeffs[..., 1], coeffs[..., 2]
+    return a * (T - T_REF) + b / 2 * (T ** 2 - T_REF ** 2) + c / 3 * (T ** 3 - T_REF ** 3)
+
+
+def _cp_poly(coeffs, T):
+    return coeffs[..., 0] + T * (coeffs[..., 1] + coeffs[..., 2] * T)
+
+
+def _h_fuel(coeffs, T):
+    """Fuel polynomials are only fitted to T_MAX; hold Cp constant above it."""
+    T_clip = np.minimum(T, T_MAX)
+    return _h_poly(coeffs, T_clip) + _cp_poly(coeffs, T_clip) * np.maximum(T - T_MAX, 0.0)
+
+
+def _cp_fuel(coeffs, T):
+    return _cp_poly(coeffs, np.minimum(T, T_MAX))
+
+
+def _fuel_codes(fuel, shape):
+    if isinstance(fuel, str):
+        if fuel not in FUEL_DATA:
+            raise ValueError(f"No combustion data found for {fuel}")
+        return np.full(shape, FUELS.index(fuel))
+    names, inverse = np.unique(np.asarray(fuel), return_inverse=True)
+    unknown = [n for n in names if n not in FUEL_DATA]
+    if unknown:
+        raise ValueError(f"No combustion data found for {unknown[0]}")
+    return np.array([FUELS.index(n) for n in names])[inverse].reshape(shape)
+
+
+# ===== Core Solver =====
+def adiabatic_flame_temperature(fuel, afr, T_air=T_REF, T_stack=450.0, tol=1e-6, max_iter=30):
+    """
+    Solve the adiabatic energy balance for arrays of operating points at once.
+
+    Per mol of fuel at equivalence ratio λ = AFR / stoichiometric AFR:
+    lean (λ ≥ 1) burns completely to CO2 + H2O with excess O2; rich (λ < 1)
+    burns a fraction λ of the fuel and carries the rest through unburned.
+    Newton's method finds T where H_products(T) = H_reactants(T_air) + burned·LHV,
+    updating only points that have not yet converged.
+
+    Args:
+        fuel: Fuel name or array of names (broadcast against afr)
+        afr: Mass air-fuel ratio, scalar or array
+        T_air (float or array): Inlet temperature of fuel and air (K)
+        T_stack (float or array): Flue-gas exit temperature for the efficiency (K)
+        tol (float): Convergence tolerance on the Newton step (K)
+        max_iter (int): Iteration cap
+
+    Returns:
+        dict of arrays: T_ad, lambda, mole fractions (x_CO2, x_H2O, x_O2, x_N2,
+        x_fuel), efficiency (% of fuel LHV delivered above T_stack),
+        converged mask and iterations used
+    """
+    fuel_shape = () if isinstance(fuel, str) else np.shape(fuel)
+    shape = np.broadcast_shapes(fuel_shape, np.shape(afr), np.shape(T_air), np.shape(T_stack))
+    codes = np.broadcast_to(_fuel_codes(fuel, fuel_shape), shape)
+    afr = np.broadcast_to(np.asarray(afr, dtype=np.float64), shape)
+    T_air = np.broadcast_to(np.asarray(T_air, dtype=np.float64), shape)
+    T_stack = np.broadcast_to(np.asarray(T_stack, dtype=np.float64), shape)
+
+    C, H, O, lhv = (_FUEL_TABLE[codes, k] for k in range(4))
+    stoich_afr = np.array([STOICH_AFR[f] for f in FUELS])[codes]
+    lam = np.where(afr > 0, afr / stoich_afr, 0.0)
+    burned = np.minimum(lam, 1.0)
+    o2_stoich = C + H / 4 - O / 2
+    o2_fed = lam * o2_stoich
+
+    # Product moles per mol fuel: CO2, H2O, N2, O2 (+ unburned fuel)
+    n_prod = np.stack([C * burned, H / 2 * burned, N2_PER_O2 * o2_fed, np.maximum(o2_fed - o2_stoich, 0.0)], axis=-1)
+    n_fuel_out = 1.0 - burned
+    fuel_cp = _FUEL_CP[codes]
+
+    # Mole-weighted product polynomial: Σ n_i (a_i, b_i, c_i)
+    mix = n_prod @ _PRODUCT_CP
+
+    # Right-hand side: reactant sensible heat + heat of reaction (J/mol fuel)
+    air_coeffs = np.stack([_PRODUCT_CP[3], _PRODUCT_CP[2]])  # O2, N2
+    h_air = o2_fed * (_h_poly(air_coeffs[0], T_air) + N2_PER_O2 * _h_poly(air_coeffs[1], T_air))
+    target = _h_fuel(fuel_cp, T_air) + h_air + burned * lhv * 1000
+
+    T = np.full(shape, 2000.0)
+    converged = np.zeros(shape, dtype=bool)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        idx = np.flatnonzero(~converged.ravel())
+        if idx.size == 0:
+            iterations -= 1
+            break
+        Ti = T.ravel()[idx]
+        m = mix.reshape(-1, 3)[idx]
+        fc = fuel_cp.reshape(-1, 3)[idx]
+        nf = n_fuel_out.ravel()[idx]
+        f = _h_poly(m, Ti) + nf * _h_fuel(fc, Ti) - target.ravel()[idx]
+        fp = _cp_poly(m, Ti) + nf * _cp_fuel(fc, Ti)
+        step = f / fp
+        T.ravel()[idx] = np.maximum(Ti - step, T_REF / 2)
+        converged.ravel()[idx] = np.abs(step) < tol
+
+    total = n_prod.sum(axis=-1) + n_fuel_out
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fractions = n_prod / total[..., None]
+        x_fuel = n_fuel_out / total
+
+    # Heat still in the flue gas at the stack is lost; so is unburned fuel
+    q_stack = _h_poly(mix, T_stack) + n_fuel_out * _h_fuel(fuel_cp, T_stack)
+    delivered = target - q_stack
+    with np.errstate(invalid="ignore", divide="ignore"):
+        efficiency = np.clip(np.where(lam > 0, delivered / (lhv * 1000) * 100, 0.0), 0.0, 100.0)
+
+    return {
+        "T_ad": T,
+        "lambda": lam,
+        "x_CO2": fractions[..., 0],
+        "x_H2O": fractions[..., 1],
+        "x_N2": fractions[..., 2],
+        "x_O2": fractions[..., 3],
+        "x_fuel": x_fuel,
+        "efficiency": efficiency,
+        "converged": converged,
+        "iterations": iterations
+    }
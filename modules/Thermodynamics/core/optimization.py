@@ -0,0 +1,64 @@
+# optimization.py
+"""
+Process Parameter Rules (pure NumPy)
+
+Features:
+- Parameter bounds of the optimization dashboard
+- Heuristic low / high rules checked for whole arrays of operating points
+- Suggestion text for one operating point
+
+Used in: tools/Process_Optimization_Dashboard.py
+"""
+
+import numpy as np
+
+# Bounds of the parameter inputs; the surrogate search never leaves them
+PARAM_BOUNDS = {
+    "Temperature (°C)": (0.0, 500.0),
+    "Pressure (bar)": (0.1, 10.0),
+    "Flow Rate (m³/h)": (1.0, 200.0),
+    "Catalyst Loading (kg)": (1.0, 50.0)
+}
+PARAM_NAMES = list(PARAM_BOUNDS)
+
+# Per parameter (in PARAM_NAMES order): recommended low / high limits and
+# the suggestion given below the low limit / above the high limit
+PARAMETER_RULES = [
+    (150, 250, "Increase temperature to improve reaction rate.",
+     "Decrease temperature to avoid catalyst deactivation."),
+    (1, 5, "Increase pressure for better conversion.",
+     "Reduce pressure to save energy."),
+    (10, 100, "Increase flow rate to enhance throughput.",
+     "Reduce flow rate to maintain control."),
+    (5, 20, "Add more catalyst to improve conversion.",
+     "Reduce catalyst loading to lower costs.")
+]
+_LOW = np.array([rule[0] for rule in PARAMETER_RULES], dtype=np.float64)
+_HIGH = np.array([rule[1] for rule in PARAMETER_RULES], dtype=np.float64)
+
+
+def parameter_flags(X):
+    """
+    Rule check for many operating points at once.
+
+    Args:
+        X: (..., 4) array of parameters in PARAM_NAMES order
+
+    Returns:
+        int8 array of the same shape: -1 below the low limit, +1 above the
+        high limit, 0 within the recommended range
+    """
+    X = np.asarray(X, dtype=np.float64)
+    return (X > _HIGH).astype(np.int8) - (X < _LOW).astype(np.int8)
+
+
+def evaluate_parameters(params):
+    """
+    Evaluate process parameters against heuristic rules
+    and return a list of optimization suggestions.
+
+    Args:
+        params (dict): Parameter name -> value (PARAM_NAMES keys)
+    """
+    flags = parameter_flags([params[name] for name in PARAM_NAMES])
+    return [rule[2] if flag < 0 else rule[3] for flag, rule in zip(flags, PARAMETER_RULES) if flag]
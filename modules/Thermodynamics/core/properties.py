@@ -0,0 +1,124 @@
+# properties.py
+"""
+Cp and Enthalpy Kernels (pure NumPy)
+
+Features:
+- Cp from NASA-like a + bT + cT² polynomials per fuel
+- Exact enthalpy change (ΔH) from the polynomial integral
+- Fuel names, arrays of names or integer fuel codes, broadcast against T
+
+Used in: tools/props.py, core/flame.py, core/property_tables.py
+"""
+
+import numpy as np
+
+# === Cp Polynomial Coefficients (simplified NASA format) ===
+CP_COEFFICIENTS = {
+    "Methane (CH4)": [19.89, 5.024e-2, 1.269e-5],
+    "Propane (C3H8)": [14.15, 8.94e-2, -1.09e-5],
+    "Octane (C8H18)": [25.48, 1.52e-1, -7.15e-5],
+    "Hydrogen (H2)": [28.84, -1.01e-2, 1.47e-5],
+    "Carbon Monoxide (CO)": [29.1, -0.191e-2, 0.400e-5]
+}
+
+# === Combustion product Cp, same a + bT + cT² form (J/mol·K) ===
+# Least-squares fit to JANAF values over 300–3000 K (within ~5% for CO2, ~2% for the rest)
+PRODUCT_CP_COEFFICIENTS = {
+    "Carbon Dioxide (CO2)": [32.04, 2.536e-2, -5.237e-6],
+    "Water Vapour (H2O)": [28.60, 1.528e-2, -2.064e-6],
+    "Nitrogen (N2)": [26.78, 7.128e-3, -1.251e-6],
+    "Oxygen (O2)": [27.49, 7.891e-3, -1.246e-6]
+}
+
+T_MIN, T_MAX = 200, 1500  # Valid range of the Cp polynomials (K)
+
+_FUEL_INDEX = {fuel: i for i, fuel in enumerate(CP_COEFFICIENTS)}
+_COEFF_TABLE = np.array(list(CP_COEFFICIENTS.values()), dtype=np.float64)  # (n_fuels, 3)
+
+def _coefficients(fuel):
+    """
+    Look up (a, b, c) for one fuel name, an array of names, or an array of
+    integer fuel codes (positions in get_available_fuels(), fastest for hot loops).
+    Returns three arrays broadcastable against the temperature input.
+    """
+    if isinstance(fuel, str):
+        if fuel not in _FUEL_INDEX:
+            raise ValueError(f"No Cp data found for {fuel}")
+        a, b, c = _COEFF_TABLE[_FUEL_INDEX[fuel]]
+        return a, b, c
+
+    codes = np.asarray(fuel)
+    if np.issubdtype(codes.dtype, np.integer):
+        if codes.size and (codes.min() < 0 or codes.max() >= len(_COEFF_TABLE)):
+            raise ValueError("Fuel code out of range")
+        rows = _COEFF_TABLE[codes]
+        return rows[..., 0], rows[..., 1], rows[..., 2]
+
+    # Map each distinct name once, then broadcast back with the inverse index
+    names, inverse = np.unique(codes, return_inverse=True)
+    unknown = [n for n in names if n not in _FUEL_INDEX]
+    if unknown:
+        raise ValueError(f"No Cp data found for {unknown[0]}")
+    rows = _COEFF_TABLE[[_FUEL_INDEX[n] for n in names]][inverse.reshape(codes.shape)]
+    return rows[..., 0], rows[..., 1], rows[..., 2]
+
+def _check_range(*temperatures):
+    """Validate every temperature array once per call."""
+    for T in temperatures:
+        T = np.asarray(T)
+        if T.size and (T.min() < T_MIN or T.max() > T_MAX):
+            bad = T.min() if T.min() < T_MIN else T.max()
+            raise ValueError(f"Temperature {bad}K is outside valid range ({T_MIN}–{T_MAX} K)")
+
+def get_cp(fuel, T):
+    """
+    Calculate specific heat capacity Cp at temperature T (K) for given fuel.
+    Returns Cp in J/mol·K.
+
+    `fuel` and `T` may be scalars or NumPy arrays (broadcast together).
+    Scalar inputs return a float rounded to 3 decimals as before; array
+    inputs return an unrounded ndarray.
+    """
+    a, b, c = _coefficients(fuel)
+    _check_range(T)
+    Cp = a + T * (b + c * T)
+    if np.ndim(Cp) == 0:
+        return round(float(Cp), 3)
+    return Cp
+
+def delta_H(fuel, T1, T2, n_mol=1.0):
+    """
+    Estimate change in enthalpy (ΔH) for the fuel between T1 and T2 in kJ.
+
+    Uses the exact integral of Cp = a + bT + cT²:
+        ΔH = n [a(T2−T1) + b/2 (T2²−T1²) + c/3 (T2³−T1³)]
+    All arguments may be scalars or broadcastable NumPy arrays. Scalar
+    inputs return a float rounded to 3 decimals; arrays return an ndarray.
+    """
+    a, b, c = _coefficients(fuel)
+    T1 = np.asarray(T1, dtype=np.float64)
+    T2 = np.asarray(T2, dtype=np.float64)
+    _check_range(T1, T2)
+
+    delta_h_joule = n_mol * (a * (T2 - T1)
+                             + b / 2 * (T2 ** 2 - T1 ** 2)
+                             + c / 3 * (T2 ** 3 - T1 ** 3))
+    delta_h_kj = delta_h_joule / 1000
+    if np.ndim(delta_h_kj) == 0:
+        return round(float(delta_h_kj), 3)
+    return delta_h_kj
+
+def get_cp_curve(fuel: str, T_range: tuple = (200, 1000), points: int = 100):
+    """
+    Generate Cp vs T data for plotting or analysis.
+    Returns a tuple of (T_array, Cp_array).
+    """
+    T_vals = np.linspace(*T_range, points)
+    Cp_vals = get_cp(fuel, T_vals)
+    return T_vals, Cp_vals
+
+def get_available_fuels():
+    """
+    Returns a list of fuels with available Cp data.
+    """
+    return list(CP_COEFFICIENTS.keys())
@@ -0,0 +1,177 @@
+# property_tables.py
+"""
+Precomputed Thermodynamic Property Tables
+
+Features:
+- Dense per-species grids of Cp, H and S built on first use
+- Vectorized cubic Hermite lookup (exact slopes: dH/dT = Cp, dS/dT = Cp/T)
+- Tables saved as .npy files and memory-mapped, so worker processes share pages
+- Species from the core/properties.py polynomials plus user-registered tabulated data
+
+Used in: tools/props.py (tabulated species, entropy)
+"""
+
+import os
+import hashlib
+import numpy as np
+
+from .properties import CP_COEFFICIENTS, T_MIN, T_MAX
+
+T_REF = 298.15  # Reference temperature for H = 0 and S = S_ref (K)
+GRID_STEP = 1.0  # Grid spacing (K)
+TABLE_DIR = os.environ.get(
+    "PROPERTY_TABLE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "property_tables")
+)
+
+# Column layout of every table: T, Cp, dCp/dT, H, S
+_T, _CP, _DCP, _H, _S = range(5)
+
+# name -> {"kind": "poly" | "tabulated", ...}
+_SPECIES = {name: {"kind": "poly", "coeffs": tuple(c), "T_range": (T_MIN, T_MAX), "S_ref": 0.0}
+            for name, c in CP_COEFFICIENTS.items()}
+_LOADED = {}
+
+
+def register_tabulated(name, T, Cp, S_ref=0.0):
+    """
+    Add a species from tabulated Cp data (J/mol·K) over any temperature range.
+
+    The table is interpolated with a cubic spline; H and S come from its exact
+    antiderivatives. S is relative to S_ref at 298.15 K (or at the lowest
+    tabulated temperature if 298.15 K is outside the data).
+    """
+    T = np.asarray(T, dtype=np.float64)
+    Cp = np.asarray(Cp, dtype=np.float64)
+    if T.ndim != 1 or T.shape != Cp.shape or len(T) < 4:
+        raise ValueError("Tabulated data needs matching 1-D T and Cp arrays with at least 4 points")
+    order = np.argsort(T)
+    _SPECIES[name] = {"kind": "tabulated", "T": T[order], "Cp": Cp[order],
+                      "T_range": (T[order][0], T[order][-1]), "S_ref": float(S_ref)}
+    _LOADED.pop(name, None)
+
+
+def load_tabulated_csv(name, path, T_col="T", Cp_col="Cp", S_ref=0.0):
+    """Register a species from a CSV with temperature and Cp columns."""
+    import pandas as pd
+    df = pd.read_csv(path, usecols=[T_col, Cp_col])
+    register_tabulated(name, df[T_col].to_numpy(), df[Cp_col].to_numpy(), S_ref)
+
+
+def available_species():
+    return list(_SPECIES.keys())
+
+
+def _fingerprint(name, spec):
+    digest = hashlib.md5(f"{name}|{GRID_STEP}|{spec['S_ref']}|{spec['kind']}".encode())
+    if spec["kind"] == "poly":
+        digest.update(np.asarray(spec["coeffs"] + spec["T_range"], dtype=np.float64).tobytes())
+    else:
+        digest.update(spec["T"].tobytes())
+        digest.update(spec["Cp"].tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _build_table(spec):
+    """Evaluate Cp, dCp/dT, H and S on the dense grid for one species."""
+    lo, hi = spec["T_range"]
+    T = np.arange(lo, hi + GRID_STEP / 2, GRID_STEP, dtype=np.float64)
+    if T[-1] < hi:
+        T = np.append(T, hi)
+    Tr = T_REF if lo <= T_REF <= hi else lo
+    table = np.empty((len(T), 5))
+    table[:, _T] = T
+
+    if spec["kind"] == "poly":
+        a, b, c = spec["coeffs"]
+        table[:, _CP] = a + T * (b + c * T)
+        table[:, _DCP] = b + 2 * c * T
+        table[:, _H] = a * (T - Tr) + b / 2 * (T ** 2 - Tr ** 2) + c / 3 * (T ** 3 - Tr ** 3)
+        table[:, _S] = a * np.log(T / Tr) + b * (T - Tr) + c / 2 * (T ** 2 - Tr ** 2)
+    else:
+        from scipy.interpolate import CubicSpline
+        cp = CubicSpline(spec["T"], spec["Cp"])
+        h = cp.antiderivative()
+        s = CubicSpline(spec["T"], spec["Cp"] / spec["T"]).antiderivative()
+        table[:, _CP] = cp(T)
+        table[:, _DCP] = cp(T, 1)
+        table[:, _H] = h(T) - h(Tr)
+        table[:, _S] = s(T) - s(Tr)
+
+    table[:, _S] += spec["S_ref"]
+    return table
+
+
+def get_table(name):
+    """
+    Return the (n_grid, 5) table for a species, building and saving it on first use.
+
+    Tables are memory-mapped read-only from TABLE_DIR, so every process that
+    looks up the same species shares one copy in the OS page cache.
+    """
+    if name in _LOADED:
+        return _LOADED[name]
+    if name not in _SPECIES:
+        raise ValueError(f"No property data found for {name}")
+
+    spec = _SPECIES[name]
+    path = os.path.join(TABLE_DIR, f"{_fingerprint(name, spec)}.npy")
+    if not os.path.exists(path):
+        os.makedirs(TABLE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, _build_table(spec))
+        os.replace(tmp_path, path)  # atomic, so concurrent builders never see a partial file
+
+    table = np.load(path, mmap_mode="r")
+    _LOADED[name] = table
+    return table
+
+
+def _hermite(table, T, col, slope):
+    """
+    Cubic Hermite interpolation on the uniform grid.
+
+    `slope` is the column holding d(col)/dT, or a callable computing it.
+    """
+    T = np.asarray(T, dtype=np.float64)
+    T0, T_last = table[0, _T], table[-1, _T]
+    if T.size and (T.min() < T0 or T.max() > T_last):
+        bad = T.min() if T.min() < T0 else T.max()
+        raise ValueError(f"Temperature {bad}K is outside valid range ({T0:g}–{T_last:g} K)")
+
+    n = len(table)
+    i = np.minimum(((T - T0) / GRID_STEP).astype(np.intp), n - 2)
+    Ta = table[i, _T]
+    h = table[i + 1, _T] - Ta
+    t = (T - Ta) / h
+    y0, y1 = table[i, col], table[i + 1, col]
+    if callable(slope):
+        m0, m1 = slope(table, i), slope(table, i + 1)
+    else:
+        m0, m1 = table[i, slope], table[i + 1, slope]
+
+    t2 = t * t
+    t3 = t2 * t
+    return ((2 * t3 - 3 * t2 + 1) * y0 + (t3 - 2 * t2 + t) * h * m0
+            + (-2 * t3 + 3 * t2) * y1 + (t3 - t2) * h * m1)
+
+
+def lookup_cp(name, T):
+    """Cp (J/mol·K) at T (K); T may be a scalar or an array."""
+    return _hermite(get_table(name), T, _CP, _DCP)
+
+
+def lookup_h(name, T):
+    """Sensible enthalpy H(T) − H(298.15 K) in J/mol."""
+    return _hermite(get_table(name), T, _H, _CP)
+
+
+def lookup_s(name, T):
+    """Entropy S(T) in J/mol·K, relative to the species' S_ref at 298.15 K."""
+    return _hermite(get_table(name), T, _S, lambda tab, i: tab[i, _CP] / tab[i, _T])
+
+
+def lookup_delta_h(name, T1, T2, n_mol=1.0):
+    """ΔH between T1 and T2 in kJ, from two table lookups."""
+    return n_mol * (lookup_h(name, T2) - lookup_h(name, T1)) / 1000
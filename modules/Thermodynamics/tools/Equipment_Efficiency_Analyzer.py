@@ -1,11 +1,209 @@
+import numpy as np
+import pandas as pd
+
+from modules.Thermodynamics.core.efficiency import efficiency_percent
+
+CHUNK_ROWS = 1_000_000  # Rows read from the CSV per chunk
+CATEGORIES = ["Low", "Medium", "High"]
+HIST_EDGES = np.linspace(0, 150, 151)  # 1 % bins; values outside are clipped into the end bins
+MAX_ANOMALY_ROWS = 10_000  # Low-efficiency rows kept for display
+
+
+# ===== Vectorized Efficiency Engine =====
+def classify_efficiency(eff, high_thresh, med_thresh):
+    """Low / Medium / High categorical from fixed thresholds (NaN stays NaN)."""
+    return pd.cut(eff, bins=[-np.inf, med_thresh, high_thresh, np.inf], labels=CATEGORIES, right=False)
+
+
+def read_efficiency_chunks(source, input_col, output_col, time_col=None, equip_col=None, chunksize=CHUNK_ROWS):
+    """
+    Read only the needed columns, with float32 measurements and a categorical equipment ID.
+    """
+    usecols = [c for c in (input_col, output_col, time_col, equip_col) if c]
+    dtypes = {input_col: "float32", output_col: "float32"}
+    if equip_col:
+        dtypes[equip_col] = "category"
+    if hasattr(source, "seek"):
+        source.seek(0)
+    for chunk in pd.read_csv(source, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+        if time_col:
+            chunk[time_col] = pd.to_datetime(chunk[time_col], errors="coerce")
+        yield chunk
+
+
+def _merge_equipment(parts):
+    """Combine per-chunk partial aggregates (sums add, extremes take min / max)."""
+    merged = pd.concat(parts)
+    g = merged.groupby(level=0, observed=True, dropna=False)
+    sums = g.sum(numeric_only=True).drop(columns=["min", "max"])
+    sums["min"] = g["min"].min()
+    sums["max"] = g["max"].max()
+    return sums
+
+
+def analyze_efficiency(source, input_col, output_col, time_col=None, equip_col=None,
+                       high_thresh=90, med_thresh=70, anom_thresh=50, freq="1D", chunksize=CHUNK_ROWS):
+    """
+    Single pass over a (possibly multi-million-row) efficiency log.
+
+    Each chunk is reduced to mergeable partials: per-equipment count, sums,
+    extremes, category counts and least-squares trend sums, per (equipment,
+    time bucket) count and sum, and a fixed-bin histogram. Nothing
+    row-level is kept except up to MAX_ANOMALY_ROWS low-efficiency records.
+
+    Args:
+        source: CSV path or file-like object
+        input_col, output_col (str): Fuel input and energy output columns
+        time_col, equip_col (str or None): Optional timestamp and equipment ID columns
+        high_thresh, med_thresh (float): Category thresholds (%)
+        anom_thresh (float): Records below this efficiency (%) are anomalies
+        freq (str): Time bucket for trends, e.g. '1h', '1D', '7D'
+
+    Returns:
+        dict: overall stats, per-equipment summary, bucket trend table,
+        category counts, histogram and anomaly sample
+    """
+    equip_parts, bucket_parts, anomalies = [], [], []
+    hist = np.zeros(len(HIST_EDGES) - 1, dtype=np.int64)
+    n_anomalies = 0
+    t0 = None
+
+    for chunk in read_efficiency_chunks(source, input_col, output_col, time_col, equip_col, chunksize):
+        eff = efficiency_percent(chunk[input_col].to_numpy(), chunk[output_col].to_numpy())
+        valid = ~np.isnan(eff)
+        codes = classify_efficiency(eff, high_thresh, med_thresh).codes  # -1 for NaN
+        equip = chunk[equip_col] if equip_col else pd.Series("All", index=chunk.index, dtype="category")
+
+        e64 = eff.astype(np.float64)
+        frame = pd.DataFrame({
+            "equip": equip.to_numpy(),
+            "count": valid.astype(np.int64),
+            "sum": np.where(valid, e64, 0.0),
+            "sumsq": np.where(valid, e64 * e64, 0.0),
+            "min": e64,
+            "max": e64,
+            "Low": codes == 0,
+            "Medium": codes == 1,
+            "High": codes == 2,
+            "anomalies": valid & (eff < anom_thresh)
+        })
+
+        if time_col:
+            times = chunk[time_col]
+            has_time = times.notna().to_numpy() & valid
+            if t0 is None and has_time.any():
+                t0 = times[has_time].min()
+            # Days since the first timestamp; trend slope comes from Σt, Σt², Σe·t
+            t = np.where(has_time, (times - t0).dt.total_seconds().to_numpy() / 86400.0, 0.0) if t0 is not None \
+                else np.zeros(len(chunk))
+            frame["t_count"] = has_time.astype(np.int64)
+            frame["t_sum"] = t
+            frame["tt_sum"] = t * t
+            frame["te_sum"] = np.where(has_time, t * e64, 0.0)
+            frame["e_sum_timed"] = np.where(has_time, e64, 0.0)
+
+            buckets = pd.DataFrame({"equip": frame["equip"].to_numpy(), "bucket": times.dt.floor(freq).to_numpy(),
+                                    "count": frame["count"].to_numpy(), "sum": frame["sum"].to_numpy()})[has_time]
+            bucket_parts.append(buckets.groupby(["equip", "bucket"], observed=True, dropna=False).sum())
+
+        # dropna=False keeps rows without an equipment ID in the overall totals
+        equip_parts.append(frame.groupby("equip", observed=True, dropna=False).agg(
+            {c: ("min" if c == "min" else "max" if c == "max" else "sum") for c in frame.columns if c != "equip"}
+        ))
+
+        hist += np.histogram(np.clip(eff[valid], HIST_EDGES[0], HIST_EDGES[-1]), bins=HIST_EDGES)[0]
+
+        low_rows = np.flatnonzero(frame["anomalies"].to_numpy())
+        n_anomalies += low_rows.size
+        room = MAX_ANOMALY_ROWS - sum(len(a) for a in anomalies)
+        if room > 0 and low_rows.size:
+            sample = chunk.iloc[low_rows[:room]].copy()
+            sample["Efficiency (%)"] = eff[low_rows[:room]]
+            anomalies.append(sample)
+
+    if not equip_parts:
+        raise ValueError("The uploaded file has no rows.")
+
+    per_equip = _merge_equipment(equip_parts)
+    # Rows with a missing equipment ID count towards the overall stats only
+    identified = per_equip[per_equip.index.notna()]
+    count = identified["count"]
+    summary = pd.DataFrame({
+        "Records": count,
+        "Mean (%)": identified["sum"] / count,
+        "Std (%)": np.sqrt(np.maximum(identified["sumsq"] / count - (identified["sum"] / count) ** 2, 0)
+                           * count / np.maximum(count - 1, 1)),
+        "Min (%)": identified["min"],
+        "Max (%)": identified["max"],
+        "Low": identified["Low"],
+        "Medium": identified["Medium"],
+        "High": identified["High"],
+        "Anomalies": identified["anomalies"]
+    })
+    if time_col:
+        summary["Trend (%/day)"] = _slope(identified)
+
+    totals = per_equip.sum()
+    overall = {
+        "records": int(totals["count"]),
+        "mean": totals["sum"] / totals["count"] if totals["count"] else np.nan,
+        "min": per_equip["min"].min(),
+        "max": per_equip["max"].max(),
+        "trend": float(_slope(totals.to_frame().T).iloc[0]) if time_col else np.nan
+    }
+
+    trend = None
+    if bucket_parts:
+        trend = pd.concat(bucket_parts).groupby(level=[0, 1], observed=True, dropna=False).sum()
+        trend["Mean (%)"] = trend["sum"] / trend["count"]
+        trend = trend.reset_index().rename(columns={"equip": "Equipment", "bucket": "Bucket"})
+
+    return {
+        "overall": overall,
+        "summary": summary.rename_axis("Equipment"),
+        "trend": trend,
+        "categories": {c: int(totals[c]) for c in CATEGORIES},
+        "hist": hist,
+        "anomalies": pd.concat(anomalies, ignore_index=True) if anomalies else pd.DataFrame(),
+        "n_anomalies": n_anomalies
+    }
+
+
+def _slope(parts):
+    """Least-squares slope of efficiency vs. time (days) from accumulated sums."""
+    n = parts["t_count"]
+    denom = n * parts["tt_sum"] - parts["t_sum"] ** 2
+    slope = (n * parts["te_sum"] - parts["t_sum"] * parts["e_sum_timed"]) / denom
+    return slope.where(denom > 0)
+
+
+def build_efficiency_report(payload):
+    """Render the efficiency summary PDF from the report payload; returns bytes."""
+    from fpdf import FPDF
+    from modules.Thermodynamics.tools.report_service import pdf_bytes
+
+    cat_counts = payload["categories"]
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(200, 10, txt="Fuel Efficiency Report", ln=True, align="C")
+    pdf.set_font("Arial", size=12)
+
+    pdf.cell(200, 10, txt=f"Total Records: {payload['records']}", ln=True)
+    pdf.cell(200, 10, txt=f"Average Efficiency: {payload['mean']:.2f}%", ln=True)
+    pdf.cell(200, 10, txt=f"Max Efficiency: {payload['max']:.2f}%", ln=True)
+    pdf.cell(200, 10, txt=f"Min Efficiency: {payload['min']:.2f}%", ln=True)
+    pdf.cell(200, 10, txt=f"High Efficiency Records: {cat_counts.get('High', 0)}", ln=True)
+    pdf.cell(200, 10, txt=f"Medium Efficiency Records: {cat_counts.get('Medium', 0)}", ln=True)
+    pdf.cell(200, 10, txt=f"Low Efficiency Records: {cat_counts.get('Low', 0)}", ln=True)
+    return pdf_bytes(pdf)
+
+
 def Equipment_Efficiency_Analyzer():
     import streamlit as st
-    import pandas as pd
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-    from fpdf import FPDF
-    import base64
-    from io import BytesIO
+    import hashlib
+    from matplotlib.figure import Figure
+    from modules.Thermodynamics.tools import report_service
 
     # App Configuration
     st.set_page_config(page_title="🛢️ Fuel Efficiency Analyzer", layout="wide")
@@ -19,60 +217,57 @@ def Equipment_Efficiency_Analyzer():
     med_thresh = st.sidebar.slider("Medium Efficiency ≥", 50, high_thresh, 70)
     anom_thresh = st.sidebar.slider("⚠️ Anomaly Threshold (eff < X%)", 0, 70, 50)
 
-    if st.sidebar.checkbox("👁️ Show All Column Names"):
-        st.sidebar.text("📃 Available Columns:")
-        uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
-    else:
-        uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
+    uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
+
+    @st.cache_data(show_spinner=False)
+    def cached_analysis(digest, input_col, output_col, time_col, equip_col, high, med, anom, freq, _source):
+        return analyze_efficiency(_source, input_col, output_col, time_col, equip_col, high, med, anom, freq)
 
     if uploaded_file:
         try:
-            df = pd.read_csv(uploaded_file)
+            # Preview only; the full file is streamed in chunks below
+            preview = pd.read_csv(uploaded_file, nrows=1000)
             st.subheader("🔍 Raw Data Preview")
-            st.dataframe(df.head(), use_container_width=True)
+            st.dataframe(preview.head(), use_container_width=True)
+            if st.sidebar.checkbox("👁️ Show All Column Names"):
+                st.sidebar.text("📃 Available Columns:")
+                st.sidebar.write(list(preview.columns))
 
-            numeric_cols = df.select_dtypes(include=["float64", "int64"]).columns.tolist()
+            numeric_cols = preview.select_dtypes(include=["float64", "int64"]).columns.tolist()
             if len(numeric_cols) < 2:
                 st.warning("⚠️ Need at least two numeric columns for input/output.")
             else:
                 input_col = st.selectbox("🔌 Select Input Fuel Column", numeric_cols)
                 output_col = st.selectbox("⚡ Select Output Energy Column",
                                           [col for col in numeric_cols if col != input_col])
-                time_col = st.selectbox("🕒 Select Time Column (Optional)", ["None"] + list(df.columns))
-
-                # Efficiency calculation
-                df["Efficiency (%)"] = (df[output_col] / df[input_col]) * 100
-
-                def classify_eff(val):
-                    if val >= high_thresh:
-                        return "High"
-                    elif val >= med_thresh:
-                        return "Medium"
-                    else:
-                        return "Low"
+                time_col = st.selectbox("🕒 Select Time Column (Optional)", ["None"] + list(preview.columns))
+                other_cols = [c for c in preview.columns if c not in (input_col, output_col, time_col)]
+                equip_col = st.selectbox("🏭 Select Equipment ID Column (Optional)", ["None"] + other_cols)
+                freq = st.selectbox("🗓️ Trend Time Bucket", ["1h", "1D", "7D", "30D"], index=1)
+                time_col = None if time_col == "None" else time_col
+                equip_col = None if equip_col == "None" else equip_col
 
-                df["Category"] = df["Efficiency (%)"].apply(classify_eff)
-                anomalies = df[df["Efficiency (%)"] < anom_thresh]
+                digest = hashlib.md5(uploaded_file.getvalue()).hexdigest()
+                with st.spinner("Analyzing efficiency log..."):
+                    result = cached_analysis(digest, input_col, output_col, time_col, equip_col,
+                                             high_thresh, med_thresh, anom_thresh, freq, _source=uploaded_file)
+                overall = result["overall"]
+                cat_counts = result["categories"]
+                summary = result["summary"]
 
                 st.subheader("📈 Efficiency Statistics")
-                st.write(df[["Efficiency (%)", "Category"]].describe())
-
-                # Category counts
-                cat_counts = df["Category"].value_counts().to_dict()
+                st.dataframe(summary.style.format(precision=2), use_container_width=True)
 
                 st.markdown("#### 🔹 Efficiency Category Counts")
-                for cat, count in cat_counts.items():
-                    st.markdown(f"- **{cat}:** {count} records")
-
-                # Trend detection
-                if time_col != "None":
-                    try:
-                        df[time_col] = pd.to_datetime(df[time_col], errors="coerce")
-                        df_sorted = df.sort_values(by=time_col)
-                        trend = "📈 Increasing" if df_sorted["Efficiency (%)"].iloc[-1] > \
-                                                  df_sorted["Efficiency (%)"].iloc[0] else "📉 Decreasing"
-                        st.info(f"Efficiency Trend Over Time: **{trend}**")
-                    except:
+                for cat in reversed(CATEGORIES):
+                    st.markdown(f"- **{cat}:** {cat_counts[cat]} records")
+
+                # Trend detection (least-squares slope over the whole log)
+                if time_col:
+                    if np.isfinite(overall["trend"]):
+                        trend = "📈 Increasing" if overall["trend"] > 0 else "📉 Decreasing"
+                        st.info(f"Efficiency Trend Over Time: **{trend}** ({overall['trend']:+.3f} %/day)")
+                    else:
                         st.warning("⚠️ Time column could not be parsed for trend analysis.")
 
                 # Summary table
@@ -80,86 +275,87 @@ def Equipment_Efficiency_Analyzer():
                 summary_df = pd.DataFrame({
                     "Metric": ["Average", "Max", "Min"],
                     "Efficiency (%)": [
-                        f"{df['Efficiency (%)'].mean():.2f}",
-                        f"{df['Efficiency (%)'].max():.2f}",
-                        f"{df['Efficiency (%)'].min():.2f}"
+                        f"{overall['mean']:.2f}",
+                        f"{overall['max']:.2f}",
+                        f"{overall['min']:.2f}"
                     ]
                 })
                 st.table(summary_df)
 
-                # Visualizations
+                # Visualizations (from the pre-binned histogram and counts, not raw rows)
                 st.subheader("📊 Visualizations")
                 col1, col2 = st.columns(2)
 
                 with col1:
-                    fig1, ax1 = plt.subplots()
-                    sns.histplot(df["Efficiency (%)"], kde=True, ax=ax1, color="skyblue")
+                    fig1 = Figure()
+                    ax1 = fig1.subplots()
+                    ax1.bar(HIST_EDGES[:-1], result["hist"], width=np.diff(HIST_EDGES), align="edge", color="skyblue")
                     ax1.set_title("Efficiency Distribution")
+                    ax1.set_xlabel("Efficiency (%)")
                     st.pyplot(fig1)
 
                 with col2:
-                    pie_data = df["Category"].value_counts()
-                    fig2, ax2 = plt.subplots()
-                    ax2.pie(pie_data, labels=pie_data.index, autopct="%1.1f%%", colors=["green", "orange", "red"])
+                    pie_data = pd.Series(cat_counts)[["High", "Medium", "Low"]]
+                    pie_data = pie_data[pie_data > 0]
+                    fig2 = Figure()
+                    ax2 = fig2.subplots()
+                    colors = {"High": "green", "Medium": "orange", "Low": "red"}
+                    ax2.pie(pie_data, labels=pie_data.index, autopct="%1.1f%%",
+                            colors=[colors[c] for c in pie_data.index])
                     ax2.set_title("Efficiency Categories")
                     st.pyplot(fig2)
 
-                if time_col != "None":
-                    try:
-                        df[time_col] = pd.to_datetime(df[time_col])
-                        st.subheader("📈 Time Series Efficiency")
-                        smoothing = st.slider("🪄 Smooth (Moving Avg Window)", 1, 30, 1)
-
-                        fig3, ax3 = plt.subplots()
-                        if smoothing > 1:
-                            df["Smoothed"] = df["Efficiency (%)"].rolling(window=smoothing).mean()
-                            sns.lineplot(data=df, x=time_col, y="Efficiency (%)", ax=ax3, label="Actual")
-                            sns.lineplot(data=df, x=time_col, y="Smoothed", ax=ax3, label="Smoothed", color="orange")
-                        else:
-                            sns.lineplot(data=df, x=time_col, y="Efficiency (%)", ax=ax3)
-                        ax3.set_title("Efficiency Over Time")
-                        st.pyplot(fig3)
-                    except Exception as e:
-                        st.error(f"⏳ Time parsing failed: {e}")
+                if result["trend"] is not None and not result["trend"].empty:
+                    st.subheader("📈 Time Series Efficiency")
+                    smoothing = st.slider("🪄 Smooth (Moving Avg Window, buckets)", 1, 30, 1)
+                    trend_df = result["trend"]
+                    equipments = summary.index.tolist()
+                    shown = st.multiselect("🏭 Equipment to plot", equipments, default=equipments[:5])
+
+                    fig3 = Figure(figsize=(10, 4))
+                    ax3 = fig3.subplots()
+                    plant = trend_df.groupby("Bucket")[["count", "sum"]].sum()
+                    plant_mean = plant["sum"] / plant["count"]
+                    ax3.plot(plant_mean.index, plant_mean.rolling(smoothing, min_periods=1).mean(),
+                             color="black", linewidth=2, label="Plant")
+                    for name in shown:
+                        series = trend_df[trend_df["Equipment"] == name].set_index("Bucket")["Mean (%)"]
+                        ax3.plot(series.index, series.rolling(smoothing, min_periods=1).mean(), label=str(name))
+                    ax3.set_title(f"Efficiency Over Time ({freq} buckets)")
+                    ax3.set_ylabel("Efficiency (%)")
+                    ax3.legend()
+                    st.pyplot(fig3)
 
                 # Anomalies display
                 st.subheader(f"🚨 Low-Efficiency Records (< {anom_thresh}%)")
-                st.dataframe(anomalies)
+                if result["n_anomalies"] > len(result["anomalies"]):
+                    st.caption(f"Showing the first {len(result['anomalies']):,} of {result['n_anomalies']:,} records.")
+                st.dataframe(result["anomalies"])
 
                 # CSV Export
                 st.subheader("📥 Download Analyzed CSV")
-                csv = df.to_csv(index=False).encode("utf-8")
-                st.download_button("Download CSV", csv, file_name="efficiency_results.csv", mime="text/csv")
+                csv = summary.to_csv().encode("utf-8")
+                st.download_button("Download Per-Equipment Summary CSV", csv,
+                                   file_name="efficiency_results.csv", mime="text/csv")
+                if result["trend"] is not None:
+                    st.download_button("Download Trend CSV", result["trend"].to_csv(index=False).encode("utf-8"),
+                                       file_name="efficiency_trend.csv", mime="text/csv")
 
-                # PDF Export
+                # PDF Export (rendered in the background, cached per report contents)
                 st.subheader("📝 Download Efficiency Report (PDF)")
-                pdf = FPDF()
-                pdf.add_page()
-                pdf.set_font("Arial", "B", 16)
-                pdf.cell(200, 10, txt="Fuel Efficiency Report", ln=True, align="C")
-                pdf.set_font("Arial", size=12)
-
-                mean_eff = df["Efficiency (%)"].mean()
-                max_eff = df["Efficiency (%)"].max()
-                min_eff = df["Efficiency (%)"].min()
-                total = len(df)
-
-                pdf.cell(200, 10, txt=f"Total Records: {total}", ln=True)
-                pdf.cell(200, 10, txt=f"Average Efficiency: {mean_eff:.2f}%", ln=True)
-                pdf.cell(200, 10, txt=f"Max Efficiency: {max_eff:.2f}%", ln=True)
-                pdf.cell(200, 10, txt=f"Min Efficiency: {min_eff:.2f}%", ln=True)
-                pdf.cell(200, 10, txt=f"High Efficiency Records: {cat_counts.get('High', 0)}", ln=True)
-                pdf.cell(200, 10, txt=f"Medium Efficiency Records: {cat_counts.get('Medium', 0)}", ln=True)
-                pdf.cell(200, 10, txt=f"Low Efficiency Records: {cat_counts.get('Low', 0)}", ln=True)
-
-                pdf_buffer = BytesIO()
-                pdf.output(pdf_buffer)
-                b64_pdf = base64.b64encode(pdf_buffer.getvalue()).decode("utf-8")
-                href = f'<a href="data:application/pdf;base64,{b64_pdf}" download="fuel_efficiency_report.pdf">📄 Download PDF Report</a>'
-                st.markdown(href, unsafe_allow_html=True)
+                report_payload = {
+                    "records": overall["records"],
+                    "mean": float(overall["mean"]),
+                    "max": float(overall["max"]),
+                    "min": float(overall["min"]),
+                    "categories": cat_counts
+                }
+                report_service.download_report("📄 Download PDF Report", "equipment_efficiency",
+                                               build_efficiency_report, report_payload,
+                                               "fuel_efficiency_report.pdf")
 
         except Exception as e:
             st.error(f"❌ File loading failed: {e}")
 
 def run():
-    Equipment_Efficiency_Analyzer()
\ No newline at end of file
+    Equipment_Efficiency_Analyzer()
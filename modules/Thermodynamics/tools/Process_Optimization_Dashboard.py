@@ -3,6 +3,10 @@
 # 👨‍💻 Author: Ved Thakur (Improved)
 
 import streamlit as st
+import numpy as np
+import pandas as pd
+
+from modules.Thermodynamics.core.optimization import PARAM_BOUNDS, PARAM_NAMES, evaluate_parameters
 
 # ===== Constants =====
 OPTIMIZATION_TIPS = {
@@ -24,39 +28,175 @@ OPTIMIZATION_TIPS = {
     ]
 }
 
-# ===== Core Logic =====
-def evaluate_parameters(params):
+# Default value, step and help text of each parameter input; the limits come
+# from PARAM_BOUNDS (an int step gives an integer input)
+PARAM_INPUTS = {
+    "Temperature (°C)": (200, 1, "Optimal range is 150-250°C for catalyst activity."),
+    "Pressure (bar)": (3.0, 0.1, "Pressure affects reaction rate and energy consumption."),
+    "Flow Rate (m³/h)": (50, 1, "Maintain steady flow to avoid surges."),
+    "Catalyst Loading (kg)": (10, 1, "Optimize catalyst quantity to balance cost and yield.")
+}
+
+# ===== Surrogate Optimization =====
+def fit_surrogate(X, y, kind="Quadratic response surface"):
+    """
+    Fit a fast surrogate of the objective on historical runs.
+
+    Returns:
+        (model, cv_r2): Fitted sklearn estimator and its 5-fold CV R²
+    """
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+    from sklearn.linear_model import RidgeCV
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import cross_val_score
+
+    if kind == "Random forest":
+        model = RandomForestRegressor(n_estimators=200, min_samples_leaf=3, n_jobs=-1, random_state=42)
+    else:
+        model = make_pipeline(StandardScaler(), PolynomialFeatures(degree=2),
+                              RidgeCV(alphas=np.logspace(-3, 3, 13)))
+    cv_r2 = cross_val_score(model, X, y, cv=min(5, len(y)), scoring="r2").mean() if len(y) >= 10 else np.nan
+    model.fit(X, y)
+    return model, cv_r2
+
+
+def search_optimum(predict, bounds, maximize=True, batch_size=4096, n_rounds=8, elite_frac=0.02, seed=0):
     """
-    Evaluate process parameters against heuristic rules
-    and return a list of optimization suggestions.
+    Batched cross-entropy search of the surrogate inside box bounds.
+
+    The first batch is a scrambled Sobol design over the whole box; each later
+    batch is drawn from a Gaussian fitted to the previous round's elite
+    candidates and clipped to the bounds. Every batch is one vectorized
+    predict() call.
+
+    Args:
+        predict (callable): (n, d) array -> (n,) predicted objective
+        bounds (np.ndarray): (d, 2) lower / upper bounds
+        maximize (bool): Maximize (True) or minimize the objective
+
+    Returns:
+        (candidates, scores): All evaluated points and their predicted objective,
+        best first
     """
-    suggestions = []
-
-    temp = params["Temperature (°C)"]
-    if temp < 150:
-        suggestions.append("Increase temperature to improve reaction rate.")
-    elif temp > 250:
-        suggestions.append("Decrease temperature to avoid catalyst deactivation.")
-
-    pressure = params["Pressure (bar)"]
-    if pressure < 1:
-        suggestions.append("Increase pressure for better conversion.")
-    elif pressure > 5:
-        suggestions.append("Reduce pressure to save energy.")
-
-    flow = params["Flow Rate (m³/h)"]
-    if flow < 10:
-        suggestions.append("Increase flow rate to enhance throughput.")
-    elif flow > 100:
-        suggestions.append("Reduce flow rate to maintain control.")
-
-    catalyst = params["Catalyst Loading (kg)"]
-    if catalyst < 5:
-        suggestions.append("Add more catalyst to improve conversion.")
-    elif catalyst > 20:
-        suggestions.append("Reduce catalyst loading to lower costs.")
-
-    return suggestions
+    from scipy.stats import qmc
+
+    rng = np.random.default_rng(seed)
+    lo, hi = bounds[:, 0], bounds[:, 1]
+    sign = 1.0 if maximize else -1.0
+    n_elite = max(int(batch_size * elite_frac), 8)
+
+    batch = qmc.scale(qmc.Sobol(d=len(lo), scramble=True, seed=seed).random(batch_size), lo, hi)
+    all_x, all_y = [], []
+    for _ in range(n_rounds):
+        scores = np.asarray(predict(batch), dtype=np.float64)
+        all_x.append(batch)
+        all_y.append(scores)
+        elite = batch[np.argpartition(-sign * scores, n_elite - 1)[:n_elite]]
+        mean = elite.mean(axis=0)
+        # Keep some spread so the search does not collapse onto one point too early
+        std = np.maximum(elite.std(axis=0), 1e-3 * (hi - lo))
+        batch = np.clip(rng.normal(mean, std, size=(batch_size, len(lo))), lo, hi)
+
+    candidates = np.vstack(all_x)
+    scores = np.concatenate(all_y)
+    order = np.argsort(-sign * scores)
+    return candidates[order], scores[order]
+
+
+@st.cache_resource(show_spinner=False)
+def cached_surrogate(data_hash, kind, _X=None, _y=None):
+    return fit_surrogate(_X, _y, kind)
+
+
+@st.cache_data(show_spinner=False)
+def cached_search(data_hash, kind, maximize, bounds, _model=None):
+    candidates, scores = search_optimum(_model.predict, np.array(bounds), maximize)
+    return candidates[:200], scores[:200], len(scores)
+
+
+def surrogate_optimization_mode():
+    import hashlib
+
+    st.subheader("📈 Surrogate Optimization from Historical Runs")
+    st.markdown("Upload past runs with the four process parameters and an objective (e.g. yield). "
+                "A surrogate model is fitted once per dataset and searched within the parameter bounds.")
+    uploaded_file = st.file_uploader("📂 Upload Historical Runs (CSV)", type=["csv"])
+    if not uploaded_file:
+        return
+
+    try:
+        data = pd.read_csv(uploaded_file)
+        st.dataframe(data.head(), use_container_width=True)
+        numeric_cols = data.select_dtypes(include="number").columns.tolist()
+
+        # Map each parameter to a column (exact names are picked automatically)
+        col_map = {}
+        cols = st.columns(2)
+        for i, name in enumerate(PARAM_NAMES):
+            default = numeric_cols.index(name) if name in numeric_cols else min(i, len(numeric_cols) - 1)
+            col_map[name] = cols[i % 2].selectbox(f"Column for {name}", numeric_cols, index=default)
+        duplicates = sorted({c for c in col_map.values() if list(col_map.values()).count(c) > 1})
+        if duplicates:
+            st.warning(f"⚠️ Each parameter needs its own column; mapped more than once: {', '.join(duplicates)}")
+            return
+        remaining = [c for c in numeric_cols if c not in col_map.values()]
+        if not remaining:
+            st.warning("⚠️ Need an objective column besides the four parameters.")
+            return
+        objective = st.selectbox("🎯 Objective Column", remaining)
+        maximize = st.radio("Goal", ["Maximize", "Minimize"], horizontal=True) == "Maximize"
+        kind = st.selectbox("🧠 Surrogate Model", ["Quadratic response surface", "Random forest"])
+        observed_only = st.checkbox("Stay within the range of the historical data", value=True)
+
+        runs = data[list(col_map.values()) + [objective]].dropna()
+        if len(runs) < 10:
+            st.warning("⚠️ Need at least 10 complete runs to fit a surrogate.")
+            return
+        X = runs[list(col_map.values())].to_numpy(dtype=np.float64)
+        y = runs[objective].to_numpy(dtype=np.float64)
+
+        bounds = np.array([PARAM_BOUNDS[name] for name in PARAM_NAMES])
+        if observed_only:
+            bounds[:, 0] = np.maximum(bounds[:, 0], X.min(axis=0))
+            bounds[:, 1] = np.minimum(bounds[:, 1], X.max(axis=0))
+        if np.any(bounds[:, 0] > bounds[:, 1]):
+            st.error("❌ The historical data lies entirely outside the allowed parameter bounds.")
+            return
+
+        data_hash = hashlib.md5(np.ascontiguousarray(np.column_stack([X, y])).tobytes()).hexdigest()
+        with st.spinner("Fitting surrogate..."):
+            model, cv_r2 = cached_surrogate(data_hash, kind, _X=X, _y=y)
+        with st.spinner("Searching parameter space..."):
+            top_x, top_y, n_evaluated = cached_search(data_hash, kind, maximize,
+                                                      tuple(map(tuple, bounds)), _model=model)
+
+        best = dict(zip(PARAM_NAMES, top_x[0]))
+        observed_best = y.max() if maximize else y.min()
+        col1, col2, col3 = st.columns(3)
+        col1.metric(f"🎯 Predicted {objective}", f"{top_y[0]:.3f}")
+        col2.metric("📜 Best Historical", f"{observed_best:.3f}")
+        col3.metric("🧪 Surrogate CV R²", "n/a" if np.isnan(cv_r2) else f"{cv_r2:.2f}")
+        st.caption(f"{n_evaluated:,} candidates evaluated in vectorized batches.")
+
+        st.subheader("✅ Suggested Operating Point")
+        st.table(pd.DataFrame({"Parameter": PARAM_NAMES,
+                               "Suggested": [f"{v:.2f}" for v in top_x[0]],
+                               "Search Range": [f"{lo:g} – {hi:g}" for lo, hi in bounds]}))
+        for suggestion in evaluate_parameters(best):
+            st.info(f"⚠️ Rule check: {suggestion}")
+
+        with st.expander("🔝 Top Candidates"):
+            top = pd.DataFrame(top_x[:20], columns=PARAM_NAMES)
+            top[f"Predicted {objective}"] = top_y[:20]
+            st.dataframe(top.round(3), use_container_width=True)
+
+        st.download_button("📥 Download Suggested Settings",
+                           data=pd.Series(best).to_csv(header=["Suggested"]),
+                           file_name="surrogate_optimum.csv", mime="text/csv")
+    except Exception as e:
+        st.error(f"❌ Optimization failed: {e}")
+
 
 # ===== UI Helper Functions =====
 def display_general_tips():
@@ -81,34 +221,23 @@ def process_optimization_dashboard():
 
     create_reset_button()
 
+    mode = st.radio("🧭 Mode", ["💡 Rule-Based Suggestions", "📈 Surrogate Optimization"], horizontal=True)
+    if mode == "📈 Surrogate Optimization":
+        surrogate_optimization_mode()
+        return
+
     st.subheader("⚙️ Input Process Parameters")
 
     # Use columns for compact layout
     col1, col2 = st.columns(2)
 
     params = {}
-    with col1:
-        params["Temperature (°C)"] = st.number_input(
-            label="Temperature (°C)",
-            min_value=0, max_value=500, value=200, step=1,
-            help="Optimal range is 150-250°C for catalyst activity."
-        )
-        params["Pressure (bar)"] = st.number_input(
-            label="Pressure (bar)",
-            min_value=0.1, max_value=10.0, value=3.0, step=0.1,
-            help="Pressure affects reaction rate and energy consumption."
-        )
-    with col2:
-        params["Flow Rate (m³/h)"] = st.number_input(
-            label="Flow Rate (m³/h)",
-            min_value=1, max_value=200, value=50, step=1,
-            help="Maintain steady flow to avoid surges."
-        )
-        params["Catalyst Loading (kg)"] = st.number_input(
-            label="Catalyst Loading (kg)",
-            min_value=1, max_value=50, value=10, step=1,
-            help="Optimize catalyst quantity to balance cost and yield."
-        )
+    for i, name in enumerate(PARAM_NAMES):
+        default, step, help_text = PARAM_INPUTS[name]
+        lo, hi = (type(step)(b) for b in PARAM_BOUNDS[name])
+        with (col1 if i < 2 else col2):
+            params[name] = st.number_input(label=name, min_value=lo, max_value=hi, value=default, step=step,
+                                           help=help_text)
 
     # Validate inputs (basic check)
     if any(v is None for v in params.values()):
@@ -1,90 +1,97 @@
 # tools/combustion.py
+# Streamlit UI over the combustion kernels in core/combustion.py (pure NumPy)
 
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-
-# === CONSTANTS ===
-
-CALORIFIC_VALUES = {
-    "Methane (CH4)": 802.3,
-    "Propane (C3H8)": 2043.0,
-    "Octane (C8H18)": 5470.0,
-    "Hydrogen (H2)": 286.0,
-    "Carbon Monoxide (CO)": 283.0
-}
-
-STOICH_AFR = {
-    "Methane (CH4)": 17.2,
-    "Propane (C3H8)": 15.7,
-    "Octane (C8H18)": 15.1,
-    "Hydrogen (H2)": 34.3,
-    "Carbon Monoxide (CO)": 2.4
-}
-
-MOLAR_MASS = {
-    "Methane (CH4)": 16.04,
-    "Propane (C3H8)": 44.1,
-    "Octane (C8H18)": 114.2,
-    "Hydrogen (H2)": 2.02,
-    "Carbon Monoxide (CO)": 28.0
-}
+
+from modules.Thermodynamics.core import combustion as core
+from modules.Thermodynamics.core.combustion import (
+    CALORIFIC_VALUES, STOICH_AFR, MOLAR_MASS,
+    efficiency_kernel, convert_flow_rate_array, response_surface
+)
 
 # === FUNCTIONS ===
 
 def get_calorific_value(fuel_name: str) -> float:
-    return CALORIFIC_VALUES.get(fuel_name, 0.0)
+    return core.calorific_value(fuel_name)
 
 def get_stoich_afr(fuel_name: str) -> float:
-    return STOICH_AFR.get(fuel_name, 14.7)
+    return core.stoich_afr(fuel_name)
 
 def get_molar_mass(fuel_name: str) -> float:
-    return MOLAR_MASS.get(fuel_name, 18.0)
+    return core.molar_mass(fuel_name)
 
 def combustion_efficiency(air_fuel_ratio: float, fuel_name: str) -> float:
-    stoich_afr = get_stoich_afr(fuel_name)
-    if air_fuel_ratio <= 0 or stoich_afr <= 0:
-        return 0.0
-    efficiency = np.exp(-((air_fuel_ratio - stoich_afr) ** 2) / (2 * (stoich_afr * 0.2) ** 2)) * 100
-    return round(efficiency, 2)
+    return round(float(efficiency_kernel(air_fuel_ratio, get_stoich_afr(fuel_name))), 2)
 
 def heat_output(fuel_flow_rate_mol: float, fuel_name: str) -> float:
     calorific_value = get_calorific_value(fuel_name)
     return round(fuel_flow_rate_mol * calorific_value, 2)
 
 def convert_flow_rate(value: float, from_unit: str, fuel_name: str) -> float:
-    molar_mass = get_molar_mass(fuel_name)
-    if from_unit == "kg/h":
-        return (value * 1000) / 3600 / molar_mass
-    elif from_unit == "kg/s":
-        return (value * 1000) / molar_mass
-    else:
-        return value  # assume mol/s
+    return float(convert_flow_rate_array(value, from_unit, get_molar_mass(fuel_name)))
 
 def simulate_combustion(fuel_name, afr, fuel_flow_rate, flow_unit):
-    fuel_flow_mol_s = convert_flow_rate(fuel_flow_rate, flow_unit, fuel_name)
-    heat_release = heat_output(fuel_flow_mol_s, fuel_name)
-    efficiency = combustion_efficiency(afr, fuel_name)
-    useful_energy = round((efficiency / 100) * heat_release, 2)
-    waste_energy = round(heat_release - useful_energy, 2)
-
-    return {
-        "Fuel": fuel_name,
-        "AFR": afr,
-        "Stoichiometric AFR": get_stoich_afr(fuel_name),
-        "Calorific Value (kJ/mol)": get_calorific_value(fuel_name),
-        "Fuel Flow Rate (mol/s)": fuel_flow_mol_s,
-        "Total Heat Released (kJ/s)": heat_release,
-        "Combustion Efficiency (%)": efficiency,
-        "Useful Energy (kJ/s)": useful_energy,
-        "Heat Loss (kJ/s)": waste_energy
-    }
+    """One operating point as a dict of plain Python values."""
+    result = core.simulate_combustion(fuel_name, afr, fuel_flow_rate, flow_unit)
+    result = {key: value.item() for key, value in result.items()}
+    result["AFR"] = afr
+    return result
+
+def simulate_combustion_batch(points: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorized simulate_combustion over many operating points.
+
+    `points` needs columns Fuel, AFR, Fuel Flow Rate and Flow Unit (one row per
+    operating point). Returns a DataFrame with the same columns as
+    simulate_combustion, one row per input row, rounded the same way.
+    """
+    required = ["Fuel", "AFR", "Fuel Flow Rate", "Flow Unit"]
+    missing = [c for c in required if c not in points.columns]
+    if missing:
+        raise ValueError(f"Missing columns for batch simulation: {missing}")
+
+    result = core.simulate_combustion(points["Fuel"].to_numpy(), points["AFR"].to_numpy(dtype=np.float64),
+                                      points["Fuel Flow Rate"].to_numpy(), points["Flow Unit"].to_numpy())
+    return pd.DataFrame(result, index=points.index)
 
 def generate_efficiency_curve(fuel_name, afr_range=(5, 40), points=100):
-    afrs = np.linspace(*afr_range, points)
-    efficiencies = [combustion_efficiency(afr, fuel_name) for afr in afrs]
-    return afrs, efficiencies
+    return core.efficiency_curve(fuel_name, afr_range, points)
+
+# === ML EFFICIENCY MODELS ===
+# ai_model/model.pkl: random forest of efficiency (%) on Fuel, AFR, Temperature (K)
+# and Pressure (bar), trained on AFR 5-40, 300-1500 K and 0.5-5 bar
+EFFICIENCY_MODEL = "combustion_efficiency_rf"
+CALIBRATION_MODEL = "combustion_efficiency_calibration"
+ML_FEATURES = ["Fuel", "AFR", "Temperature", "Pressure"]
+CALIBRATION_FEATURES = ["AFR", "Temperature", "Pressure"]
+
+def load_efficiency_model():
+    """The packaged efficiency model, imported into and served from the model registry."""
+    import model_registry
+    version = model_registry.import_legacy_model(EFFICIENCY_MODEL, feature_names=ML_FEATURES)
+    return model_registry.load_model(EFFICIENCY_MODEL, version)
+
+def calibrate_efficiency_model(measured: pd.DataFrame, fuel_name: str, model_type: str = "LinearRegression"):
+    """
+    Impute / scale / regress pipeline (train_model.py) of measured efficiency for one fuel,
+    trained once per dataset and reused from the model registry afterwards.
+    """
+    from train_model import train_or_reuse
+
+    missing = [c for c in CALIBRATION_FEATURES + ["Efficiency"] if c not in measured.columns]
+    if missing:
+        raise ValueError(f"Missing columns for calibration: {missing}")
+    rows = measured[measured["Fuel"] == fuel_name] if "Fuel" in measured.columns else measured
+    rows = rows.dropna(subset=["Efficiency"])
+    if len(rows) < len(CALIBRATION_FEATURES) + 2:
+        raise ValueError(f"Need at least {len(CALIBRATION_FEATURES) + 2} measured rows for {fuel_name}.")
+    return train_or_reuse(rows[CALIBRATION_FEATURES], rows["Efficiency"],
+                          f"{CALIBRATION_MODEL}_{_slug(fuel_name)}", model_type=model_type)
+
+def _slug(text: str) -> str:
+    return "_".join("".join(ch if ch.isalnum() else " " for ch in text).lower().split())
 
 # === STREAMLIT UI ===
 
@@ -102,9 +109,12 @@ def run():
         st.subheader("🔍 Simulation Results")
         st.dataframe(pd.DataFrame([results]))
 
+        from matplotlib.figure import Figure
+
         st.subheader("📉 Efficiency Curve")
         x, y = generate_efficiency_curve(fuel)
-        fig, ax = plt.subplots()
+        fig = Figure()
+        ax = fig.subplots()
         ax.plot(x, y, label="Efficiency (%)", color="green")
         ax.axvline(get_stoich_afr(fuel), color="red", linestyle="--", label="Stoich AFR")
         ax.set_xlabel("AFR")
@@ -114,3 +124,59 @@ def run():
         st.pyplot(fig)
 
         st.download_button("📥 Download CSV", pd.DataFrame([results]).to_csv(index=False), "combustion_results.csv")
+
+    # === ML EFFICIENCY ESTIMATE ===
+    with st.expander("🤖 ML Efficiency Estimate"):
+        col1, col2 = st.columns(2)
+        temperature = col1.number_input("Temperature (K)", min_value=300.0, max_value=1500.0, value=800.0, step=10.0)
+        pressure = col2.number_input("Pressure (bar)", min_value=0.5, max_value=5.0, value=1.0, step=0.1)
+        point = pd.DataFrame([[fuel, afr, temperature, pressure]], columns=ML_FEATURES)
+        try:
+            model, meta = load_efficiency_model()
+            st.metric("Predicted Efficiency (%)", f"{model.predict(point)[0]:.2f}")
+            st.caption(f"Random forest from `ai_model/model.pkl`, registry version v{meta['version']}.")
+        except FileNotFoundError:
+            st.warning("⚠️ `ai_model/model.pkl` was not found.")
+
+        st.markdown("**Calibrate on measured data**")
+        st.caption("Upload measurements with columns `AFR`, `Temperature`, `Pressure`, `Efficiency` "
+                   "(and optionally `Fuel`); rows of the selected fuel are fitted.")
+        measured_file = st.file_uploader("📂 Upload measured efficiencies (.csv)", type=["csv"], key="calibration_csv")
+        if measured_file:
+            model_type = st.selectbox("Regressor", ["LinearRegression", "Ridge"])
+            try:
+                calibrated, cal_meta = calibrate_efficiency_model(pd.read_csv(measured_file), fuel, model_type)
+                st.metric("Calibrated Efficiency (%)", f"{calibrated.predict(point[CALIBRATION_FEATURES])[0]:.2f}")
+                st.caption(f"Registry version v{cal_meta['version']}, "
+                           f"training R² {cal_meta['metrics']['train_r2']:.3f}.")
+            except Exception as e:
+                st.error(f"❌ Calibration failed: {e}")
+
+    # === FLEET BATCH MODE ===
+    st.markdown("---")
+    st.subheader("🏭 Fleet Batch Mode")
+    st.caption("Upload operating points with columns `Fuel`, `AFR`, `Fuel Flow Rate`, `Flow Unit`.")
+    batch_file = st.file_uploader("📂 Upload operating points (.csv)", type=["csv"])
+    if batch_file:
+        try:
+            batch = simulate_combustion_batch(pd.read_csv(batch_file))
+            st.success(f"✅ Simulated {len(batch):,} operating points")
+            st.dataframe(batch.head(100))
+            st.download_button("📥 Download Batch Results", batch.to_csv(index=False), "combustion_batch_results.csv")
+        except Exception as e:
+            st.error(f"❌ Batch simulation failed: {e}")
+
+    if st.checkbox("🗺️ Show AFR × Flow Response Surface"):
+        from matplotlib.figure import Figure
+
+        afr_grid = np.linspace(5, 40, 200)
+        flow_grid = np.linspace(0.1, max(flow_value, 0.1) * 2, 200)
+        _, useful = response_surface(fuel, afr_grid, flow_grid, flow_unit)
+        fig = Figure()
+        ax = fig.subplots()
+        mesh = ax.pcolormesh(flow_grid, afr_grid, useful, shading="auto", cmap="viridis")
+        fig.colorbar(mesh, ax=ax, label="Useful Energy (kJ/s)")
+        ax.set_xlabel(f"Fuel Flow Rate ({flow_unit})")
+        ax.set_ylabel("AFR")
+        ax.set_title(f"Response Surface for {fuel}")
+        st.pyplot(fig)
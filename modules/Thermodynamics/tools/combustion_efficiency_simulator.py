@@ -5,24 +5,95 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+
+from modules.Thermodynamics.core.combustion import STOICH_AFR, WIDTH_FACTOR, efficiency_kernel, stoich_afr
 
 # ===== Constants =====
-FUEL_OPTIONS = ["Methane (CH4)", "Propane (C3H8)", "Octane (C8H18)", "Hydrogen (H2)", "Carbon Monoxide (CO)"]
+FUEL_OPTIONS = list(STOICH_AFR)
 
-STOICH_AFR = {
-    "Methane (CH4)": 17.2,
-    "Propane (C3H8)": 15.7,
-    "Octane (C8H18)": 15.1,
-    "Hydrogen (H2)": 34.3,
-    "Carbon Monoxide (CO)": 2.4
-}
+AFR_MIN, AFR_MAX = 5.0, 50.0
+GRID_POINTS = 100_000  # AFR grid resolution for the multi-fuel comparison
+PLOT_POINTS = 1_000    # Points actually drawn per curve (the curves are smooth)
 
 # ===== Core Thermodynamic Simulation =====
-def compute_efficiency(fuel: str, afr: float) -> float:
-    afr_opt = STOICH_AFR.get(fuel, 15.0)
-    efficiency = np.exp(-((afr - afr_opt) ** 2) / (2 * (afr_opt * 0.2) ** 2)) * 100
-    return round(efficiency, 2)
+def _stoich(fuel):
+    """Stoichiometric AFR for one fuel name or an array of names (unknown fuels use 15.0)."""
+    return stoich_afr(fuel, default=15.0)
+
+
+def compute_efficiency(fuel, afr):
+    """
+    Gaussian efficiency proxy (%) around the stoichiometric AFR.
+
+    Array-native: `fuel` and `afr` broadcast against each other. A scalar
+    call returns a float rounded to 2 decimals, as before.
+    """
+    efficiency = efficiency_kernel(afr, _stoich(fuel))
+    if np.ndim(efficiency) == 0:
+        return round(float(efficiency), 2)
+    return efficiency
+
+
+def efficiency_grid(fuels, afr_grid):
+    """All fuels × all AFRs in one broadcast call; returns (n_fuels, n_afr)."""
+    return compute_efficiency(np.asarray(fuels)[:, None], np.asarray(afr_grid)[None, :])
+
+
+def optimum_afr(fuel, afr_min=AFR_MIN, afr_max=AFR_MAX):
+    """
+    Analytic optimum: the Gaussian peaks at the stoichiometric AFR, so the best
+    AFR in [afr_min, afr_max] is the stoichiometric AFR clipped to that range.
+    """
+    best = np.clip(_stoich(fuel), afr_min, afr_max)
+    return best, compute_efficiency(fuel, best)
+
+
+def efficiency_window(fuel, target=90.0):
+    """AFR interval where efficiency ≥ target %: stoich ± σ·sqrt(2·ln(100 / target))."""
+    afr_opt = _stoich(fuel)
+    half_width = afr_opt * WIDTH_FACTOR * np.sqrt(2 * np.log(100.0 / target))
+    return afr_opt - half_width, afr_opt + half_width
+
+
+@st.cache_data(show_spinner=False)
+def efficiency_curve(fuel, n_points=PLOT_POINTS):
+    """Cached per fuel; AFR changes only move the marker line."""
+    afr_range = np.linspace(AFR_MIN, AFR_MAX, n_points)
+    return afr_range, compute_efficiency(fuel, afr_range)
+
+
+@st.cache_data(show_spinner=False)
+def fuel_comparison(fuels, n_points=GRID_POINTS):
+    """Efficiency of every fuel on a fine AFR grid, plus grid and analytic optima."""
+    afr_grid = np.linspace(AFR_MIN, AFR_MAX, n_points)
+    grid = efficiency_grid(list(fuels), afr_grid)
+    best_afr, best_eff = optimum_afr(np.array(fuels))
+    lo, hi = efficiency_window(np.array(fuels))
+    summary = pd.DataFrame({
+        "Fuel": fuels,
+        "Optimum AFR (analytic)": best_afr,
+        "Peak Efficiency (%)": best_eff,
+        "Optimum AFR (grid)": afr_grid[grid.argmax(axis=1)],
+        "≥90% Window Low": lo,
+        "≥90% Window High": hi
+    })
+    return afr_grid, grid, summary
+
+
+def plot_curves(afr_grid, curves, labels, afr):
+    from matplotlib.figure import Figure
+
+    step = max(len(afr_grid) // PLOT_POINTS, 1)
+    fig = Figure()
+    ax = fig.subplots()
+    for curve, label in zip(curves, labels):
+        ax.plot(afr_grid[::step], curve[::step], label=label)
+    ax.axvline(x=afr, color='red', linestyle='--', label="Your AFR")
+    ax.set_xlabel("Air-Fuel Ratio (AFR)")
+    ax.set_ylabel("Efficiency (%)")
+    ax.legend()
+    ax.grid(True)
+    return fig, ax
 
 # ===== Streamlit App =====
 def combustion_efficiency_simulator():
@@ -32,25 +103,33 @@ def combustion_efficiency_simulator():
 
     # Sidebar: Inputs
     st.sidebar.header("🔧 Input Parameters")
+    mode = st.sidebar.radio("Mode", ["🔬 Single Fuel", "⚖️ Compare All Fuels"])
+    afr = st.sidebar.slider("Air-Fuel Ratio (AFR)", min_value=AFR_MIN, max_value=AFR_MAX, value=15.0, step=0.1)
+
+    if mode == "⚖️ Compare All Fuels":
+        afr_grid, grid, summary = fuel_comparison(tuple(FUEL_OPTIONS))
+        summary["Efficiency at Your AFR (%)"] = compute_efficiency(np.array(FUEL_OPTIONS), afr)
+        st.subheader("📊 Multi-Fuel Comparison")
+        st.caption(f"{len(FUEL_OPTIONS)} fuels × {len(afr_grid):,} AFR points evaluated in one vectorized call.")
+        st.dataframe(summary.round(2), use_container_width=True)
+        fig, ax = plot_curves(afr_grid, grid, FUEL_OPTIONS, afr)
+        ax.set_title("Efficiency vs AFR for All Fuels")
+        st.pyplot(fig)
+        return
+
     fuel = st.sidebar.selectbox("Select Fuel Type", FUEL_OPTIONS)
-    afr = st.sidebar.slider("Air-Fuel Ratio (AFR)", min_value=5.0, max_value=50.0, value=15.0, step=0.1)
 
     # Output: Thermodynamics Simulation
     eff = compute_efficiency(fuel, afr)
+    best_afr, best_eff = optimum_afr(fuel)
     st.subheader("📊 Thermodynamic Simulation Result")
     st.success(f"Estimated Combustion Efficiency: **{eff}%**")
+    st.info(f"Optimum AFR: **{float(best_afr):.2f}** ({float(best_eff):.2f}% efficiency)")
 
-    # Efficiency Curve Plot
-    afr_range = np.linspace(5, 50, 300)
-    efficiency_curve = [compute_efficiency(fuel, x) for x in afr_range]
-    fig, ax = plt.subplots()
-    ax.plot(afr_range, efficiency_curve, color='blue', label="Efficiency Curve")
-    ax.axvline(x=afr, color='red', linestyle='--', label="Your AFR")
-    ax.set_xlabel("Air-Fuel Ratio (AFR)")
-    ax.set_ylabel("Efficiency (%)")
+    # Efficiency Curve Plot (curve cached per fuel)
+    afr_range, efficiency_curve_values = efficiency_curve(fuel)
+    fig, ax = plot_curves(afr_range, [efficiency_curve_values], ["Efficiency Curve"], afr)
     ax.set_title(f"Efficiency vs AFR for {fuel}")
-    ax.legend()
-    ax.grid(True)
     st.pyplot(fig)
 
 def run():
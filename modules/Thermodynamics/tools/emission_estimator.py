@@ -4,7 +4,11 @@
 
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
+import hashlib
+
+CHUNK_ROWS = 2_000_000  # Rows per chunk when aggregating uploaded meter data
+PERIODS = {"Hour": "h", "Day": "D", "Week": "W", "Month": "M", "Year": "Y"}
 
 # ===== Constants =====
 @st.cache_data
@@ -15,11 +19,115 @@ def get_emission_factors():
     })
 
 # ===== Utility Functions =====
-def calculate_emissions_row(row):
-    return row["Consumption"] * row["Emission Factor (kg CO₂/unit)"]
+def calculate_emissions(df):
+    return df["Consumption"] * df["Emission Factor (kg CO₂/unit)"]
+
+
+def _source_key(name):
+    """'Natural Gas [m³]', 'natural gas' and ' NATURAL GAS ' all match the same factor."""
+    return str(name).split("[")[0].strip().lower()
+
+
+def factor_lookup(source_names, factors):
+    """
+    Map source names to rows of the factor table.
+
+    Returns:
+        np.ndarray: Factor-table row index per name, -1 where no factor is known
+    """
+    index = {_source_key(n): i for i, n in enumerate(factors["Energy Source"])}
+    return np.array([index.get(_source_key(n), -1) for n in source_names], dtype=np.int64)
+
+
+def aggregate_emissions(source, time_col, site_col, source_col, value_col, period="Month",
+                        factors=None, chunksize=CHUNK_ROWS):
+    """
+    Join long-format meter readings to the emission factors and roll them up
+    by site, energy source and period, in chunked passes.
+
+    The join happens on the categorical codes: each chunk's (few) distinct
+    source names are looked up once and the factor array is indexed by code.
+    Site, source and period are folded into one integer key per row and the
+    observed keys are factorized, so the per-chunk rollup is a single
+    np.bincount sized by the groups present (a stray timestamp decades off
+    adds one group, not a dense span of empty periods).
+
+    Args:
+        source: CSV path or file-like object (one reading per row)
+        time_col, site_col, source_col, value_col (str): Column names
+        period (str): 'Hour', 'Day', 'Week', 'Month' or 'Year'
+        factors (pd.DataFrame): Emission factor table (default: get_emission_factors())
+
+    Returns:
+        (pd.DataFrame, dict): Rollup (Period, Site, Energy Source, Consumption,
+        CO₂ Emissions (kg), Readings) and counts of unmatched / unparsed rows
+    """
+    factors = get_emission_factors() if factors is None else factors
+    factor_values = factors["Emission Factor (kg CO₂/unit)"].to_numpy(dtype=np.float64)
+    n_src = len(factors)
+    freq = PERIODS[period]
+    site_ids = {}
+    parts = []
+    skipped = {"unknown_source": 0, "bad_time": 0}
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+    reader = pd.read_csv(source, usecols=[time_col, site_col, source_col, value_col], chunksize=chunksize,
+                         dtype={site_col: "category", source_col: "category", value_col: "float32"})
+    for chunk in reader:
+        times = pd.to_datetime(chunk[time_col], errors="coerce")
+        src_cat = chunk[source_col].cat
+        src_idx = factor_lookup(src_cat.categories, factors)[src_cat.codes]
+        src_idx[src_cat.codes.to_numpy() < 0] = -1
+
+        site_cat = chunk[site_col].cat
+        site_map = np.array([site_ids.setdefault(c, len(site_ids)) for c in site_cat.categories], dtype=np.int64)
+        site_idx = site_map[site_cat.codes] if len(site_map) else np.zeros(len(chunk), dtype=np.int64)
+        site_idx[site_cat.codes.to_numpy() < 0] = -1
+
+        ok_time = times.notna().to_numpy()
+        ok = ok_time & (src_idx >= 0) & (site_idx >= 0)
+        skipped["bad_time"] += int((~ok_time).sum())
+        skipped["unknown_source"] += int((ok_time & (src_idx < 0)).sum())
+        if not ok.any():
+            continue
+
+        ordinals = times[ok].dt.to_period(freq).array.asi8
+        site_idx, src_idx = site_idx[ok], src_idx[ok]
+        values = chunk[value_col].to_numpy(dtype=np.float64)[ok]
+        values = np.nan_to_num(values)
+        periods, period_idx = np.unique(ordinals, return_inverse=True)
+        n_sites = len(site_ids)
+
+        # One flat key per row: (period, site, source), factorized to dense group ids
+        key = (period_idx * n_sites + site_idx) * n_src + src_idx
+        used, group = np.unique(key, return_inverse=True)
+        counts = np.bincount(group)
+        consumption = np.bincount(group, weights=values)
+        emissions = np.bincount(group, weights=values * factor_values[src_idx])
+
+        period_g, rest = np.divmod(used, n_sites * n_src)
+        site_g, src_g = np.divmod(rest, n_src)
+        parts.append(pd.DataFrame({"period": periods[period_g], "site": site_g, "src": src_g,
+                                   "Consumption": consumption, "CO₂ Emissions (kg)": emissions,
+                                   "Readings": counts}))
+
+    if not parts:
+        return pd.DataFrame(columns=["Period", "Site", "Energy Source", "Consumption",
+                                     "CO₂ Emissions (kg)", "Readings"]), skipped
+
+    rollup = pd.concat(parts, ignore_index=True).groupby(["period", "site", "src"], sort=True).sum().reset_index()
+    site_names = np.array(list(site_ids.keys()), dtype=object)
+    rollup.insert(0, "Period", pd.PeriodIndex.from_ordinals(rollup.pop("period"), freq=freq).astype(str))
+    rollup.insert(1, "Site", site_names[rollup.pop("site")])
+    rollup.insert(2, "Energy Source", factors["Energy Source"].to_numpy()[rollup.pop("src")])
+    return rollup, skipped
 
 def plot_emissions(df):
-    fig, ax = plt.subplots(figsize=(8, 4))
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
     ax.bar(df["Energy Source"], df["CO₂ Emissions (kg)"], color='orange')
     total = df["CO₂ Emissions (kg)"].sum()
     for i, value in enumerate(df["CO₂ Emissions (kg)"]):
@@ -28,9 +136,94 @@ def plot_emissions(df):
     ax.set_xlabel("Energy Source")
     ax.set_ylabel("CO₂ Emissions (kg)")
     ax.set_title("Emission Contribution by Source")
-    plt.xticks(rotation=30, ha='right')
+    ax.tick_params(axis='x', labelrotation=30)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
     st.pyplot(fig)
 
+def plot_site_totals(by_site):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    by_site.plot(kind="bar", stacked=True, ax=ax)
+    ax.set_xlabel("Site")
+    ax.set_ylabel("CO₂ Emissions (tonnes)")
+    ax.set_title("Emissions by Site and Source")
+    ax.tick_params(axis='x', labelrotation=30)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+    st.pyplot(fig)
+
+
+# ===== Multi-Site Upload Mode =====
+@st.cache_data(show_spinner=False)
+def cached_rollup(digest, time_col, site_col, source_col, value_col, period, _source=None):
+    return aggregate_emissions(_source, time_col, site_col, source_col, value_col, period)
+
+
+def multi_site_mode():
+    st.subheader("📂 Upload Metered Consumption")
+    st.markdown("Long format: one row per reading with a timestamp, site, energy source and consumption. "
+                "Source names must match the factor table (units in brackets are optional).")
+    st.dataframe(get_emission_factors(), use_container_width=True)
+
+    uploaded_file = st.file_uploader("Upload CSV", type=["csv"])
+    if not uploaded_file:
+        return
+
+    try:
+        preview = pd.read_csv(uploaded_file, nrows=1000)
+        st.dataframe(preview.head(), use_container_width=True)
+        cols = list(preview.columns)
+
+        def guess(*words):
+            return next((i for i, c in enumerate(cols) if any(w in c.lower() for w in words)), 0)
+
+        time_col = st.selectbox("🕒 Timestamp Column", cols, index=guess("time", "date"))
+        site_col = st.selectbox("🏭 Site Column", cols, index=guess("site", "plant", "facility"))
+        source_col = st.selectbox("⛽ Energy Source Column", cols, index=guess("source", "fuel", "energy"))
+        value_col = st.selectbox("🔢 Consumption Column", cols, index=guess("consum", "value", "usage"))
+        period = st.selectbox("🗓️ Roll Up By", list(PERIODS), index=3)
+
+        digest = hashlib.md5(uploaded_file.getvalue()).hexdigest()
+        with st.spinner("Aggregating emissions..."):
+            rollup, skipped = cached_rollup(digest, time_col, site_col, source_col, value_col, period,
+                                            _source=uploaded_file)
+        if skipped["unknown_source"] or skipped["bad_time"]:
+            st.warning(f"⚠️ Skipped {skipped['unknown_source']:,} rows with an unknown energy source and "
+                       f"{skipped['bad_time']:,} rows with an unparseable timestamp.")
+        if rollup.empty:
+            st.warning("⚠️ No rows could be matched to an emission factor.")
+            return
+
+        rollup["CO₂ Emissions (tonnes)"] = rollup["CO₂ Emissions (kg)"] / 1000
+        total_tonnes = rollup["CO₂ Emissions (tonnes)"].sum()
+        st.success("✅ Emission Results")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🌡 Total Emissions", f"{total_tonnes:,.1f} t")
+        col2.metric("🏭 Sites", f"{rollup['Site'].nunique()}")
+        col3.metric("🧮 Readings", f"{int(rollup['Readings'].sum()):,}")
+
+        st.subheader("🏭 Totals by Site and Source (tonnes)")
+        by_site = rollup.pivot_table(index="Site", columns="Energy Source", values="CO₂ Emissions (tonnes)",
+                                     aggfunc="sum", fill_value=0.0)
+        by_site["Total"] = by_site.sum(axis=1)
+        by_site = by_site.sort_values("Total", ascending=False)
+        st.dataframe(by_site, use_container_width=True)
+        plot_site_totals(by_site.drop(columns="Total").head(20))
+
+        st.subheader(f"📈 Emissions per {period}")
+        by_period = rollup.pivot_table(index="Period", columns="Energy Source", values="CO₂ Emissions (tonnes)",
+                                       aggfunc="sum", fill_value=0.0)
+        st.area_chart(by_period)
+
+        csv = rollup.to_csv(index=False).encode('utf-8')
+        st.download_button("📥 Download Rollup CSV", data=csv, file_name="emission_rollup.csv", mime="text/csv")
+    except Exception as e:
+        st.error(f"❌ Error processing file: {e}")
+
+
 # ===== Main App =====
 def emission_estimator():
     st.set_page_config(page_title="🌍 Emission Estimator", layout="centered")
@@ -43,6 +236,11 @@ def emission_estimator():
         Emission factors used are industry standards. Results are shown in both kg and tonnes.
         """)
 
+    mode = st.radio("🧭 Mode", ["✍️ Manual Entry", "📂 Multi-Site Upload"], horizontal=True)
+    if mode == "📂 Multi-Site Upload":
+        multi_site_mode()
+        return
+
     df = get_emission_factors()
     st.subheader("📥 Input Energy Consumption")
 
@@ -50,7 +248,7 @@ def emission_estimator():
         lambda src: st.number_input(f"{src}", min_value=0.0, step=0.1, key=src)
     )
 
-    df["CO₂ Emissions (kg)"] = df.apply(calculate_emissions_row, axis=1)
+    df["CO₂ Emissions (kg)"] = calculate_emissions(df)
     df["CO₂ Emissions (tonnes)"] = df["CO₂ Emissions (kg)"] / 1000
 
     df_filtered = df[df["Consumption"] > 0]
@@ -3,11 +3,12 @@
 # 👨‍💻 Author: Ved Thakur
 
 import streamlit as st
-import matplotlib.pyplot as plt
 import pandas as pd
-from fpdf import FPDF
-import base64
-import io
+import numpy as np
+import hashlib
+
+from modules.Thermodynamics.tools import report_service
+from modules.Thermodynamics.core.efficiency import calculate_efficiency
 
 # ===== Efficiency Tips =====
 EFFICIENCY_TIPS = {
@@ -26,18 +27,18 @@ EFFICIENCY_TIPS = {
     ]
 }
 
-# ===== Utility Functions =====
-def calculate_efficiency(input_energy, output_energy):
-    efficiency = (output_energy / input_energy) * 100
-    loss = 100 - efficiency
-    return efficiency, loss
+TIP_LEVELS = np.array(["low", "medium", "high"])
+TIP_THRESHOLDS = [50, 80]  # Efficiency (%) boundaries between the tip levels
 
+# ===== Utility Functions =====
 def generate_pdf_report(input_energy, output_energy, efficiency, loss):
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
 
-    pdf.cell(200, 10, txt="⚡ Energy Efficiency Report", ln=True, align='C')
+    pdf.cell(200, 10, txt="Energy Efficiency Report", ln=True, align='C')
     pdf.ln(10)
     pdf.cell(200, 10, txt=f"Total Energy Input: {input_energy} MJ", ln=True)
     pdf.cell(200, 10, txt=f"Useful Energy Output: {output_energy} MJ", ln=True)
@@ -47,11 +48,9 @@ def generate_pdf_report(input_energy, output_energy, efficiency, loss):
     pdf.cell(200, 10, txt="Suggested Improvements:", ln=True)
     tips = get_efficiency_tips(efficiency)
     for tip in tips:
-        pdf.cell(200, 10, txt=f"- {tip}", ln=True)
+        pdf.cell(200, 10, txt=f"- {report_service.pdf_safe(tip)}", ln=True)
 
-    pdf_output = io.BytesIO()
-    pdf.output(pdf_output)
-    return pdf_output.getvalue()
+    return report_service.pdf_bytes(pdf)
 
 def get_efficiency_tips(efficiency):
     if efficiency < 50:
@@ -61,6 +60,180 @@ def get_efficiency_tips(efficiency):
     else:
         return EFFICIENCY_TIPS["high"]
 
+def tip_levels(efficiency):
+    """Vectorized get_efficiency_tips: 'low' / 'medium' / 'high' for an array of efficiencies."""
+    return TIP_LEVELS[np.digitize(efficiency, TIP_THRESHOLDS)]
+
+# ===== Fleet Audit =====
+def audit_units(df, unit_col, input_col, output_col):
+    """
+    Efficiency, losses and tip level per unit from time-series energy records.
+
+    Records are summed per unit with np.bincount over factorized unit IDs.
+    Units whose total output exceeds input, or with no input, are flagged invalid.
+
+    Returns:
+        pd.DataFrame: One row per unit
+    """
+    codes, units = pd.factorize(df[unit_col], sort=False)
+    valid = codes >= 0
+    codes = codes[valid]
+    energy_in = np.bincount(codes, weights=df[input_col].to_numpy(dtype=np.float64)[valid], minlength=len(units))
+    energy_out = np.bincount(codes, weights=df[output_col].to_numpy(dtype=np.float64)[valid], minlength=len(units))
+    records = np.bincount(codes, minlength=len(units))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        efficiency, loss = calculate_efficiency(energy_in, energy_out)
+    ok = (energy_in > 0) & (energy_out <= energy_in)
+    return pd.DataFrame({
+        "Unit": units,
+        "Records": records,
+        "Energy Input (MJ)": energy_in,
+        "Energy Output (MJ)": energy_out,
+        "Loss (MJ)": energy_in - energy_out,
+        "Efficiency (%)": np.where(ok, efficiency, np.nan),
+        "Loss (%)": np.where(ok, loss, np.nan),
+        "Tip Level": np.where(ok, tip_levels(np.nan_to_num(efficiency)), "invalid")
+    })
+
+def worst_offenders(audit, k=10, by="Loss (MJ)"):
+    """
+    The k units with the largest `by` (or smallest, for Efficiency (%)).
+
+    np.argpartition selects the k rows in linear time; only those k are sorted.
+    """
+    values = audit[by].to_numpy(dtype=np.float64)
+    if by == "Efficiency (%)":
+        values = -values
+    values = np.where(np.isnan(values), -np.inf, values)
+    k = min(k, len(values))
+    if k == 0:
+        return audit.iloc[[]]
+    top = np.argpartition(values, len(values) - k)[-k:]
+    top = top[np.argsort(values[top])[::-1]]
+    return audit.iloc[top]
+
+def generate_fleet_report(payload):
+    """One PDF for the whole fleet: totals, tip-level sections and the worst offenders."""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(200, 10, txt="Fleet Energy Audit Report", ln=True, align='C')
+    pdf.set_font("Arial", size=12)
+    pdf.ln(5)
+    pdf.cell(200, 8, txt=f"Units Audited: {payload['units']}", ln=True)
+    pdf.cell(200, 8, txt=f"Total Energy Input: {payload['energy_in']:,.1f} MJ", ln=True)
+    pdf.cell(200, 8, txt=f"Total Useful Output: {payload['energy_out']:,.1f} MJ", ln=True)
+    pdf.cell(200, 8, txt=f"Fleet Efficiency: {payload['efficiency']:.2f}%", ln=True)
+
+    for level in TIP_LEVELS:
+        count = payload["levels"].get(level, 0)
+        if not count:
+            continue
+        pdf.ln(5)
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(200, 8, txt=f"{level.capitalize()} efficiency units: {count}", ln=True)
+        pdf.set_font("Arial", size=11)
+        for tip in EFFICIENCY_TIPS[level]:
+            pdf.cell(200, 7, txt=f"- {report_service.pdf_safe(tip)}", ln=True)
+
+    pdf.ln(5)
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(200, 8, txt=f"Worst {len(payload['worst'])} Units by Energy Loss", ln=True)
+    pdf.set_font("Arial", size=10)
+    for unit, eff, loss_mj in payload["worst"]:
+        pdf.cell(200, 6, txt=report_service.pdf_safe(f"{unit}: {eff:.1f}% efficient, {loss_mj:,.1f} MJ lost"), ln=True)
+    return report_service.pdf_bytes(pdf)
+
+@st.cache_data(show_spinner=False)
+def load_fleet_audit(digest, unit_col, input_col, output_col, _source=None):
+    _source.seek(0)
+    df = pd.read_csv(_source, usecols=[unit_col, input_col, output_col],
+                     dtype={input_col: "float32", output_col: "float32"})
+    return audit_units(df, unit_col, input_col, output_col)
+
+def fleet_audit_mode():
+    st.subheader("📂 Fleet Energy Audit")
+    st.markdown("Upload a CSV with one row per unit and time step: unit ID, energy input and useful output (MJ).")
+    uploaded_file = st.file_uploader("Upload CSV", type=["csv"])
+    if not uploaded_file:
+        return
+
+    try:
+        preview = pd.read_csv(uploaded_file, nrows=1000)
+        st.dataframe(preview.head(), use_container_width=True)
+        numeric_cols = preview.select_dtypes(include="number").columns.tolist()
+        if len(numeric_cols) < 2:
+            st.warning("⚠️ Need at least two numeric columns for input/output energy.")
+            return
+        unit_col = st.selectbox("🏭 Unit ID Column", list(preview.columns))
+        input_col = st.selectbox("🔌 Energy Input Column", [c for c in numeric_cols if c != unit_col])
+        output_col = st.selectbox("⚙️ Useful Output Column", [c for c in numeric_cols if c not in (unit_col, input_col)])
+        k = st.slider("🚨 Worst offenders to list", 5, 100, 20)
+        rank_by = st.radio("Rank by", ["Loss (MJ)", "Efficiency (%)"], horizontal=True)
+
+        digest = hashlib.md5(uploaded_file.getvalue()).hexdigest()
+        with st.spinner("Auditing units..."):
+            audit = load_fleet_audit(digest, unit_col, input_col, output_col, _source=uploaded_file)
+
+        valid = audit[audit["Tip Level"] != "invalid"]
+        n_invalid = len(audit) - len(valid)
+        if n_invalid:
+            st.warning(f"⚠️ {n_invalid} units have no input energy or more output than input and were excluded.")
+        if valid.empty:
+            return
+
+        total_in = valid["Energy Input (MJ)"].sum()
+        total_out = valid["Energy Output (MJ)"].sum()
+        fleet_eff = total_out / total_in * 100
+        levels = valid["Tip Level"].value_counts().to_dict()
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🏭 Units", f"{len(valid):,}")
+        col2.metric("✅ Fleet Efficiency", f"{fleet_eff:.2f} %")
+        col3.metric("♻️ Total Loss", f"{total_in - total_out:,.0f} MJ")
+
+        st.subheader(f"🚨 Worst {k} Units by {rank_by}")
+        worst = worst_offenders(valid, k, rank_by)
+        st.dataframe(worst, use_container_width=True)
+
+        from matplotlib.figure import Figure
+
+        st.subheader("📊 Efficiency Distribution")
+        fig = Figure()
+        ax = fig.subplots()
+        ax.hist(valid["Efficiency (%)"], bins=50, color="#4CAF50", edgecolor="black")
+        for threshold in TIP_THRESHOLDS:
+            ax.axvline(threshold, color="red", linestyle="--")
+        ax.set_xlabel("Efficiency (%)")
+        ax.set_ylabel("Units")
+        st.pyplot(fig)
+
+        st.subheader("💡 Efficiency Improvement Tips by Level")
+        for level in TIP_LEVELS:
+            if levels.get(level):
+                st.markdown(f"**{level.capitalize()} efficiency ({levels[level]} units)**")
+                for tip in EFFICIENCY_TIPS[level]:
+                    st.markdown(f"- {tip}")
+
+        csv = audit.to_csv(index=False).encode("utf-8")
+        st.download_button("📥 Download Audit CSV", data=csv, file_name="fleet_energy_audit.csv", mime="text/csv")
+
+        # One fleet-wide report (background render, cached per audit contents)
+        worst_by_loss = worst_offenders(valid, k, "Loss (MJ)")
+        report_service.download_report(
+            "📄 Download Fleet Audit Report as PDF", "fleet_energy_audit", generate_fleet_report,
+            {"units": len(valid), "energy_in": float(total_in), "energy_out": float(total_out),
+             "efficiency": float(fleet_eff), "levels": {str(level): int(count) for level, count in levels.items()},
+             "worst": [(str(u), float(e), float(l)) for u, e, l in
+                       worst_by_loss[["Unit", "Efficiency (%)", "Loss (MJ)"]].itertuples(index=False)]},
+            "fleet_energy_audit.pdf"
+        )
+    except Exception as e:
+        st.error(f"❌ Error processing file: {e}")
+
 # ===== Main App =====
 def energy_efficiency_analyzer():
     st.set_page_config(page_title="⚡ Energy Efficiency Analyzer", layout="centered")
@@ -73,6 +246,11 @@ def energy_efficiency_analyzer():
         Based on your values, suggestions and visualizations will be provided.
         """)
 
+    mode = st.radio("🧭 Mode", ["🔌 Single Unit", "📂 Fleet Audit (CSV)"], horizontal=True)
+    if mode == "📂 Fleet Audit (CSV)":
+        fleet_audit_mode()
+        return
+
     st.subheader("📥 Enter Energy Details")
     energy_input = st.number_input("🔌 Total Energy Input (MJ)", min_value=0.0, step=0.1)
     energy_output = st.number_input("⚙️ Useful Energy Output (MJ)", min_value=0.0, step=0.1)
@@ -84,8 +262,11 @@ def energy_efficiency_analyzer():
             st.info(f"♻️ Energy Loss: **{loss:.2f}%**")
 
             # Pie Chart
+            from matplotlib.figure import Figure
+
             st.subheader("📊 Energy Distribution")
-            fig, ax = plt.subplots()
+            fig = Figure()
+            ax = fig.subplots()
             ax.pie([energy_output, energy_input - energy_output],
                    labels=["Useful Output", "Losses"],
                    colors=["#4CAF50", "#FF5722"],
@@ -100,12 +281,14 @@ def energy_efficiency_analyzer():
             for tip in get_efficiency_tips(efficiency):
                 st.markdown(f"- {tip}")
 
-            # Report Export
-            if st.button("📄 Download Efficiency Report as PDF"):
-                pdf_bytes = generate_pdf_report(energy_input, energy_output, efficiency, loss)
-                b64 = base64.b64encode(pdf_bytes).decode()
-                href = f'<a href="data:application/octet-stream;base64,{b64}" download="efficiency_report.pdf">📥 Download Report</a>'
-                st.markdown(href, unsafe_allow_html=True)
+            # Report Export (rendered in the background, cached per input values)
+            report_service.download_report(
+                "📄 Download Efficiency Report as PDF", "energy_efficiency",
+                lambda p: generate_pdf_report(**p),
+                {"input_energy": energy_input, "output_energy": energy_output,
+                 "efficiency": efficiency, "loss": loss},
+                "efficiency_report.pdf"
+            )
         else:
             st.error("⚠️ Output energy cannot exceed input energy.")
     elif energy_input == 0:
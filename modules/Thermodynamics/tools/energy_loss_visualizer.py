@@ -3,9 +3,9 @@
 # 👨‍💻 Author: Ved Thakur (Improved by ChatGPT)
 
 import streamlit as st
-import matplotlib.pyplot as plt
-import plotly.express as px
 import pandas as pd
+import numpy as np
+import hashlib
 from io import BytesIO
 from datetime import datetime
 
@@ -28,6 +28,219 @@ EFFICIENCY_TIPS = {
     "Piping and Friction Losses": "🛠️ Improve layout and reduce flow resistance."
 }
 
+CHUNK_ROWS = 2_000_000   # Rows per chunk when reading metered losses
+MAX_CHART_POINTS = 600   # Time points in the stacked-area chart
+MAX_SERIES = 12          # Largest contributors drawn; the rest are summed into "Other"
+LEVELS = ["Plant", "Area", "Unit"]
+
+# ===== Hierarchical Loss Accounting =====
+def load_loss_matrix(source, time_col, unit_col, loss_col, area_col=None, plant_col=None,
+                     freq="1h", chunksize=CHUNK_ROWS):
+    """
+    Read metered losses in chunks into a (time bucket × unit) matrix.
+
+    Each chunk is reduced with one groupby on (bucket, plant, area, unit);
+    only those partial sums are kept. Units are then indexed once, with
+    parent arrays mapping unit → area and area → plant. Rows are the
+    observed buckets only, so a stray timestamp adds one row rather than
+    every bucket between it and the rest of the data.
+
+    Returns:
+        dict: matrix (n_buckets, n_units), buckets (sorted DatetimeIndex),
+        names per level and the unit_area / area_plant index arrays
+    """
+    cols = [c for c in (time_col, plant_col, area_col, unit_col, loss_col) if c]
+    if hasattr(source, "seek"):
+        source.seek(0)
+    dtypes = {c: "category" for c in (plant_col, area_col, unit_col) if c}
+    dtypes[loss_col] = "float32"
+    parts = []
+    for chunk in pd.read_csv(source, usecols=cols, dtype=dtypes, chunksize=chunksize):
+        bucket = pd.to_datetime(chunk[time_col], errors="coerce").dt.floor(freq)
+        keys = {
+            "bucket": bucket,
+            "plant": chunk[plant_col] if plant_col else pd.Categorical(["Plant"] * len(chunk)),
+            "area": chunk[area_col] if area_col else pd.Categorical(["All Areas"] * len(chunk)),
+            "unit": chunk[unit_col]
+        }
+        frame = pd.DataFrame({k: np.asarray(v) for k, v in keys.items()})
+        frame["loss"] = chunk[loss_col].to_numpy(dtype=np.float64)
+        parts.append(frame.dropna(subset=["bucket", "unit"])
+                     .groupby(["bucket", "plant", "area", "unit"], observed=True, sort=False)["loss"].sum())
+
+    partial = pd.concat(parts).groupby(level=[0, 1, 2, 3], sort=False).sum().reset_index()
+    if partial.empty:
+        raise ValueError("No rows with a valid timestamp and unit were found.")
+
+    # Precomputed hierarchy indices: unit -> area -> plant
+    unit_idx, unit_keys = pd.MultiIndex.from_frame(partial[["plant", "area", "unit"]]).factorize()
+    area_of_unit, area_keys = pd.MultiIndex.from_arrays(
+        [unit_keys.get_level_values(0), unit_keys.get_level_values(1)]).factorize()
+    plant_of_area, plant_keys = pd.factorize(area_keys.get_level_values(0))
+
+    bucket_idx, buckets = pd.factorize(partial["bucket"], sort=True)
+    matrix = np.zeros((len(buckets), len(unit_keys)))
+    np.add.at(matrix, (bucket_idx, unit_idx), partial["loss"].to_numpy())
+
+    return {
+        "matrix": matrix,
+        "buckets": buckets,
+        "names": {
+            "Unit": [f"{a} / {u}" if area_col else str(u) for _, a, u in unit_keys],
+            "Area": [f"{p} / {a}" if plant_col else str(a) for p, a in area_keys],
+            "Plant": [str(p) for p in plant_keys]
+        },
+        "unit_area": area_of_unit,
+        "area_plant": plant_of_area
+    }
+
+
+def rollup_level(data, level):
+    """Sum unit columns up to the requested hierarchy level; returns (matrix, names)."""
+    matrix = data["matrix"]
+    if level == "Unit":
+        return matrix, data["names"]["Unit"]
+    parent = data["unit_area"] if level == "Area" else data["area_plant"][data["unit_area"]]
+    n = len(data["names"][level])
+    # Column-wise group sum: one matrix product with a unit -> parent indicator matrix
+    indicator = np.zeros((matrix.shape[1], n))
+    indicator[np.arange(matrix.shape[1]), parent] = 1.0
+    return matrix @ indicator, data["names"][level]
+
+
+def loss_contributions(matrix, window, times=None):
+    """
+    Rolling-window and cumulative loss per column, plus each column's share of the total.
+
+    Both come from one cumulative sum along time.
+
+    Args:
+        matrix: (n_buckets, n_cols) losses, rows in time order
+        window: Rolling window in rows (int), or a time span (pd.Timedelta)
+            when `times` gives the row timestamps; rows may then have gaps
+        times (DatetimeIndex): Sorted bucket time of each row
+
+    Returns:
+        dict of (n_buckets, n_cols) arrays: rolling, rolling_share, cumulative, cumulative_share
+    """
+    cumulative = np.cumsum(matrix, axis=0)
+    if times is None:
+        rolling = cumulative.copy()
+        rolling[window:] -= cumulative[:-window]
+    else:
+        # Window (t - span, t]: subtract the cumulative sum just before its first row
+        start = times.searchsorted(times - window, side="right")
+        before = np.vstack([np.zeros((1, matrix.shape[1])), cumulative])[start]
+        rolling = cumulative - before
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rolling_share = np.nan_to_num(rolling / rolling.sum(axis=1, keepdims=True) * 100)
+        cumulative_share = np.nan_to_num(cumulative / cumulative.sum(axis=1, keepdims=True) * 100)
+    return {"rolling": rolling, "rolling_share": rolling_share,
+            "cumulative": cumulative, "cumulative_share": cumulative_share}
+
+
+def decimate_blocks(index, values, max_points=MAX_CHART_POINTS):
+    """Average consecutive rows in equal blocks so at most max_points remain (stacking is preserved)."""
+    n = len(index)
+    block = int(np.ceil(n / max_points))
+    if block <= 1:
+        return index, values
+    n_blocks = int(np.ceil(n / block))
+    padded = np.full((n_blocks * block, values.shape[1]), np.nan)
+    padded[:n] = values
+    return index[::block], np.nanmean(padded.reshape(n_blocks, block, -1), axis=1)
+
+
+def top_columns(values, names, totals, k=MAX_SERIES):
+    """Keep the k columns with the largest totals and sum the rest into 'Other'."""
+    if len(names) <= k:
+        return values, list(names)
+    top = np.argpartition(totals, len(totals) - k)[-k:]
+    top = top[np.argsort(totals[top])[::-1]]
+    rest = np.setdiff1d(np.arange(len(names)), top)
+    values = np.column_stack([values[:, top], values[:, rest].sum(axis=1)])
+    return values, [names[i] for i in top] + ["Other"]
+
+
+@st.cache_data(show_spinner=False)
+def cached_loss_matrix(digest, time_col, unit_col, loss_col, area_col, plant_col, freq, _source=None):
+    return load_loss_matrix(_source, time_col, unit_col, loss_col, area_col, plant_col, freq)
+
+
+def metered_loss_mode():
+    st.subheader("📂 Metered Loss Accounting (Plant → Area → Unit)")
+    st.markdown("Upload long-format loss readings: a timestamp, a unit and its loss, optionally with area and plant.")
+    uploaded_file = st.file_uploader("Upload CSV", type=["csv"])
+    if not uploaded_file:
+        return
+
+    try:
+        preview = pd.read_csv(uploaded_file, nrows=1000)
+        st.dataframe(preview.head(), use_container_width=True)
+        cols = list(preview.columns)
+        numeric_cols = preview.select_dtypes(include="number").columns.tolist()
+
+        def guess(options, *words):
+            return next((i for i, c in enumerate(options) if any(w in c.lower() for w in words)), 0)
+
+        col1, col2 = st.columns(2)
+        time_col = col1.selectbox("🕒 Timestamp Column", cols, index=guess(cols, "time", "date"))
+        loss_col = col2.selectbox("🔥 Loss Column", numeric_cols, index=guess(numeric_cols, "loss", "energy"))
+        unit_col = col1.selectbox("⚙️ Unit Column", cols, index=guess(cols, "unit", "equipment"))
+        optional = ["None"] + cols
+        area_col = col2.selectbox("🏗️ Area Column (Optional)", optional, index=guess(optional, "area"))
+        plant_col = col1.selectbox("🏭 Plant Column (Optional)", optional, index=guess(optional, "plant", "site"))
+        freq = col2.selectbox("🗓️ Time Bucket", ["15min", "1h", "1D", "7D"], index=1)
+        area_col = None if area_col == "None" else area_col
+        plant_col = None if plant_col == "None" else plant_col
+
+        digest = hashlib.md5(uploaded_file.getvalue()).hexdigest()
+        with st.spinner("Aggregating metered losses..."):
+            data = cached_loss_matrix(digest, time_col, unit_col, loss_col, area_col, plant_col, freq,
+                                      _source=uploaded_file)
+
+        n_buckets, n_units = data["matrix"].shape
+        st.caption(f"{n_units} units in {len(data['names']['Area'])} areas and "
+                   f"{len(data['names']['Plant'])} plants, {n_buckets:,} time buckets with readings.")
+
+        level = st.radio("📐 Hierarchy Level", LEVELS, index=1, horizontal=True)
+        window = st.slider("🌀 Rolling Window (buckets)", 1, max(2, min(n_buckets, 24 * 30)), min(24, n_buckets))
+        view = st.radio("📈 View", ["Rolling loss", "Rolling share (%)", "Cumulative loss", "Cumulative share (%)"],
+                        horizontal=True)
+
+        matrix, names = rollup_level(data, level)
+        contrib = loss_contributions(matrix, window * pd.Timedelta(freq), data["buckets"])
+        key = {"Rolling loss": "rolling", "Rolling share (%)": "rolling_share",
+               "Cumulative loss": "cumulative", "Cumulative share (%)": "cumulative_share"}[view]
+
+        totals = contrib["cumulative"][-1]
+        values, labels = top_columns(contrib[key], names, totals)
+        index, values = decimate_blocks(data["buckets"], values)
+        wide = pd.DataFrame(values, index=index, columns=labels).rename_axis("Time")
+        import plotly.express as px
+
+        area_fig = px.area(wide.reset_index().melt(id_vars="Time", var_name=level, value_name=view),
+                           x="Time", y=view, color=level, title=f"{view} by {level}")
+        st.plotly_chart(area_fig, use_container_width=True)
+
+        st.subheader(f"📋 Total Loss by {level}")
+        table = pd.DataFrame({level: names, "Total Loss": totals,
+                              "Share (%)": totals / totals.sum() * 100 if totals.sum() else 0.0})
+        table = table.sort_values("Total Loss", ascending=False)
+        st.dataframe(table, use_container_width=True)
+        st.download_button("📥 Download Totals CSV", data=table.to_csv(index=False).encode("utf-8"),
+                           file_name=f"energy_loss_by_{level.lower()}.csv", mime="text/csv")
+
+        # Efficiency Tips for the largest contributors that match a known unit type
+        if level == "Unit":
+            for name in table[level].head(MAX_SERIES):
+                tip = next((t for u, t in EFFICIENCY_TIPS.items() if u.lower() in name.lower()), None)
+                if tip:
+                    st.info(f"**{name}**: {tip}")
+    except Exception as e:
+        st.error(f"❌ Error processing file: {e}")
+
+
 # ===== Utility Functions =====
 def get_download_button(fig):
     buf = BytesIO()
@@ -49,6 +262,11 @@ def energy_loss_visualizer():
     st.title("♻️ Energy Loss Visualizer")
     st.markdown("Analyze and visualize energy losses in petroleum processing units.\n\nAdjust loss values and get efficiency tips.")
 
+    mode = st.radio("🧭 Mode", ["🎚️ Static Percentages", "📂 Metered Losses Over Time"], horizontal=True)
+    if mode == "📂 Metered Losses Over Time":
+        metered_loss_mode()
+        return
+
     with st.expander("🔧 Reset All Values", expanded=False):
         if st.button("🔄 Reset to Default", use_container_width=True):
             reset_sliders()
@@ -68,8 +286,12 @@ def energy_loss_visualizer():
         df = pd.DataFrame({"Unit": list(filtered_units.keys()), "Loss (%)": list(filtered_units.values())})
 
         # Pie Chart
+        from matplotlib.figure import Figure
+        import plotly.express as px
+
         st.subheader("📈 Energy Loss Distribution")
-        fig, ax = plt.subplots()
+        fig = Figure()
+        ax = fig.subplots()
         ax.pie(df["Loss (%)"], labels=df["Unit"], autopct='%1.1f%%', startangle=140)
         ax.axis("equal")
         st.pyplot(fig)
@@ -1,12 +1,159 @@
 # 📉 Equipment Failure Predictor (Streamlit + ML)
 # 🛢 Part of PetroStream AI Suite | Author: Ved Thakur
+
+REGISTRY_NAME = "equipment_failure_rf"
+
+
+def data_fingerprint(df, target_col):
+    """Stable hash of the uploaded data (values + columns) and the chosen target."""
+    import model_registry
+    return model_registry.compute_data_hash(df, df[[target_col]].rename(columns=lambda c: f"target:{c}"))
+
+
+def _split(df, target_col):
+    """Deterministic train/test split shared by training and registry reuse"""
+    from sklearn.model_selection import train_test_split
+
+    X = df.drop(columns=[target_col])
+    y = df[target_col]
+    return train_test_split(X, y, test_size=0.25, random_state=42)
+
+
+def evaluate_failure_model(model, X_test, y_test):
+    """Test-set predictions, accuracy, classification report and confusion matrix"""
+    from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
+
+    y_pred = model.predict(X_test)
+    acc = accuracy_score(y_test, y_pred)
+    report = classification_report(y_test, y_pred, output_dict=True)
+    conf_matrix = confusion_matrix(y_test, y_pred)
+    return model, X_test, y_test, y_pred, acc, report, conf_matrix
+
+
+def fit_failure_model(df, target_col):
+    """Split data, train RandomForest on all cores, return model + test-set results"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    X_train, X_test, y_train, y_test = _split(df, target_col)
+
+    model = RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=-1)
+    model.fit(X_train, y_train)
+
+    # Single-row scoring is faster without the thread-pool start-up
+    model.set_params(n_jobs=1)
+    return evaluate_failure_model(model, X_test, y_test)
+
+
+def load_or_train(df, target_col, fingerprint=None):
+    """
+    Return the trained model and test-set results for this data. The fitted
+    estimator comes from the model registry when a version matches; only the
+    (cheap) held-out evaluation is recomputed.
+    """
+    import model_registry
+
+    fingerprint = fingerprint or data_fingerprint(df, target_col)
+    found = model_registry.find_model(REGISTRY_NAME, fingerprint)
+    if found is not None:
+        _, X_test, _, y_test = _split(df, target_col)
+        return evaluate_failure_model(found[0], X_test, y_test)
+
+    results = fit_failure_model(df, target_col)
+    model, acc = results[0], results[4]
+    model_registry.register_model(REGISTRY_NAME, model, model.feature_names_in_, fingerprint,
+                                  {"accuracy": acc}, {"target": str(target_col)})
+    return results
+
+
+def _score_chunk(model, chunk, offset, feature_names, ref_mean, ref_std, weights, top_k):
+    """Failure probability and top contributing features for one chunk."""
+    import numpy as np
+    import pandas as pd
+
+    X = chunk[feature_names]
+    proba = model.predict_proba(X)
+    failure_col = list(model.classes_).index(1) if 1 in model.classes_ else len(model.classes_) - 1
+
+    # Contribution proxy: importance × |z-score| against the training reference
+    z = np.abs((X.to_numpy(dtype=np.float64) - ref_mean) / ref_std) * weights
+    k = min(top_k, z.shape[1])
+    top = np.argpartition(-z, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(z, top, axis=1).argsort(axis=1)[:, ::-1]
+    top = np.take_along_axis(top, order, axis=1)
+
+    out = pd.DataFrame({"row_id": np.arange(offset, offset + len(chunk)),
+                        "failure_probability": proba[:, failure_col]})
+    names = np.asarray(feature_names, dtype=object)
+    for i in range(k):
+        out[f"top_feature_{i + 1}"] = names[top[:, i]]
+    return out
+
+
+def score_csv_in_chunks(csv_source, model, reference, out_path, chunksize=100_000, n_jobs=-1,
+                        top_k=3, progress_callback=None):
+    """
+    Stream a large operational CSV through a trained model and write Parquet.
+
+    Chunks are read lazily and scored by parallel workers (at most 2 × n_jobs
+    chunks in memory); results are appended to one Parquet file in row order.
+
+    Args:
+        csv_source: Path or file-like CSV containing the model's feature columns
+        model: Fitted classifier with predict_proba and feature_importances_
+        reference (pd.DataFrame): Training-like rows used to standardize features
+        out_path (str): Parquet file to write
+        chunksize (int): Rows per chunk
+        n_jobs (int): Parallel workers
+        top_k (int): Contributing features reported per row
+        progress_callback (callable): Called as f(rows_scored)
+
+    Returns:
+        int: Total rows scored
+    """
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from joblib import Parallel, delayed
+
+    feature_names = list(model.feature_names_in_)
+    ref = reference[feature_names].to_numpy(dtype=np.float64)
+    ref_mean = ref.mean(axis=0)
+    ref_std = ref.std(axis=0)
+    ref_std[ref_std == 0] = 1.0
+    weights = model.feature_importances_
+
+    def chunks():
+        offset = 0
+        for chunk in pd.read_csv(csv_source, chunksize=chunksize, usecols=feature_names):
+            yield chunk, offset
+            offset += len(chunk)
+
+    writer = None
+    total = 0
+    try:
+        results = Parallel(n_jobs=n_jobs, prefer="threads", return_as="generator")(
+            delayed(_score_chunk)(model, chunk, offset, feature_names, ref_mean, ref_std, weights, top_k)
+            for chunk, offset in chunks()
+        )
+        for scored in results:
+            table = pa.Table.from_pandas(scored, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, table.schema)
+            writer.write_table(table)
+            total += len(scored)
+            if progress_callback:
+                progress_callback(total)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
 def equipment_failure_predictor():
     import streamlit as st
     import pandas as pd
     import numpy as np
-    from sklearn.ensemble import RandomForestClassifier
-    from sklearn.model_selection import train_test_split
-    from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
     import seaborn as sns
     import matplotlib.pyplot as plt
     import io
@@ -24,21 +171,10 @@ def equipment_failure_predictor():
     """)
 
     # ===================== FUNCTIONS ===========================
-    def train_model(df, target_col):
-        """Split data, train RandomForest, return results"""
-        X = df.drop(columns=[target_col])
-        y = df[target_col]
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.25, random_state=42)
-
-        model = RandomForestClassifier(n_estimators=200, random_state=42)
-        model.fit(X_train, y_train)
-
-        y_pred = model.predict(X_test)
-        acc = accuracy_score(y_test, y_pred)
-        report = classification_report(y_test, y_pred, output_dict=True)
-        conf_matrix = confusion_matrix(y_test, y_pred)
-
-        return model, X_test, y_test, y_pred, acc, report, conf_matrix
+    @st.cache_resource(show_spinner="🌲 Training Random Forest...", max_entries=8)
+    def train_model(fingerprint, target_col, _df):
+        """Cached per data hash + target; reruns and widget changes reuse the model"""
+        return load_or_train(_df, target_col, fingerprint)
 
     def plot_feature_importance(model, features):
         """Plot sorted feature importances"""
@@ -82,7 +218,9 @@ def equipment_failure_predictor():
             if pd.api.types.is_numeric_dtype(df[target_col]) or df[target_col].nunique() == 2:
                 # Drop rows with NaNs
                 df = df.dropna()
-                model, X_test, y_test, y_pred, acc, report, conf_matrix = train_model(df, target_col)
+                fingerprint = data_fingerprint(df, target_col)
+                model, X_test, y_test, y_pred, acc, report, conf_matrix = train_model(fingerprint, target_col, df)
+                st.caption(f"💾 Model `{fingerprint}` cached and stored in the model registry")
 
                 # --- Metrics ---
                 st.subheader("📊 Model Metrics")
@@ -115,6 +253,24 @@ def equipment_failure_predictor():
                 results_df["Predicted"] = y_pred
                 st.markdown(generate_download_link(results_df, "failure_predictions.csv"), unsafe_allow_html=True)
 
+                # --- Batch Scoring ---
+                st.subheader("📦 Batch Scoring (Large CSV → Parquet)")
+                st.caption("Streams the file in chunks through the trained model; only the feature columns are read.")
+                batch_file = st.file_uploader("📂 Upload operational data to score (.csv)", type="csv", key="batch_csv")
+                chunk_rows = st.number_input("Rows per chunk", min_value=1_000, max_value=1_000_000,
+                                             value=100_000, step=10_000)
+                if batch_file and st.button("▶️ Score File"):
+                    import tempfile
+                    import os
+                    status = st.empty()
+                    out_path = os.path.join(tempfile.mkdtemp(), "failure_scores.parquet")
+                    n_rows = score_csv_in_chunks(batch_file, model, X_test, out_path, chunksize=int(chunk_rows),
+                                                 progress_callback=lambda n: status.text(f"Scored {n:,} rows..."))
+                    st.success(f"✅ Scored {n_rows:,} rows")
+                    with open(out_path, "rb") as f:
+                        st.download_button("📥 Download Scores (Parquet)", f.read(),
+                                           file_name="failure_scores.parquet", mime="application/octet-stream")
+
             else:
                 st.error("❗Target column must be binary (0/1 or Yes/No).")
 
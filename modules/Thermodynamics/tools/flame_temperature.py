@@ -0,0 +1,53 @@
+# 🔥 Adiabatic Flame Temperature Solver
+# Part of the Real-World Thermodynamics Project
+# Author: Ved Thakur | Semester 1 | IPS Academy Indore | ChemE (2025-2029)
+
+import streamlit as st
+import numpy as np
+import pandas as pd
+
+from modules.Thermodynamics.core.combustion import STOICH_AFR
+from modules.Thermodynamics.core.flame import FUELS, adiabatic_flame_temperature
+
+
+# ===== Streamlit App =====
+def flame_temperature_solver():
+    from matplotlib.figure import Figure
+
+    st.title("🔥 Adiabatic Flame Temperature Solver")
+    st.markdown("Energy-balance flame temperature, flue-gas composition and stack-loss efficiency over an AFR sweep.")
+
+    fuel = st.selectbox("Select Fuel", FUELS)
+    afr = st.slider("Air-Fuel Ratio (AFR)", 1.0, 60.0, float(STOICH_AFR[fuel]), step=0.1)
+    T_air = st.number_input("Inlet Air / Fuel Temperature (K)", min_value=250.0, max_value=1200.0, value=298.15)
+    T_stack = st.number_input("Stack Temperature (K)", min_value=300.0, max_value=1500.0, value=450.0)
+
+    point = adiabatic_flame_temperature(fuel, afr, T_air, T_stack)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Adiabatic Flame Temp.", f"{float(point['T_ad']):.0f} K")
+    col2.metric("Excess Air", f"{(float(point['lambda']) - 1) * 100:.1f} %")
+    col3.metric("Efficiency", f"{float(point['efficiency']):.1f} %")
+
+    st.dataframe(pd.DataFrame({
+        "Species": ["CO2", "H2O", "N2", "O2", "Unburned fuel"],
+        "Mole Fraction": [float(point[k]) for k in ("x_CO2", "x_H2O", "x_N2", "x_O2", "x_fuel")]
+    }))
+
+    afr_grid = np.linspace(max(1.0, 0.5 * STOICH_AFR[fuel]), 3 * STOICH_AFR[fuel], 2000)
+    sweep = adiabatic_flame_temperature(fuel, afr_grid, T_air, T_stack)
+    fig = Figure()
+    ax = fig.subplots()
+    ax.plot(afr_grid, sweep["T_ad"], color="red", label="T_ad (K)")
+    ax.axvline(afr, color="gray", linestyle="--", label="Your AFR")
+    ax.set_xlabel("Air-Fuel Ratio (AFR)")
+    ax.set_ylabel("Adiabatic Flame Temperature (K)")
+    ax2 = ax.twinx()
+    ax2.plot(afr_grid, sweep["efficiency"], color="blue", label="Efficiency (%)")
+    ax2.set_ylabel("Efficiency (%)")
+    ax.set_title(f"Flame Temperature & Efficiency for {fuel}")
+    fig.legend(loc="upper right")
+    st.pyplot(fig)
+
+
+def run():
+    flame_temperature_solver()
@@ -6,6 +6,148 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import io
+import csv
+import hashlib
+
+REQUIRED_COLUMNS = ["Fuel_Mass", "Energy_Output"]
+BLOCK_SIZE = 16 << 20        # Bytes of CSV parsed per pyarrow batch
+ROWS_PER_BUCKET = 1_000      # Rows summarized into one chart point before final downsampling
+MAX_CHART_POINTS = 2_000
+
+
+def read_header(data):
+    """Column names from the first line of the CSV bytes."""
+    first_line = bytes(data[:1 << 16]).split(b"\n", 1)[0].decode("utf-8-sig").strip("\r")
+    return next(csv.reader([first_line]))
+
+
+def _buffer_reader(data):
+    """File-like reader over the CSV bytes without copying them."""
+    import pyarrow as pa
+    return pa.BufferReader(pa.py_buffer(data))
+
+
+def read_preview(data, nrows=5):
+    """First rows of every column; pandas stops parsing after nrows."""
+    return pd.read_csv(_buffer_reader(data), nrows=nrows)
+
+
+def iter_batches(data):
+    """
+    Stream record batches of the required columns straight from the uploaded bytes.
+
+    pyarrow parses the buffer in place (no decode to str, no StringIO copy),
+    reads only REQUIRED_COLUMNS and converts them to float64.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    reader = pa_csv.open_csv(
+        _buffer_reader(data),
+        read_options=pa_csv.ReadOptions(block_size=BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(include_columns=REQUIRED_COLUMNS,
+                                              column_types={c: pa.float64() for c in REQUIRED_COLUMNS})
+    )
+    for batch in reader:
+        yield (batch.column(0).to_numpy(zero_copy_only=False),
+               batch.column(1).to_numpy(zero_copy_only=False))
+
+
+def analyze_fuel_log(data):
+    """
+    Efficiency statistics and a downsampled efficiency trace in one pass over the batches.
+
+    Running count / mean / M2 / min / max are merged per batch (Chan et al.),
+    and every ROWS_PER_BUCKET rows are reduced to one chart point.
+
+    Returns:
+        dict: rows, valid, mean, std, min, max and the chart frame
+    """
+    n_rows = n = 0
+    mean = m2 = 0.0
+    lo, hi = np.inf, -np.inf
+    sums, counts, row_pos = [], [], []
+
+    for fuel, energy in iter_batches(data):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            eff = energy / fuel * 100
+        valid = (fuel > 0) & np.isfinite(eff)
+
+        ev = eff[valid]
+        if ev.size:
+            b_n, b_mean = ev.size, ev.mean()
+            b_m2 = ((ev - b_mean) ** 2).sum()
+            delta = b_mean - mean
+            total = n + b_n
+            mean += delta * b_n / total
+            m2 += b_m2 + delta ** 2 * n * b_n / total
+            n = total
+            lo, hi = min(lo, ev.min()), max(hi, ev.max())
+
+        starts = np.arange(0, len(eff), ROWS_PER_BUCKET)
+        if starts.size:
+            sums.append(np.add.reduceat(np.where(valid, eff, 0.0), starts))
+            counts.append(np.add.reduceat(valid.astype(np.int64), starts))
+            row_pos.append(n_rows + starts)
+        n_rows += len(eff)
+
+    if not n_rows:
+        raise ValueError("The uploaded file has no data rows.")
+
+    sums, counts, row_pos = np.concatenate(sums), np.concatenate(counts), np.concatenate(row_pos)
+    # Merge neighbouring buckets until the chart fits MAX_CHART_POINTS (count-weighted means)
+    group = int(np.ceil(len(sums) / MAX_CHART_POINTS))
+    if group > 1:
+        edges = np.arange(0, len(sums), group)
+        sums, counts, row_pos = np.add.reduceat(sums, edges), np.add.reduceat(counts, edges), row_pos[edges]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trace = np.where(counts > 0, sums / counts, np.nan)
+
+    return {
+        "rows": n_rows,
+        "valid": n,
+        "mean": mean if n else np.nan,
+        "std": np.sqrt(m2 / (n - 1)) if n > 1 else np.nan,
+        "min": lo if n else np.nan,
+        "max": hi if n else np.nan,
+        "chart": pd.DataFrame({"Efficiency (%)": trace}, index=pd.Index(row_pos, name="Row"))
+    }
+
+
+def export_rows(data):
+    """
+    Per-row results CSV: every uploaded column plus Efficiency (%).
+
+    The pyarrow batches are streamed through a CSVWriter with the efficiency
+    column appended, so the upload is parsed once and no DataFrame of the
+    whole file is built. Columns other than REQUIRED_COLUMNS are kept as the
+    uploaded text.
+
+    Returns:
+        bytes: UTF-8 CSV
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pa_csv
+
+    types = {c: pa.float64() if c in REQUIRED_COLUMNS else pa.string() for c in read_header(data)}
+    reader = pa_csv.open_csv(
+        _buffer_reader(data),
+        read_options=pa_csv.ReadOptions(block_size=BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(column_types=types, strings_can_be_null=True)
+    )
+    schema = reader.schema.append(pa.field("Efficiency (%)", pa.float64()))
+    out = io.BytesIO()
+    with pa_csv.CSVWriter(out, schema, write_options=pa_csv.WriteOptions(quoting_style="needed")) as writer:
+        for batch in reader:
+            eff = pc.multiply(pc.divide(batch.column("Energy_Output"), batch.column("Fuel_Mass")), 100.0)
+            writer.write_batch(pa.RecordBatch.from_arrays(batch.columns + [eff], schema=schema))
+    return out.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def cached_analysis(digest, _data=None):
+    return analyze_fuel_log(_data)
 
 
 def run():
@@ -16,23 +158,43 @@ def run():
 
     if uploaded_file:
         try:
-            # Decode file using BytesIO
-            stringio = io.StringIO(uploaded_file.getvalue().decode("utf-8"))
-            df = pd.read_csv(stringio)
+            # Work on the upload's buffer directly: no decode, no StringIO copy
+            data = uploaded_file.getbuffer()
+            missing = [c for c in REQUIRED_COLUMNS if c not in read_header(data)]
+            if missing:
+                st.warning("⚠️ Columns `Fuel_Mass` and `Energy_Output` are required.")
+                return
+
+            digest = hashlib.md5(data).hexdigest()
+            with st.spinner("Parsing combustion log..."):
+                result = cached_analysis(digest, _data=data)
             st.success("✅ File uploaded successfully.")
-            st.dataframe(df.head())
+            st.dataframe(read_preview(data))
 
-            if 'Fuel_Mass' in df.columns and 'Energy_Output' in df.columns:
-                df['Efficiency (%)'] = (df['Energy_Output'] / df['Fuel_Mass']) * 100
-                st.line_chart(df[['Efficiency (%)']])
+            invalid = result["rows"] - result["valid"]
+            if invalid:
+                st.warning(f"⚠️ {invalid:,} rows with missing or non-positive `Fuel_Mass` were excluded.")
 
-                st.metric("🔥 Average Efficiency (%)", round(df['Efficiency (%)'].mean(), 2))
+            st.line_chart(result["chart"])
+            if len(result["chart"]) < result["rows"]:
+                st.caption(f"Chart shows {len(result['chart']):,} bucket means of {result['rows']:,} rows.")
 
-                # Downloadable result
-                result_csv = df.to_csv(index=False).encode('utf-8')
-                st.download_button("📥 Download Results", result_csv, "fuel_efficiency_results.csv", "text/csv")
-            else:
-                st.warning("⚠️ Columns `Fuel_Mass` and `Energy_Output` are required.")
+            col1, col2, col3 = st.columns(3)
+            col1.metric("🔥 Average Efficiency (%)", round(result["mean"], 2))
+            col2.metric("📉 Std Dev (%)", round(result["std"], 2))
+            col3.metric("🧮 Rows", f"{result['rows']:,}")
+
+            summary = pd.DataFrame({
+                "Metric": ["Rows", "Valid Rows", "Mean (%)", "Std (%)", "Min (%)", "Max (%)"],
+                "Value": [result["rows"], result["valid"], result["mean"], result["std"], result["min"], result["max"]]
+            })
+            st.table(summary)
+
+            # Downloadable results: every row with its efficiency (written only on click), and the summary table
+            st.download_button("📥 Download Results", lambda: export_rows(data), "fuel_efficiency_results.csv",
+                               "text/csv")
+            summary_csv = summary.to_csv(index=False).encode('utf-8')
+            st.download_button("📥 Download Summary", summary_csv, "fuel_efficiency_summary.csv", "text/csv")
 
         except Exception as e:
             st.error(f"❌ Error processing file: {str(e)}")
@@ -0,0 +1,147 @@
+# import_budget.py
+"""
+Import-Time Budget Check for the Thermodynamics Tools
+
+Policy:
+- app6.py exec()s the selected tool on every rerun, so a tool's module level
+  may only import the standard library, streamlit, numpy, pandas and sibling
+  helper modules (the launcher already has those loaded)
+- Heavy libraries (sklearn, scipy, matplotlib, plotly, seaborn, fpdf, pyarrow,
+  joblib) are imported inside the function that uses them
+- Computation lives in modules/Thermodynamics/core, which imports nothing
+  but NumPy (no Streamlit, no pandas)
+- Each tool has a measured import budget; `python import_budget.py` exits
+  non-zero if a tool exceeds it, pulls in a heavy library at import time,
+  or the core package imports anything besides NumPy
+
+Each tool is measured in a fresh interpreter, exactly as the launcher runs it:
+app6.py puts both the repo root and tools/ on sys.path, and so does the probe.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(TOOLS_DIR, "..", "..", ".."))
+
+LAUNCHER_MODULES = ("streamlit", "numpy", "pandas")
+HEAVY_MODULES = ("sklearn", "scipy", "matplotlib", "plotly", "seaborn", "fpdf", "pyarrow", "joblib")
+CORE_PACKAGE = "modules.Thermodynamics.core"
+CORE_ALLOWED = ("numpy", "modules")
+
+# Import budgets (ms) on top of the launcher modules; measured times are
+# 1-15 ms, the budgets leave room for slower machines
+DEFAULT_BUDGET_MS = 100
+IMPORT_BUDGET_MS = {
+    "emission_estimator": 100,
+    "energy_efficiency_analyzer": 100,
+    "fuel_efficiency_analyzer": 100,
+    "props": 100,
+    "Process_Optimization_Dashboard": 100,
+    "combustion_efficiency_simulator": 100,
+    "combustion": 100,
+    "Equipment_Efficiency_Analyzer": 100,
+    "energy_loss_visualizer": 100,
+    "process_variability": 150,
+    "equipment_failure_predictor": 100,
+    "yield_predictor": 100,
+    "flame_temperature": 150,
+}
+
+_PROBE = """
+import sys, time, json
+for name in {launcher!r}:
+    __import__(name)
+sys.path.insert(0, {repo_root!r})
+sys.path.append({tools_dir!r})
+before = set(sys.modules)
+with open({path!r}, encoding="utf-8") as f:
+    code = compile(f.read(), {path!r}, "exec")
+start = time.perf_counter()
+exec(code, {{"__name__": "__tool__"}})
+elapsed = (time.perf_counter() - start) * 1000
+loaded = sorted({{m.split(".")[0] for m in set(sys.modules) - before}})
+print(json.dumps({{"ms": elapsed, "loaded": loaded}}))
+"""
+
+_CORE_PROBE = """
+import sys, time, json
+sys.path.insert(0, {repo_root!r})
+before = set(sys.modules)
+start = time.perf_counter()
+import {package}
+elapsed = (time.perf_counter() - start) * 1000
+loaded = sorted({{m.split(".")[0] for m in set(sys.modules) - before}})
+print(json.dumps({{"ms": elapsed, "loaded": loaded}}))
+"""
+
+
+def measure_tool(tool):
+    """
+    Import time of one tool in a fresh interpreter, with the launcher modules preloaded.
+
+    Returns:
+        dict: ms (float) and loaded (top-level packages newly imported by the tool)
+    """
+    path = os.path.join(TOOLS_DIR, tool + ".py")
+    probe = _PROBE.format(launcher=LAUNCHER_MODULES, repo_root=REPO_ROOT, tools_dir=TOOLS_DIR, path=path)
+    return _run_probe(probe)
+
+
+def _run_probe(probe):
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+                         env={**os.environ, "STREAMLIT_LOG_LEVEL": "error"})
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def check_core():
+    """
+    Import the core package in a bare interpreter.
+
+    Returns:
+        dict: ms, extra (non-stdlib packages other than CORE_ALLOWED) and ok
+    """
+    probe = _CORE_PROBE.format(repo_root=REPO_ROOT, package=CORE_PACKAGE)
+    result = _run_probe(probe)
+    extra = [m for m in result["loaded"] if m not in sys.stdlib_module_names and m not in CORE_ALLOWED]
+    return {"ms": result["ms"], "extra": extra, "ok": not extra}
+
+
+def check_budgets(tools=None, repeats=3):
+    """
+    Measure every tool (best of `repeats` runs) against its budget.
+
+    Returns:
+        list of dict: tool, ms, budget_ms, heavy (heavy packages imported) and ok
+    """
+    results = []
+    for tool in tools or IMPORT_BUDGET_MS:
+        runs = [measure_tool(tool) for _ in range(repeats)]
+        ms = min(r["ms"] for r in runs)
+        heavy = [m for m in runs[0]["loaded"] if m in HEAVY_MODULES]
+        budget = IMPORT_BUDGET_MS.get(tool, DEFAULT_BUDGET_MS)
+        results.append({"tool": tool, "ms": ms, "budget_ms": budget, "heavy": heavy,
+                        "ok": ms <= budget and not heavy})
+    return results
+
+
+def main():
+    core = check_core()
+    extra = f"  imports: {', '.join(core['extra'])}" if core["extra"] else ""
+    print(f"{'OK  ' if core['ok'] else 'FAIL'} {CORE_PACKAGE:<34} {core['ms']:7.1f} ms (NumPy only){extra}")
+
+    results = check_budgets(sys.argv[1:] or None)
+    for r in results:
+        status = "OK  " if r["ok"] else "FAIL"
+        heavy = f"  heavy imports: {', '.join(r['heavy'])}" if r["heavy"] else ""
+        print(f"{status} {r['tool']:<34} {r['ms']:7.1f} ms / {r['budget_ms']} ms{heavy}")
+    failed = [r["tool"] for r in results if not r["ok"]] + ([CORE_PACKAGE] if not core["ok"] else [])
+    if failed:
+        print(f"\n{len(failed)} check(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# model_registry.py
+"""
+Model Registry
+
+Features:
+- Versioned model artifacts under ai_model/registry/<name>/v<N>/
+- Metadata per version (feature names, data hash, metrics, parameters)
+- Lazy, memory-mapped loading with joblib (mmap_mode='r') and an in-process cache
+- Lookup by data hash so tools reuse a fitted model instead of refitting
+- The pre-registry ai_model/model.pkl is imported once as a registered version
+
+Used in: train_model.py, combustion.py, yield_predictor.py, equipment_failure_predictor.py.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+
+REGISTRY_DIR = os.path.join("ai_model", "registry")
+LEGACY_MODEL_PATH = os.path.join("ai_model", "model.pkl")
+
+_LOADED = {}
+
+
+def compute_data_hash(*frames):
+    """
+    Hash one or more DataFrames / Series (values, column names and dtypes).
+    """
+    import pandas as pd
+
+    digest = hashlib.sha256()
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+        names = frame.columns if hasattr(frame, "columns") else [frame.name]
+        digest.update("|".join(map(str, names)).encode())
+        digest.update(str(getattr(frame, "dtypes", getattr(frame, "dtype", ""))).encode())
+    return digest.hexdigest()[:16]
+
+
+def _model_dir(name):
+    return os.path.join(REGISTRY_DIR, name)
+
+
+def list_versions(name):
+    """Return metadata dicts for every version of a model, oldest first."""
+    root = _model_dir(name)
+    if not os.path.isdir(root):
+        return []
+    versions = []
+    for entry in os.listdir(root):
+        meta_path = os.path.join(root, entry, "metadata.json")
+        if entry.startswith("v") and entry[1:].isdigit() and os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                versions.append(json.load(f))
+    return sorted(versions, key=lambda m: m["version"])
+
+
+def register_model(name, model, feature_names=None, data_hash=None, metrics=None, params=None):
+    """
+    Save a fitted model as the next version of `name`.
+
+    The artifact is written uncompressed so it can be memory-mapped on load.
+    Concurrent registrations of the same name each claim their own version:
+    creating v<N> fails for all but one writer, and the others move on to v<N+1>.
+
+    Returns:
+        int: The new version number
+    """
+    import joblib
+    import sklearn
+
+    os.makedirs(_model_dir(name), exist_ok=True)
+    # Start after the highest claimed directory (complete or not) so a crashed
+    # or in-flight registration is never reused
+    claimed = [int(e[1:]) for e in os.listdir(_model_dir(name)) if e.startswith("v") and e[1:].isdigit()]
+    version = max(claimed, default=0) + 1
+    while True:
+        version_dir = os.path.join(_model_dir(name), f"v{version}")
+        try:
+            os.mkdir(version_dir)
+            break
+        except FileExistsError:
+            version += 1
+
+    joblib.dump(model, os.path.join(version_dir, "model.joblib"))
+    metadata = {
+        "name": name,
+        "version": version,
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "feature_names": list(map(str, feature_names)) if feature_names is not None else None,
+        "data_hash": data_hash,
+        "metrics": {k: float(v) for k, v in (metrics or {}).items()},
+        "params": params or {},
+        "sklearn_version": sklearn.__version__
+    }
+    # metadata.json is written last and atomically: a version without it is
+    # incomplete and ignored, and readers never see a partly written file
+    tmp_path = os.path.join(version_dir, "metadata.json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp_path, os.path.join(version_dir, "metadata.json"))
+    return version
+
+
+def load_model(name, version=None):
+    """
+    Load a registered model (latest version by default), memory-mapped and cached.
+
+    Returns:
+        (model, metadata)
+    """
+    import joblib
+
+    versions = list_versions(name)
+    if not versions:
+        raise FileNotFoundError(f"No registered versions of model '{name}'")
+    if version is None:
+        metadata = versions[-1]
+    else:
+        matches = [m for m in versions if m["version"] == version]
+        if not matches:
+            raise FileNotFoundError(f"Model '{name}' has no version {version}")
+        metadata = matches[0]
+
+    key = (name, metadata["version"])
+    if key not in _LOADED:
+        path = os.path.join(_model_dir(name), f"v{metadata['version']}", "model.joblib")
+        _LOADED[key] = joblib.load(path, mmap_mode="r")
+    return _LOADED[key], metadata
+
+
+def find_model(name, data_hash, params=None):
+    """
+    Latest version trained on the same data (and parameters, if given), or None.
+
+    Returns:
+        (model, metadata) or None
+    """
+    for metadata in reversed(list_versions(name)):
+        if metadata["data_hash"] == data_hash and (params is None or metadata["params"] == params):
+            return load_model(name, metadata["version"])
+    return None
+
+
+def import_legacy_model(name, path=LEGACY_MODEL_PATH, feature_names=None, metrics=None):
+    """
+    Register a pre-registry pickle (e.g. ai_model/model.pkl) as a version of `name`.
+
+    The file hash is stored in the version params, so the pickle is imported
+    once and later calls return the existing version.
+
+    Returns:
+        int: The version holding this file
+    """
+    import joblib
+
+    with open(path, "rb") as f:
+        file_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+    for metadata in reversed(list_versions(name)):
+        if metadata["params"].get("source_hash") == file_hash:
+            return metadata["version"]
+    model = joblib.load(path)
+    if feature_names is None:
+        feature_names = getattr(model, "feature_names_in_", None)
+    return register_model(name, model, feature_names, metrics=metrics,
+                          params={"source": path.replace(os.sep, "/"), "source_hash": file_hash})
@@ -4,14 +4,382 @@
 
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import io
+import hashlib
 import numpy as np
-import threading
 
-# For thread-safe plotting
-_lock = threading.Lock()
+from spc_engine import SPCEngine, MultivariateSPC, WE_RULES, decimate_index
+
+CHUNK_ROWS = 500_000    # Rows read from the CSV per chunk
+CHART_BUCKETS = 1000    # Min/max buckets per chunk (and in the final chart)
+MAX_PLOTTED_ALARMS = 5000
+TOP_ALARMS = 20         # Worst multivariate alarms kept with full contributions
+
+
+def _file_digest(uploaded_file):
+    return hashlib.md5(uploaded_file.getvalue()).hexdigest()
+
+
+def _read_chunks(uploaded_file, time_col, columns):
+    """Yield time-sorted chunks of the selected columns with parsed timestamps."""
+    uploaded_file.seek(0)
+    for chunk in pd.read_csv(uploaded_file, usecols=[time_col] + columns, chunksize=CHUNK_ROWS):
+        chunk[time_col] = pd.to_datetime(chunk[time_col], errors='coerce')
+        yield chunk.dropna(subset=[time_col]).sort_values(by=time_col)
+
+
+@st.cache_data(show_spinner=False)
+def analyze_univariate(digest, time_col, metric, baseline_n, L, lam, k, h, _source=None):
+    """
+    Stream the CSV through the SPC engine chunk by chunk.
+
+    Only decimated chart series and the alarm rows are kept, so memory stays
+    bounded by the chart size and the number of alarms, not the history length.
+    Cached on the file digest and parameters (`_source` is not hashed).
+
+    Returns:
+        dict: n, mean, sigma, max_dev, out_of_order, decimated series and alarm table
+    """
+    engine = None
+    series = {key: [] for key in ("time", "value", "ewma", "ewma_ucl", "ewma_lcl", "cusum_pos", "cusum_neg")}
+    alarms = []
+    n_total = 0
+    max_dev = 0.0
+    out_of_order = 0
+    last_time = None
+
+    for chunk in _read_chunks(_source, time_col, [metric]):
+        if chunk.empty:
+            continue
+        times = chunk[time_col].to_numpy()
+        values = chunk[metric].to_numpy(dtype=np.float64)
+        if last_time is not None and times[0] < last_time:
+            out_of_order += 1
+        last_time = times[-1]
+
+        if engine is None:
+            engine = SPCEngine.from_baseline(values[:baseline_n], lam=lam, L=L, k=k, h=h)
+        stats = engine.update(values)
+
+        n_total += len(values)
+        dev = np.abs(values - engine.mean)
+        if np.isfinite(dev).any():
+            max_dev = max(max_dev, float(np.nanmax(dev)))
+
+        # Keep only the min/max of each chart bucket; every series uses the same indices
+        keep = decimate_index(values, CHART_BUCKETS)
+        for key in series:
+            source = times if key == "time" else values if key == "value" else stats[key]
+            series[key].append(source[keep])
+
+        flagged = np.flatnonzero(stats["out_of_control"])
+        if flagged.size:
+            table = pd.DataFrame({
+                time_col: times[flagged],
+                metric: values[flagged],
+                "EWMA": stats["ewma"][flagged],
+                "CUSUM+": stats["cusum_pos"][flagged],
+                "CUSUM-": stats["cusum_neg"][flagged],
+                f"Shewhart ±{L}σ": stats["shewhart"][flagged],
+                "EWMA Alarm": stats["ewma_alarm"][flagged],
+                "CUSUM Alarm": stats["cusum_alarm"][flagged]
+            })
+            for i, rule in enumerate(WE_RULES):
+                table[rule] = stats["rules"][flagged, i]
+            alarms.append(table)
+
+    if engine is None:
+        raise ValueError("No rows with a valid timestamp were found.")
+
+    alarms = pd.concat(alarms, ignore_index=True) if alarms else pd.DataFrame()
+    return {
+        "n": n_total,
+        "mean": engine.mean,
+        "sigma": engine.sigma,
+        "max_dev": max_dev,
+        "out_of_order": out_of_order,
+        "series": {key: np.concatenate(parts) for key, parts in series.items()},
+        "alarms": alarms
+    }
+
+
+def plot_univariate(result, metric, L, h):
+    from matplotlib.figure import Figure
+
+    # Second min/max pass over the per-chunk decimations
+    keep = decimate_index(result["series"]["value"], CHART_BUCKETS)
+    series = {key: values[keep] for key, values in result["series"].items()}
+    alarms = result["alarms"]
+    mean, sigma = result["mean"], result["sigma"]
+
+    fig = Figure(figsize=(14, 8))
+    ax, ax_cusum = fig.subplots(2, 1, sharex=True, gridspec_kw={"height_ratios": [2, 1]})
+    ax.plot(series["time"], series["value"], linewidth=0.8, label="Process Value")
+    ax.plot(series["time"], series["ewma"], color="green", label="EWMA")
+    ax.plot(series["time"], series["ewma_ucl"], color="purple", linestyle=":", label="EWMA Limits")
+    ax.plot(series["time"], series["ewma_lcl"], color="purple", linestyle=":")
+    ax.axhline(mean, color="black", linewidth=0.8, label="Centre Line")
+    ax.axhline(mean + L * sigma, color="red", linestyle="--", label=f"UCL (+{L}σ)")
+    ax.axhline(mean - L * sigma, color="orange", linestyle="--", label=f"LCL (-{L}σ)")
+    ax.axhspan(mean - L * sigma, mean + L * sigma, color="gray", alpha=0.1)
+
+    # Highlight out-of-control points (evenly thinned if there are very many)
+    if not alarms.empty:
+        shown = alarms.iloc[::max(len(alarms) // MAX_PLOTTED_ALARMS, 1)]
+        ax.scatter(shown.iloc[:, 0], shown[metric], color='red', s=20, zorder=5, label='Out of Control')
+
+    ax.set_title("SPC Control Chart (Shewhart + EWMA)")
+    ax.set_ylabel(metric)
+    ax.legend(loc="upper right")
+    ax.grid(True)
+
+    ax_cusum.plot(series["time"], series["cusum_pos"], color="red", label="CUSUM+")
+    ax_cusum.plot(series["time"], series["cusum_neg"], color="blue", label="CUSUM−")
+    ax_cusum.axhline(h, color="black", linestyle="--", label=f"h = {h}σ")
+    ax_cusum.set_xlabel("Time")
+    ax_cusum.set_ylabel("CUSUM (σ)")
+    ax_cusum.legend(loc="upper right")
+    ax_cusum.grid(True)
+    fig.tight_layout()
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def analyze_multivariate(digest, time_col, columns, baseline_n, var_explained, alpha, refit_rows=None,
+                         forgetting=1.0, _source=None):
+    """
+    Stream the CSV through a Hotelling T² / PCA-SPE model fitted on the first rows.
+
+    Every selected column is analysed together in one pass over the file.
+    Contributions are accumulated over all alarms and kept in full for the
+    TOP_ALARMS rows with the largest T². With refit_rows set, the model is
+    refitted after every block of refit_rows samples on that block's in-control
+    rows (older data weighted by forgetting); alarms are always explained
+    against the model that raised them.
+
+    Returns:
+        dict: model, n, decimated T²/SPE series and limits, alarm table, mean
+        alarm contributions and the worst alarms with their contributions
+    """
+    model = None
+    series = {key: [] for key in ("time", "t2", "spe", "t2_limit", "spe_limit")}
+    alarms = []
+    t2_sum = np.zeros(len(columns))
+    spe_sum = np.zeros(len(columns))
+    worst = pd.DataFrame()
+    n_total = 0
+
+    for chunk in _read_chunks(_source, time_col, columns):
+        if chunk.empty:
+            continue
+        chunk_times = chunk[time_col].to_numpy()
+        chunk_X = chunk[columns].to_numpy(dtype=np.float64)
+        baseline = model is None
+        starts = list(range(0, len(chunk), refit_rows or len(chunk)))
+        if baseline:
+            model = MultivariateSPC(var_explained=var_explained, alpha=alpha, refit_every=1 if refit_rows else None,
+                                    forgetting=forgetting).fit(chunk_X[:baseline_n])
+            if refit_rows:
+                # The baseline rows form their own block so they are not merged into the model twice
+                starts = [0] + list(range(min(baseline_n, len(chunk)), len(chunk), refit_rows))
+
+        for lo, hi in zip(starts, starts[1:] + [len(chunk)]):
+            times, X = chunk_times[lo:hi], chunk_X[lo:hi]
+            stats = model.update(X, learn=False)
+            n_total += len(X)
+
+            keep = decimate_index(stats["t2"], CHART_BUCKETS)
+            series["time"].append(times[keep])
+            series["t2"].append(stats["t2"][keep])
+            series["spe"].append(stats["spe"][keep])
+            series["t2_limit"].append(np.full(len(keep), stats["t2_limit"]))
+            series["spe_limit"].append(np.full(len(keep), stats["spe_limit"]))
+
+            flagged = np.flatnonzero(stats["out_of_control"])
+            if flagged.size:
+                t2_c, spe_c = model.contributions(X[flagged])
+                t2_sum += t2_c.sum(axis=0)
+                spe_sum += spe_c.sum(axis=0)
+                table = pd.DataFrame({
+                    time_col: times[flagged],
+                    "T2": stats["t2"][flagged],
+                    "SPE": stats["spe"][flagged],
+                    "T2 Alarm": stats["t2_alarm"][flagged],
+                    "SPE Alarm": stats["spe_alarm"][flagged]
+                })
+                # Variable with the largest T² contribution, for the alarm report
+                table["Top Contributor"] = np.asarray(columns)[np.argmax(np.abs(t2_c), axis=1)]
+                alarms.append(table)
+
+                top = np.argsort(stats["t2"][flagged])[::-1][:TOP_ALARMS]
+                candidates = pd.DataFrame(t2_c[top], columns=columns)
+                candidates.insert(0, "SPE", stats["spe"][flagged][top])
+                candidates.insert(0, "T2", stats["t2"][flagged][top])
+                candidates.insert(0, time_col, times[flagged][top])
+                spe_part = pd.DataFrame(spe_c[top], columns=[f"SPE:{c}" for c in columns])
+                candidates = pd.concat([candidates, spe_part], axis=1)
+                worst = pd.concat([worst, candidates], ignore_index=True).nlargest(TOP_ALARMS, "T2")
+
+            if not (baseline and lo == 0):
+                model.learn(X, stats["out_of_control"])
+
+    if model is None:
+        raise ValueError("No rows with a valid timestamp were found.")
+
+    alarms = pd.concat(alarms, ignore_index=True) if alarms else pd.DataFrame()
+    n_alarms = max(len(alarms), 1)
+    return {
+        "model": model,
+        "n": n_total,
+        "series": {key: np.concatenate(parts) for key, parts in series.items()},
+        "alarms": alarms,
+        "mean_contrib": pd.DataFrame({"T²": t2_sum / n_alarms, "SPE": spe_sum / n_alarms}, index=columns),
+        "worst": worst.reset_index(drop=True)
+    }
+
+
+def plot_multivariate(result):
+    from matplotlib.figure import Figure
+
+    model = result["model"]
+    keep = decimate_index(result["series"]["t2"], CHART_BUCKETS)
+    series = {key: values[keep] for key, values in result["series"].items()}
+
+    fig = Figure(figsize=(14, 8))
+    ax_t2, ax_spe = fig.subplots(2, 1, sharex=True)
+    ax_t2.plot(series["time"], series["t2"], linewidth=0.8, label="Hotelling T²")
+    # Limits are plotted as series: they step at every rolling refit and are flat otherwise
+    ax_t2.plot(series["time"], series["t2_limit"], color="red", linestyle="--", drawstyle="steps-post",
+               label=f"UCL ({model.alpha:.1%}, {model.n_components_} PCs)")
+    ax_t2.set_title("Multivariate SPC: Hotelling T² and SPE")
+    ax_t2.set_ylabel("T²")
+    ax_t2.legend(loc="upper right")
+    ax_t2.grid(True)
+
+    ax_spe.plot(series["time"], series["spe"], color="purple", linewidth=0.8, label="SPE (Q)")
+    if np.isfinite(series["spe_limit"]).any():
+        ax_spe.plot(series["time"], series["spe_limit"], color="red", linestyle="--", drawstyle="steps-post",
+                    label="UCL")
+    ax_spe.set_xlabel("Time")
+    ax_spe.set_ylabel("SPE")
+    ax_spe.legend(loc="upper right")
+    ax_spe.grid(True)
+    fig.tight_layout()
+    return fig
+
+
+def plot_contributions(contrib, title):
+    """Horizontal bar chart of per-variable contributions, largest at the top."""
+    from matplotlib.figure import Figure
+
+    contrib = contrib.sort_values(key=np.abs)
+    fig = Figure(figsize=(8, max(3, 0.3 * len(contrib))))
+    ax = fig.subplots()
+    ax.barh(contrib.index.astype(str), contrib.values,
+            color=np.where(contrib.values >= 0, "tab:red", "tab:blue"))
+    ax.set_title(title)
+    ax.set_xlabel("Contribution")
+    ax.grid(True, axis="x")
+    fig.tight_layout()
+    return fig
+
+
+def _univariate_view(uploaded_file, time_col, numeric_cols):
+    metric = st.selectbox("📈 Select Variable to Analyze", numeric_cols)
+    sigma_level = st.slider("🔧 Sigma Control Limits", 1.0, 4.0, value=3.0, step=0.5)
+    baseline_n = st.number_input("📏 Baseline Samples (Phase I limits)", min_value=10, value=500, step=10)
+    col_a, col_b, col_c = st.columns(3)
+    lam = col_a.slider("🌀 EWMA λ", 0.05, 1.0, value=0.2, step=0.05)
+    k = col_b.slider("CUSUM k (σ)", 0.25, 1.5, value=0.5, step=0.25)
+    h = col_c.slider("CUSUM h (σ)", 2.0, 10.0, value=5.0, step=0.5)
+
+    # === SPC Calculation (streamed in chunks, cached per file + settings) ===
+    with st.spinner("Running SPC engine..."):
+        result = analyze_univariate(_file_digest(uploaded_file), time_col, metric, int(baseline_n),
+                                    sigma_level, lam, k, h, _source=uploaded_file)
+
+    alarms = result["alarms"]
+    percent_ooc = (len(alarms) / result["n"]) * 100 if result["n"] > 0 else 0
+    if result["out_of_order"]:
+        st.warning("⚠️ Timestamps are not sorted across the file; chunks were analysed in file order.")
+
+    # === Metrics Display ===
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("🚨 Out of Control Points", f"{len(alarms)}")
+    col2.metric("📉 Max Deviation", f"{result['max_dev']:.2f}")
+    col3.metric("📊 % Out of Control", f"{percent_ooc:.2f} %")
+    col4.metric("🧮 Samples Analysed", f"{result['n']:,}")
+    st.caption(f"Phase I limits from the first {int(baseline_n)} samples: "
+               f"μ = {result['mean']:.3f}, σ = {result['sigma']:.3f} (moving range)")
+
+    if not alarms.empty:
+        rule_cols = [c for c in alarms.columns if c.startswith(("Shewhart", "EWMA Alarm", "CUSUM Alarm", "Rule"))]
+        st.dataframe(alarms[rule_cols].sum().rename("Alarms").to_frame(), use_container_width=True)
+
+    # === SPC Chart ===
+    st.subheader("📊 SPC Control Chart")
+    fig = plot_univariate(result, metric, sigma_level, h)
+    st.pyplot(fig)
+    return alarms, fig
+
+
+def _multivariate_view(uploaded_file, time_col, numeric_cols):
+    columns = st.multiselect("📈 Variables to Monitor Together", numeric_cols, default=numeric_cols)
+    if len(columns) < 2:
+        st.warning("⚠️ Select at least two variables for multivariate SPC.")
+        return None, None
+    baseline_n = st.number_input("📏 Baseline Samples (Phase I model)", min_value=10, value=1000, step=10)
+    col_a, col_b = st.columns(2)
+    var_explained = col_a.slider("🧭 PCA Variance Retained", 0.5, 1.0, value=0.9, step=0.05)
+    alpha = col_b.select_slider("🔧 Control Limit Confidence", [0.95, 0.99, 0.995, 0.999], value=0.99)
+    refit_rows, forgetting = None, 1.0
+    if st.checkbox("🔄 Rolling model update (refit on in-control samples)"):
+        col_c, col_d = st.columns(2)
+        refit_rows = int(col_c.number_input("Refit every N samples", min_value=100, value=10_000, step=1000))
+        forgetting = col_d.slider("Forgetting factor (1 = keep all history)", 0.5, 1.0, value=1.0, step=0.01)
+
+    with st.spinner("Running multivariate SPC..."):
+        result = analyze_multivariate(_file_digest(uploaded_file), time_col, columns, int(baseline_n),
+                                      var_explained, alpha, refit_rows, forgetting, _source=uploaded_file)
+
+    alarms = result["alarms"]
+    model = result["model"]
+    percent_ooc = (len(alarms) / result["n"]) * 100 if result["n"] > 0 else 0
+
+    # === Metrics Display ===
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("🚨 Out of Control Points", f"{len(alarms)}")
+    col2.metric("📊 % Out of Control", f"{percent_ooc:.2f} %")
+    col3.metric("🧭 Principal Components", f"{model.n_components_} / {len(columns)}")
+    col4.metric("🧮 Samples Analysed", f"{result['n']:,}")
+    if model.n_refits_:
+        st.caption(f"T² limit = {model.t2_limit_:.2f}, SPE limit = {model.spe_limit_:.2f} "
+                   f"(after {model.n_refits_} rolling refits from the first {int(baseline_n)} samples)")
+    else:
+        st.caption(f"T² limit = {model.t2_limit_:.2f}, SPE limit = {model.spe_limit_:.2f} "
+                   f"(fitted on the first {int(baseline_n)} samples)")
+
+    st.subheader("📊 T² / SPE Control Charts")
+    fig = plot_multivariate(result)
+    st.pyplot(fig)
+
+    if not alarms.empty:
+        # === Contribution Plots ===
+        st.subheader("🧩 Variable Contributions")
+        col1, col2 = st.columns(2)
+        col1.pyplot(plot_contributions(result["mean_contrib"]["T²"], "Mean T² Contribution (all alarms)"))
+        col2.pyplot(plot_contributions(result["mean_contrib"]["SPE"], "Mean SPE Contribution (all alarms)"))
+
+        worst = result["worst"]
+        labels = [f"{t}  (T² = {v:.1f})" for t, v in zip(worst[time_col], worst["T2"])]
+        pick = st.selectbox("🔍 Inspect one of the worst alarms", range(len(worst)), format_func=labels.__getitem__)
+        row = worst.iloc[pick]
+        col1, col2 = st.columns(2)
+        col1.pyplot(plot_contributions(row[columns].astype(float), "T² Contribution"))
+        col2.pyplot(plot_contributions(row[[f"SPE:{c}" for c in columns]].astype(float).set_axis(columns),
+                                       "SPE Contribution"))
+    return alarms, fig
+
 
 def run():
     st.set_page_config(page_title="📊 Process Variability Analyzer", layout="wide")
@@ -31,75 +399,36 @@ def run():
         return
 
     try:
-        # === Data Read & Preview ===
-        df = pd.read_csv(uploaded_file)
+        # === Data Preview (column detection only; the full file is streamed later) ===
+        preview = pd.read_csv(uploaded_file, nrows=1000)
         st.success("✅ File uploaded successfully!")
-        st.dataframe(df.head(), use_container_width=True)
+        st.dataframe(preview.head(), use_container_width=True)
 
         # === Column Detection ===
-        numeric_cols = df.select_dtypes(include=["float64", "int64"]).columns.tolist()
-        time_col = next((col for col in df.columns if 'time' in col.lower() or 'date' in col.lower()), None)
+        numeric_cols = preview.select_dtypes(include=["float64", "int64"]).columns.tolist()
+        time_col = next((col for col in preview.columns if 'time' in col.lower() or 'date' in col.lower()), None)
 
         if not time_col or not numeric_cols:
             st.warning("⚠️ CSV must contain at least one time/date column and one numeric column.")
             return
 
-        # === Time Preprocessing ===
-        df[time_col] = pd.to_datetime(df[time_col], errors='coerce')
-        df = df.dropna(subset=[time_col])
-        df = df.sort_values(by=time_col)
-
-        # === User Inputs ===
-        metric = st.selectbox("📈 Select Variable to Analyze", numeric_cols)
-        rolling_window = st.slider("🌀 Rolling Window Size", 2, 50, value=5)
-        sigma_level = st.slider("🔧 Sigma Control Limits", 1.0, 4.0, value=3.0, step=0.5)
-
-        # === SPC Calculation ===
-        df['Mean'] = df[metric].rolling(window=rolling_window).mean()
-        df['StdDev'] = df[metric].rolling(window=rolling_window).std()
-        df['UCL'] = df['Mean'] + sigma_level * df['StdDev']
-        df['LCL'] = df['Mean'] - sigma_level * df['StdDev']
-        df['Out of Control'] = (df[metric] > df['UCL']) | (df[metric] < df['LCL'])
-
-        out_of_control = df[df['Out of Control']]
-        percent_ooc = (len(out_of_control) / len(df)) * 100 if len(df) > 0 else 0
-        max_dev = np.abs(df[metric] - df['Mean']).max()
-
-        # === Metrics Display ===
-        col1, col2, col3 = st.columns(3)
-        col1.metric("🚨 Out of Control Points", f"{len(out_of_control)}")
-        col2.metric("📉 Max Deviation", f"{max_dev:.2f}")
-        col3.metric("📊 % Out of Control", f"{percent_ooc:.2f} %")
-
-        # === SPC Chart ===
-        st.subheader("📊 SPC Control Chart")
-
-        with _lock:
-            fig, ax = plt.subplots(figsize=(14, 6))
-            sns.lineplot(x=df[time_col], y=df[metric], label="Process Value", marker="o", ax=ax)
-            ax.plot(df[time_col], df["Mean"], color="green", label="Mean")
-            ax.plot(df[time_col], df["UCL"], color="red", linestyle="--", label=f"UCL (+{sigma_level}σ)")
-            ax.plot(df[time_col], df["LCL"], color="orange", linestyle="--", label=f"LCL (-{sigma_level}σ)")
-            ax.fill_between(df[time_col], df["LCL"], df["UCL"], color="gray", alpha=0.1)
-
-            # Highlight out-of-control points
-            ax.scatter(out_of_control[time_col], out_of_control[metric],
-                       color='red', s=60, zorder=5, label='Out of Control')
-
-            ax.set_title("SPC Control Chart")
-            ax.set_xlabel("Time")
-            ax.set_ylabel(metric)
-            ax.legend()
-            ax.grid(True)
-            st.pyplot(fig)
+        # === Analysis Mode ===
+        mode = st.radio("🧪 Analysis Mode", ["Univariate (EWMA / CUSUM / Shewhart)",
+                                             "Multivariate (Hotelling T² / SPE)"], horizontal=True)
+        if mode.startswith("Univariate"):
+            alarms, fig = _univariate_view(uploaded_file, time_col, numeric_cols)
+        else:
+            alarms, fig = _multivariate_view(uploaded_file, time_col, numeric_cols)
+            if fig is None:
+                return
 
         # === Export Options ===
         st.subheader("📤 Export Results")
 
         csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False)
+        alarms.to_csv(csv_buffer, index=False)
         st.download_button(
-            "⬇️ Download CSV Report",
+            "⬇️ Download Out-of-Control Report (CSV)",
             data=csv_buffer.getvalue(),
             file_name="spc_analysis_report.csv",
             mime="text/csv"
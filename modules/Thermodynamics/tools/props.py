@@ -8,6 +8,11 @@ Features:
 - Cp vs Temperature plotting
 - Fuel database and curve export
 
+The Cp / ΔH kernels live in core/properties.py (pure NumPy); this module
+re-exports them and adds the Streamlit UI and CSV export. Species registered
+from tabulated Cp data (core/property_tables.py) are evaluated through the
+precomputed tables instead of the polynomials.
+
 Used in: Thermodynamics simulations, optimization tools, and education.
 """
 
@@ -15,50 +20,47 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 
-# === Cp Polynomial Coefficients (simplified NASA format) ===
-CP_COEFFICIENTS = {
-    "Methane (CH4)": [19.89, 5.024e-2, 1.269e-5],
-    "Propane (C3H8)": [14.15, 8.94e-2, -1.09e-5],
-    "Octane (C8H18)": [25.48, 1.52e-1, -7.15e-5],
-    "Hydrogen (H2)": [28.84, -1.01e-2, 1.47e-5],
-    "Carbon Monoxide (CO)": [29.1, -0.191e-2, 0.400e-5]
-}
+from modules.Thermodynamics.core import properties, property_tables
+from modules.Thermodynamics.core.properties import CP_COEFFICIENTS, PRODUCT_CP_COEFFICIENTS, T_MIN, T_MAX
 
-def get_cp(fuel: str, T: float) -> float:
-    """
-    Calculate specific heat capacity Cp at temperature T (K) for given fuel.
-    Returns Cp in J/mol·K.
-    """
-    if fuel not in CP_COEFFICIENTS:
-        raise ValueError(f"No Cp data found for {fuel}")
-    if not (200 <= T <= 1500):
-        raise ValueError(f"Temperature {T}K is outside valid range (200–1500 K)")
+def _is_tabulated(fuel):
+    return isinstance(fuel, str) and fuel not in CP_COEFFICIENTS and fuel in property_tables.available_species()
 
-    a, b, c = CP_COEFFICIENTS[fuel]
-    Cp = a + b * T + c * (T ** 2)
-    return round(Cp, 3)
+def _round_scalar(value):
+    return round(float(value), 3) if np.ndim(value) == 0 else value
 
-def delta_H(fuel: str, T1: float, T2: float, n_mol: float = 1.0) -> float:
+def get_cp(fuel, T):
     """
-    Estimate change in enthalpy (ΔH) for the fuel between T1 and T2 in kJ.
+    Cp (J/mol·K) at T (K): polynomial fuels via core.properties.get_cp,
+    tabulated species via the property tables. Scalars round to 3 decimals.
     """
-    if T1 == T2:
-        return 0.0
+    if _is_tabulated(fuel):
+        return _round_scalar(property_tables.lookup_cp(fuel, T))
+    return properties.get_cp(fuel, T)
+
+def delta_H(fuel, T1, T2, n_mol=1.0):
+    """ΔH (kJ) between T1 and T2; same dispatch and rounding as get_cp."""
+    if _is_tabulated(fuel):
+        return _round_scalar(property_tables.lookup_delta_h(fuel, T1, T2, n_mol))
+    return properties.delta_H(fuel, T1, T2, n_mol)
 
-    T_vals = np.linspace(T1, T2, 100)
-    Cp_vals = np.array([get_cp(fuel, T) for T in T_vals])
-    delta_h_joule = np.trapz(Cp_vals, T_vals) * n_mol
-    delta_h_kj = delta_h_joule / 1000
-    return round(delta_h_kj, 3)
+def delta_S(fuel, T1, T2, n_mol=1.0):
+    """Entropy change (J/K) between T1 and T2 from the property tables."""
+    return _round_scalar(n_mol * (property_tables.lookup_s(fuel, T2) - property_tables.lookup_s(fuel, T1)))
 
 def get_cp_curve(fuel: str, T_range: tuple = (200, 1000), points: int = 100):
     """
     Generate Cp vs T data for plotting or analysis.
-    Returns a tuple of (T_list, Cp_list).
+    Returns a tuple of (T_array, Cp_array).
     """
     T_vals = np.linspace(*T_range, points)
-    Cp_vals = [get_cp(fuel, T) for T in T_vals]
-    return T_vals, Cp_vals
+    return T_vals, get_cp(fuel, T_vals)
+
+def get_available_fuels():
+    """
+    Returns the polynomial fuels plus any registered tabulated species.
+    """
+    return property_tables.available_species()
 
 def export_cp_curve_to_csv(fuel: str, filename="cp_curve.csv"):
     """
@@ -68,12 +70,6 @@ def export_cp_curve_to_csv(fuel: str, filename="cp_curve.csv"):
     df = pd.DataFrame({"Temperature (K)": T_vals, "Cp (J/mol·K)": Cp_vals})
     df.to_csv(filename, index=False)
 
-def get_available_fuels():
-    """
-    Returns a list of fuels with available Cp data.
-    """
-    return list(CP_COEFFICIENTS.keys())
-
 def run():
     """
     Streamlit UI entry point.
@@ -81,6 +77,16 @@ def run():
     st.set_page_config(page_title="🔥 Thermodynamic Properties", layout="centered")
     st.title("🔥 Thermodynamic Property Estimator")
 
+    with st.expander("📄 Add a species from tabulated Cp data"):
+        name = st.text_input("Species name")
+        cp_file = st.file_uploader("CSV with `T` (K) and `Cp` (J/mol·K) columns", type=["csv"])
+        if name and cp_file and st.button("➕ Register species"):
+            try:
+                property_tables.load_tabulated_csv(name, cp_file)
+                st.success(f"✅ Registered {name}")
+            except Exception as e:
+                st.error(f"Error: {e}")
+
     fuel = st.selectbox("Select Fuel", get_available_fuels())
     T1 = st.number_input("Initial Temperature (K)", min_value=200, max_value=1500, value=300)
     T2 = st.number_input("Final Temperature (K)", min_value=200, max_value=1500, value=800)
@@ -90,6 +96,7 @@ def run():
         try:
             delta_h = delta_H(fuel, T1, T2, n)
             st.success(f"ΔH from {T1}K to {T2}K for {n} mol of {fuel} = {delta_h} kJ")
+            st.info(f"ΔS from {T1}K to {T2}K = {delta_S(fuel, T1, T2, n)} J/K")
 
             T_vals, Cp_vals = get_cp_curve(fuel, (T1, T2))
             st.line_chart(pd.DataFrame({"Cp (J/mol·K)": Cp_vals}, index=T_vals))
@@ -0,0 +1,107 @@
+# report_service.py
+"""
+Background PDF Report Service
+
+Features:
+- Reports render on a small background worker pool, off the Streamlit script thread
+- Each report is keyed by a content hash of its inputs; repeat requests reuse the bytes
+- Bounded LRU cache of finished reports
+- Reports render on demand; pending renders are polled without blocking the page
+- Download buttons serve the bytes as a file (no base64 data links in the page)
+
+Used in: Equipment_Efficiency_Analyzer.py, energy_efficiency_analyzer.py,
+Mass Transfer gas_diffusion_loss.py
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 2
+MAX_CACHED_REPORTS = 64
+
+# Threads rather than processes: builders are often defined in exec'd tool
+# code that worker processes could not import
+_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="pdf-report")
+_REPORTS = OrderedDict()  # key -> Future
+_LOCK = threading.Lock()
+
+
+def report_key(name, payload):
+    """Content hash of a report: its name plus the JSON-serialized inputs."""
+    blob = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(f"{name}|{blob}".encode()).hexdigest()[:24]
+
+
+def request_report(name, builder, payload):
+    """
+    Return a Future for the report bytes, starting a render only on a cache miss.
+
+    Args:
+        name (str): Report type, part of the cache key
+        builder (callable): builder(payload) -> PDF bytes
+        payload (dict): JSON-serializable report inputs
+
+    Returns:
+        concurrent.futures.Future
+    """
+    key = report_key(name, payload)
+    with _LOCK:
+        future = _REPORTS.get(key)
+        # Failed renders are not cached, so the next request retries
+        if future is not None and not (future.done() and future.exception() is not None):
+            _REPORTS.move_to_end(key)
+            return future
+        future = _EXECUTOR.submit(builder, payload)
+        _REPORTS[key] = future
+        while len(_REPORTS) > MAX_CACHED_REPORTS:
+            _REPORTS.popitem(last=False)
+    return future
+
+
+def pdf_safe(text):
+    """Drop characters the core PDF fonts cannot encode (e.g. emoji)."""
+    return str(text).encode("latin-1", "ignore").decode("latin-1").strip()
+
+
+def pdf_bytes(pdf):
+    """Serialize an FPDF document to bytes (works with fpdf 1.7 and fpdf2)."""
+    out = pdf.output(dest="S")
+    return out.encode("latin-1") if isinstance(out, str) else bytes(out)
+
+
+def download_report(label, name, builder, payload, file_name, poll_seconds=1.0):
+    """
+    Streamlit download button for a background-rendered report.
+
+    Nothing is rendered until the user asks for it: a "Generate" button
+    submits the render for the current inputs (cached reports are available
+    at once). While the render runs, a small fragment polls the Future every
+    `poll_seconds` without blocking the script, then reruns the page so the
+    download button appears.
+    """
+    import streamlit as st
+
+    key = report_key(name, payload)
+    requested = st.session_state.setdefault("requested_reports", set())
+    if key not in requested:
+        if not st.button("📝 Generate PDF Report", key=f"generate_{name}"):
+            return
+        requested.add(key)
+
+    future = request_report(name, builder, payload)
+    if not future.done():
+        @st.fragment(run_every=poll_seconds)
+        def _poll():
+            if future.done():
+                st.rerun(scope="app")
+            st.info("⏳ Report is being generated in the background...")
+        _poll()
+        return
+    if future.exception() is not None:
+        requested.discard(key)
+        st.error(f"❌ Report generation failed: {future.exception()}")
+        return
+    st.download_button(label, data=future.result(), file_name=file_name, mime="application/pdf")
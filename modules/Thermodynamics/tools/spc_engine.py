@@ -0,0 +1,409 @@
+# spc_engine.py
+"""
+Streaming Statistical Process Control Engine
+
+Features:
+- Individuals (Shewhart), EWMA and tabular CUSUM statistics with O(1) state per variable
+- Chunk-at-a-time updates: results are identical however the history is split
+- Vectorized Western Electric rules (the 7-sample tail is carried between chunks)
+- Multivariate Hotelling T² / PCA-SPE monitoring with per-variable contributions
+- Optional rolling (exponentially weighted) refits of the multivariate model on in-control data
+- Min/max chart decimation so plotting cost is bounded by pixels, not samples
+
+Used in: process_variability.py
+"""
+
+import numpy as np
+
+D2 = 1.128  # Moving-range bias constant for subgroups of 2
+WE_RULES = [
+    "Rule 1: 1 point beyond 3σ",
+    "Rule 2: 2 of 3 beyond 2σ (same side)",
+    "Rule 3: 4 of 5 beyond 1σ (same side)",
+    "Rule 4: 8 in a row on one side"
+]
+_TAIL = 7  # Longest rule window (8) minus the current point
+
+
+def estimate_limits(x):
+    """
+    Phase-I centre line and short-term sigma from a baseline sample.
+
+    Sigma comes from the average moving range (MR̄ / d2), which is robust to
+    slow drift in the baseline, unlike the overall standard deviation.
+
+    Returns:
+        (mean, sigma)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    if x.size < 2:
+        raise ValueError("Baseline needs at least 2 finite samples")
+    sigma = np.abs(np.diff(x)).mean() / D2
+    return float(x.mean()), float(sigma if sigma > 0 else x.std() or 1.0)
+
+
+def western_electric(z, tail=None):
+    """
+    Evaluate Western Electric rules 1–4 for standardized values z = (x − μ) / σ.
+
+    Args:
+        z (np.ndarray): Standardized samples, oldest first
+        tail (np.ndarray): Up to 7 preceding standardized samples from the previous chunk
+
+    Returns:
+        np.ndarray: Boolean matrix (len(z), 4), one column per rule
+    """
+    z = np.asarray(z, dtype=np.float64)
+    tail = np.empty(0) if tail is None else np.asarray(tail, dtype=np.float64)[-_TAIL:]
+    full = np.concatenate([tail, z])
+    pad = len(tail)
+
+    def count(flags, width):
+        # Rolling sum over the combined array, then keep only the new samples
+        csum = np.concatenate([[0], np.cumsum(flags, dtype=np.int32)])
+        end = np.arange(pad + 1, len(full) + 1)
+        start = np.maximum(end - width, 0)
+        return csum[end] - csum[start], end - start
+
+    rules = np.zeros((len(z), 4), dtype=bool)
+    rules[:, 0] = np.abs(z) > 3
+    for col, width, k, level in ((1, 3, 2, 2.0), (2, 5, 4, 1.0)):
+        for side in (full > level, full < -level):
+            hits, _ = count(side, width)
+            # The current point must itself be beyond the limit
+            rules[:, col] |= (hits >= k) & side[pad:]
+    for side in (full > 0, full < 0):
+        hits, span = count(side, 8)
+        rules[:, 3] |= (span == 8) & (hits == 8)
+    return rules
+
+
+class SPCEngine:
+    """
+    Incremental univariate SPC against fixed Phase-I limits.
+
+    Args:
+        mean (float): Centre line μ
+        sigma (float): Process sigma σ
+        lam (float): EWMA smoothing constant λ (0 < λ ≤ 1)
+        L (float): Control-limit width in sigmas for the Shewhart and EWMA charts
+        k (float): CUSUM reference value in sigmas (half the shift to detect)
+        h (float): CUSUM decision interval in sigmas
+    """
+
+    def __init__(self, mean, sigma, lam=0.2, L=3.0, k=0.5, h=5.0):
+        if not 0 < lam <= 1:
+            raise ValueError("EWMA λ must be in (0, 1]")
+        if sigma <= 0:
+            raise ValueError("Sigma must be positive")
+        self.mean, self.sigma = float(mean), float(sigma)
+        self.lam, self.L, self.k, self.h = lam, L, k, h
+        self.n_seen = 0
+        self.ewma = self.mean
+        self.cusum_pos = 0.0
+        self.cusum_neg = 0.0
+        self.tail = np.empty(0)
+
+    @classmethod
+    def from_baseline(cls, x, **kwargs):
+        mean, sigma = estimate_limits(x)
+        return cls(mean, sigma, **kwargs)
+
+    def update(self, x):
+        """
+        Process the next chunk of samples (oldest first) and advance the state.
+
+        NaNs are carried through as NaN statistics and do not update the state.
+
+        Returns:
+            dict of arrays: ewma, ewma_ucl, ewma_lcl, cusum_pos, cusum_neg,
+            shewhart / ewma_alarm / cusum_alarm flags, Western Electric
+            rules (n, 4) and the combined out_of_control flag
+        """
+        from scipy.signal import lfilter
+
+        x = np.asarray(x, dtype=np.float64)
+        valid = np.isfinite(x)
+        xv = x[valid]
+        n = xv.size
+        lam, mu, sig = self.lam, self.mean, self.sigma
+
+        # EWMA: z_t = λ x_t + (1 − λ) z_{t−1}, run as a first-order IIR filter
+        ewma, _ = lfilter([lam], [1.0, lam - 1.0], xv, zi=[(1 - lam) * self.ewma])
+        t = self.n_seen + np.arange(1, n + 1)
+        half_width = self.L * sig * np.sqrt(lam / (2 - lam) * (1 - (1 - lam) ** (2 * t)))
+
+        # Tabular CUSUM: C_t = max(0, C_{t−1} + d_t), solved with a running minimum
+        def cusum(d, c0):
+            s = c0 + np.cumsum(d)
+            return s - np.minimum(np.minimum.accumulate(s), 0.0)
+
+        cpos = cusum((xv - mu) / sig - self.k, self.cusum_pos)
+        cneg = cusum((mu - xv) / sig - self.k, self.cusum_neg)
+
+        z = (xv - mu) / sig
+        rules = western_electric(z, self.tail)
+        shewhart = np.abs(z) > self.L
+        ewma_alarm = np.abs(ewma - mu) > half_width
+        cusum_alarm = (cpos > self.h) | (cneg > self.h)
+        out_of_control = shewhart | rules.any(axis=1) | ewma_alarm | cusum_alarm
+
+        if n:
+            self.ewma = float(ewma[-1])
+            self.cusum_pos, self.cusum_neg = float(cpos[-1]), float(cneg[-1])
+            self.tail = np.concatenate([self.tail, z])[-_TAIL:]
+            self.n_seen += n
+
+        def expand(values, fill):
+            full = np.full((len(x),) + values.shape[1:], fill, dtype=values.dtype)
+            full[valid] = values
+            return full
+
+        return {
+            "ewma": expand(ewma, np.nan),
+            "ewma_ucl": expand(mu + half_width, np.nan),
+            "ewma_lcl": expand(mu - half_width, np.nan),
+            "cusum_pos": expand(cpos, np.nan),
+            "cusum_neg": expand(cneg, np.nan),
+            "shewhart": expand(shewhart, False),
+            "ewma_alarm": expand(ewma_alarm, False),
+            "cusum_alarm": expand(cusum_alarm, False),
+            "rules": expand(rules, False),
+            "out_of_control": expand(out_of_control, False)
+        }
+
+
+class MultivariateSPC:
+    """
+    Hotelling T² and PCA squared prediction error (SPE / Q) against a Phase-I baseline.
+
+    The baseline is standardized and decomposed once (eigh of the correlation
+    matrix); T² uses the retained principal components, SPE the residual.
+    With every component retained T² is the classic full-covariance Hotelling
+    statistic. Each update is a couple of matrix products over the whole chunk.
+
+    With refit_every set the model also follows slow process drift: the
+    in-control rows of each chunk are merged into running mean / scatter
+    moments (Chan et al.), optionally exponentially down-weighted, and every
+    refit_every chunks the correlation matrix is re-decomposed and both limits
+    recomputed. The number of components stays as chosen on the baseline.
+
+    Args:
+        n_components (int): Components kept for T² (default: enough to reach var_explained)
+        var_explained (float): Cumulative variance fraction used when n_components is None
+        alpha (float): Confidence level of the control limits, e.g. 0.99
+        refit_every (int): Chunks between model refits (default None: fixed Phase-I model)
+        forgetting (float): Weight kept by the past moments at each merge, in (0, 1]; 1 = cumulative
+    """
+
+    def __init__(self, n_components=None, var_explained=0.9, alpha=0.99, refit_every=None, forgetting=1.0):
+        if refit_every is not None and refit_every < 1:
+            raise ValueError("refit_every must be a positive number of chunks")
+        if not 0 < forgetting <= 1:
+            raise ValueError("forgetting must be in (0, 1]")
+        self.n_components = n_components
+        self.var_explained = var_explained
+        self.alpha = alpha
+        self.refit_every = refit_every
+        self.forgetting = forgetting
+
+    def fit(self, X):
+        """
+        Fit the model and control limits on baseline rows (rows with NaN are skipped).
+
+        Returns:
+            self
+        """
+        X = np.asarray(X, dtype=np.float64)
+        X = X[np.isfinite(X).all(axis=1)]
+        n, p = X.shape
+        if n <= p + 1:
+            raise ValueError(f"Baseline needs more than {p + 1} complete rows for {p} variables")
+
+        self.mean_ = X.mean(axis=0)
+        std = X.std(axis=0, ddof=1)
+        std[std == 0] = 1.0
+        self.std_ = std
+        D = X - self.mean_
+        Z = D / self.std_
+
+        # Running moments for rolling updates (raw units)
+        self.n_ = float(n)
+        self.center_ = self.mean_.copy()
+        self.scatter_ = D.T @ D
+        self.n_refits_ = 0
+        self._pending = 0
+
+        self._decompose(Z.T @ Z / (n - 1), n, self.n_components)
+
+        # SPE limit: Box's g·χ²_h approximation matched to the baseline SPE moments
+        spe = self._spe(Z, Z @ self.loadings_)
+        self.spe_limit_ = self._box_limit(spe.mean(), spe.var())
+        return self
+
+    def _decompose(self, corr, n, a=None):
+        """
+        Principal components of the correlation matrix and the T² limit.
+
+        Returns:
+            np.ndarray: All eigenvalues, largest first
+        """
+        from scipy import stats
+
+        p = corr.shape[0]
+        eigvals, eigvecs = np.linalg.eigh(corr)
+        order = np.argsort(eigvals)[::-1]
+        eigvals, eigvecs = np.maximum(eigvals[order], 1e-12), eigvecs[:, order]
+        if a is None:
+            a = int(np.searchsorted(np.cumsum(eigvals) / eigvals.sum(), self.var_explained) + 1)
+        a = min(max(a, 1), p)
+        self.n_components_ = a
+        self.eigvals_ = eigvals[:a]
+        self.loadings_ = eigvecs[:, :a]
+
+        # Phase-II T² limit (new observations): F distribution
+        self.t2_limit_ = a * (n - 1) * (n + 1) / (n * (n - a)) * stats.f.ppf(self.alpha, a, n - a)
+        return eigvals
+
+    def _box_limit(self, m, v):
+        """Box's g·χ²_h approximation for a statistic with mean m and variance v."""
+        from scipy import stats
+
+        if m > 0 and v > 0:
+            return v / (2 * m) * stats.chi2.ppf(self.alpha, 2 * m ** 2 / v)
+        return np.inf
+
+    def _absorb(self, X):
+        """Chan-merge complete rows into the running moments, down-weighting the past."""
+        if not len(X):
+            return
+        n_b = len(X)
+        mean_b = X.mean(axis=0)
+        D = X - mean_b
+        n_a = self.n_ * self.forgetting
+        delta = mean_b - self.center_
+        total = n_a + n_b
+        self.center_ = self.center_ + delta * (n_b / total)
+        self.scatter_ = self.scatter_ * self.forgetting + D.T @ D + np.outer(delta, delta) * (n_a * n_b / total)
+        self.n_ = total
+
+    def _refit(self):
+        """
+        Re-decompose from the running moments and recompute both limits.
+
+        The SPE limit uses the residual eigenvalues (θ1 = Σλ, θ2 = Σλ²), i.e. the
+        Jackson-Mudholkar moments of SPE, since the rows themselves are not kept.
+        """
+        n, p = self.n_, len(self.center_)
+        if n <= p + 1:
+            return
+        std = np.sqrt(np.diag(self.scatter_) / (n - 1))
+        std[std == 0] = 1.0
+        corr = self.scatter_ / (n - 1) / np.outer(std, std)
+        eigvals = self._decompose(corr, n, self.n_components_)
+        self.mean_ = self.center_.copy()
+        self.std_ = std
+        residual = eigvals[self.n_components_:]
+        self.spe_limit_ = self._box_limit(residual.sum(), 2 * (residual ** 2).sum())
+        self.n_refits_ += 1
+
+    def _spe(self, Z, scores):
+        residual = Z - scores @ self.loadings_.T
+        return np.einsum("ij,ij->i", residual, residual)
+
+    def update(self, X, learn=True):
+        """
+        T² and SPE for a chunk of rows; rows with any NaN get NaN statistics.
+
+        The chunk is scored against the current model first and then, with
+        refit_every set, passed to learn(). Pass learn=False to call learn()
+        separately (e.g. after computing contributions against the same model).
+
+        Returns:
+            dict: t2, spe, t2_alarm, spe_alarm and out_of_control arrays, plus the
+            t2_limit and spe_limit the chunk was scored against
+        """
+        X = np.asarray(X, dtype=np.float64)
+        Z = (X - self.mean_) / self.std_
+        scores = Z @ self.loadings_
+        t2 = np.einsum("ij,j,ij->i", scores, 1.0 / self.eigvals_, scores)
+        spe = self._spe(Z, scores)
+        with np.errstate(invalid="ignore"):
+            t2_alarm = t2 > self.t2_limit_
+            spe_alarm = spe > self.spe_limit_
+        stats = {
+            "t2": t2,
+            "spe": spe,
+            "t2_alarm": t2_alarm,
+            "spe_alarm": spe_alarm,
+            "out_of_control": t2_alarm | spe_alarm,
+            "t2_limit": self.t2_limit_,
+            "spe_limit": self.spe_limit_
+        }
+        if learn:
+            self.learn(X, stats["out_of_control"])
+        return stats
+
+    def learn(self, X, out_of_control):
+        """
+        Rolling update: merge the complete, in-control rows of a scored chunk into
+        the running moments and refit every refit_every chunks (no-op without refit_every).
+        """
+        if not self.refit_every:
+            return
+        X = np.asarray(X, dtype=np.float64)
+        self._absorb(X[np.isfinite(X).all(axis=1) & ~out_of_control])
+        self._pending += 1
+        if self._pending >= self.refit_every:
+            self._refit()
+            self._pending = 0
+
+    def contributions(self, X):
+        """
+        Per-variable contributions for the given rows.
+
+        T² contribution of variable j: Σ_a (t_a / λ_a) · p_ja · z_j (sums to T²).
+        SPE contribution: the squared residual of variable j (sums to SPE).
+
+        Returns:
+            (t2_contrib, spe_contrib): two (n_rows, n_vars) arrays
+        """
+        Z = (np.asarray(X, dtype=np.float64) - self.mean_) / self.std_
+        scores = Z @ self.loadings_
+        t2_contrib = ((scores / self.eigvals_) @ self.loadings_.T) * Z
+        residual = Z - scores @ self.loadings_.T
+        return t2_contrib, residual ** 2
+
+
+def decimate_index(y, n_buckets=1000):
+    """
+    Indices of each bucket's min and max (in time order) for plotting.
+
+    Spikes survive decimation, so a chart of ~2·n_buckets points looks the same
+    as one of millions. Other series sampled at the same indices stay aligned.
+
+    Returns:
+        np.ndarray: At most 2 * n_buckets sorted indices into y
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= 2 * n_buckets:
+        return np.arange(len(y))
+    edges = np.linspace(0, len(y), n_buckets + 1).astype(np.intp)
+    starts = edges[:-1]
+    lo = np.minimum.reduceat(np.where(np.isnan(y), np.inf, y), starts)
+    hi = np.maximum.reduceat(np.where(np.isnan(y), -np.inf, y), starts)
+    # First index of each bucket's min and max; all-NaN buckets fall back to the bucket start
+    positions = np.arange(len(y))
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    i_lo = np.minimum.reduceat(np.where(y == lo[bucket], positions, len(y)), starts)
+    i_hi = np.minimum.reduceat(np.where(y == hi[bucket], positions, len(y)), starts)
+    i_lo = np.where(i_lo < len(y), i_lo, starts)
+    i_hi = np.where(i_hi < len(y), i_hi, starts)
+    return np.sort(np.stack([i_lo, i_hi], axis=1), axis=1).ravel()
+
+
+def decimate_minmax(x, y, n_buckets=1000):
+    """Min/max-decimated (x, y) pair; see decimate_index."""
+    idx = decimate_index(y, n_buckets)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
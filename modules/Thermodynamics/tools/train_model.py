@@ -1,7 +1,3 @@
-from sklearn.linear_model import LinearRegression, Ridge
-from sklearn.preprocessing import StandardScaler
-from sklearn.impute import SimpleImputer
-from sklearn.pipeline import Pipeline
 import pandas as pd
 
 def train_model(X, y, model_type='LinearRegression', alpha=1.0, scale=True):
@@ -18,6 +14,11 @@ def train_model(X, y, model_type='LinearRegression', alpha=1.0, scale=True):
     Returns:
         model: Fitted pipeline
     """
+    from sklearn.linear_model import LinearRegression, Ridge
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+
     # Ensure input is a clean DataFrame
     X = pd.DataFrame(X)
     y = pd.Series(y)
@@ -38,3 +39,36 @@ def train_model(X, y, model_type='LinearRegression', alpha=1.0, scale=True):
     model.fit(X, y)
 
     return model
+
+
+def train_or_reuse(X, y, name, model_type='LinearRegression', alpha=1.0, scale=True):
+    """
+    Return a registered pipeline for this exact data and configuration,
+    training and registering a new version only when none exists.
+
+    Parameters:
+        X (DataFrame): Input features
+        y (Series): Target variable
+        name (str): Model name in the registry
+        model_type, alpha, scale: As for train_model; part of the lookup key
+
+    Returns:
+        tuple: (fitted pipeline, registry metadata)
+    """
+    from sklearn.metrics import r2_score, mean_squared_error
+    import model_registry
+
+    X = pd.DataFrame(X)
+    y = pd.Series(y)
+    params = {'model_type': model_type, 'alpha': alpha if model_type == 'Ridge' else None, 'scale': scale}
+    data_hash = model_registry.compute_data_hash(X, y)
+
+    found = model_registry.find_model(name, data_hash, params)
+    if found is not None:
+        return found
+
+    model = train_model(X, y, model_type=model_type, alpha=alpha, scale=scale)
+    y_fit = model.predict(X)
+    metrics = {'train_r2': r2_score(y, y_fit), 'train_mse': mean_squared_error(y, y_fit)}
+    version = model_registry.register_model(name, model, list(X.columns), data_hash, metrics, params)
+    return model_registry.load_model(name, version)
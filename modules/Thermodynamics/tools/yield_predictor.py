@@ -3,14 +3,101 @@
 
 import streamlit as st
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.linear_model import LinearRegression
-from sklearn.impute import SimpleImputer
-from sklearn.metrics import mean_squared_error, r2_score
-import matplotlib.pyplot as plt
+import numpy as np
+import importlib
+
+import model_registry
+
+# ===== Model Search Candidates =====
+# (module, class, kwargs) of each regressor, imported only when it is built.
+# RandomForest stays single-threaded because the search already runs one job
+# per (candidate, fold)
+CANDIDATE_REGRESSORS = {
+    "LinearRegression": ("sklearn.linear_model", "LinearRegression", {}),
+    "Ridge": ("sklearn.linear_model", "Ridge", {"alpha": 1.0}),
+    "GradientBoosting": ("sklearn.ensemble", "GradientBoostingRegressor", {"random_state": 42}),
+    "RandomForest": ("sklearn.ensemble", "RandomForestRegressor",
+                     {"n_estimators": 200, "random_state": 42, "n_jobs": 1})
+}
+
+
+def make_regressor(name):
+    """Fresh, unfitted regressor for a CANDIDATE_REGRESSORS entry."""
+    module, cls, kwargs = CANDIDATE_REGRESSORS[name]
+    return getattr(importlib.import_module(module), cls)(**kwargs)
+
+
+def build_preprocessor(numeric_cols, categorical_cols):
+    """Impute + scale numeric columns, impute + one-hot encode categorical ones."""
+    from sklearn.pipeline import Pipeline
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder
+    from sklearn.impute import SimpleImputer
+
+    numeric_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='mean')),
+        ('scaler', StandardScaler())
+    ])
+
+    categorical_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='most_frequent')),
+        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+    ])
+
+    return ColumnTransformer(transformers=[
+        ('num', numeric_transformer, numeric_cols),
+        ('cat', categorical_transformer, categorical_cols)
+    ])
+
+
+def _score_fold(name, X_tr, y_tr, X_val, y_val):
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    model = make_regressor(name)
+    model.fit(X_tr, y_tr)
+    y_pred = model.predict(X_val)
+    return name, r2_score(y_val, y_pred), mean_squared_error(y_val, y_pred)
+
+
+@st.cache_data(show_spinner=False)
+def search_models(data_hash, numeric_cols, categorical_cols, n_splits=5, _X=None, _y=None, n_jobs=-1):
+    """
+    K-fold cross-validated comparison of every candidate regressor.
+
+    The preprocessor is fitted once per fold and its output shared by all
+    candidates; the (candidate, fold) fits then run in parallel. Results are
+    memoized on data_hash, so `_X` and `_y` are not hashed by Streamlit.
+
+    Args:
+        data_hash (str): model_registry.compute_data_hash of the features and target
+        numeric_cols, categorical_cols (list): Column split for the preprocessor
+        n_splits (int): Number of CV folds
+        _X (pd.DataFrame), _y (pd.Series): Training data
+        n_jobs (int): joblib workers (-1 = all cores)
+
+    Returns:
+        pd.DataFrame: One row per candidate, best (highest mean R²) first
+    """
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import KFold
+
+    y = np.asarray(_y, dtype=np.float64)
+    folds = []
+    for train_idx, val_idx in KFold(n_splits=n_splits, shuffle=True, random_state=42).split(_X):
+        preprocessor = build_preprocessor(numeric_cols, categorical_cols)
+        X_tr = preprocessor.fit_transform(_X.iloc[train_idx])
+        X_val = preprocessor.transform(_X.iloc[val_idx])
+        folds.append((X_tr, y[train_idx], X_val, y[val_idx]))
+
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_score_fold)(name, *fold) for name in CANDIDATE_REGRESSORS for fold in folds
+    )
+    results = pd.DataFrame(scores, columns=["Model", "R2", "MSE"])
+    summary = results.groupby("Model").agg(
+        mean_r2=("R2", "mean"), std_r2=("R2", "std"), mean_mse=("MSE", "mean")
+    )
+    return summary.sort_values("mean_r2", ascending=False).reset_index()
+
 
 def run():
     st.title("🔬 Process Yield Predictor")
@@ -20,6 +107,11 @@ def run():
 
     if uploaded_file:
         try:
+            from sklearn.model_selection import train_test_split
+            from sklearn.pipeline import Pipeline
+            from sklearn.metrics import mean_squared_error, r2_score
+            from matplotlib.figure import Figure
+
             data = pd.read_csv(uploaded_file)
 
             if data.empty:
@@ -48,33 +140,36 @@ def run():
             numeric_cols = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
             categorical_cols = X.select_dtypes(include=['object', 'category']).columns.tolist()
 
-            # Create transformers
-            numeric_transformer = Pipeline(steps=[
-                ('imputer', SimpleImputer(strategy='mean')),
-                ('scaler', StandardScaler())
-            ])
-
-            categorical_transformer = Pipeline(steps=[
-                ('imputer', SimpleImputer(strategy='most_frequent')),
-                ('onehot', OneHotEncoder(handle_unknown='ignore'))
-            ])
-
-            preprocessor = ColumnTransformer(transformers=[
-                ('num', numeric_transformer, numeric_cols),
-                ('cat', categorical_transformer, categorical_cols)
-            ])
+            # Train/Test Split
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+            train_hash = model_registry.compute_data_hash(X_train, y_train)
+
+            # Optional: cross-validated search over several regressors
+            regressor_name = "LinearRegression"
+            if st.checkbox("🔎 Model search mode (compare regressors with k-fold CV)"):
+                n_splits = st.slider("Number of CV folds", 3, 10, 5)
+                with st.spinner("Cross-validating candidate models in parallel..."):
+                    leaderboard = search_models(train_hash, numeric_cols, categorical_cols, n_splits,
+                                                _X=X_train, _y=y_train)
+                st.subheader("🏆 Model Leaderboard")
+                st.dataframe(leaderboard.style.format({"mean_r2": "{:.3f}", "std_r2": "{:.3f}",
+                                                       "mean_mse": "{:.3f}"}))
+                regressor_name = leaderboard.loc[0, "Model"]
+                st.success(f"✅ Best model: **{regressor_name}**")
 
             # Final pipeline
             model = Pipeline(steps=[
-                ('preprocessor', preprocessor),
-                ('regressor', LinearRegression())
+                ('preprocessor', build_preprocessor(numeric_cols, categorical_cols)),
+                ('regressor', make_regressor(regressor_name))
             ])
 
-            # Train/Test Split
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-            # Fit model
-            model.fit(X_train, y_train)
+            # Reuse a registered model trained on this exact split, otherwise fit and register it
+            found = model_registry.find_model("yield_predictor", train_hash, {"regressor": regressor_name})
+            if found is not None:
+                model, meta = found
+                st.caption(f"♻️ Reusing registered model v{meta['version']} (trained {meta['created']})")
+            else:
+                model.fit(X_train, y_train)
 
             # Predict
             y_pred = model.predict(X_test)
@@ -83,13 +178,21 @@ def run():
             mse = mean_squared_error(y_test, y_pred)
             r2 = r2_score(y_test, y_pred)
 
+            if found is None:
+                version = model_registry.register_model(
+                    "yield_predictor", model, features, train_hash,
+                    {"test_mse": mse, "test_r2": r2}, {"regressor": regressor_name}
+                )
+                st.caption(f"💾 Registered model v{version}")
+
             st.subheader("✅ Model Performance")
             st.write(f"**Mean Squared Error:** {mse:.2f}")
             st.write(f"**R² Score:** {r2:.2f}")
 
             # Plot Actual vs Predicted
             st.subheader("📈 Actual vs Predicted Yield")
-            fig, ax = plt.subplots()
+            fig = Figure()
+            ax = fig.subplots()
             ax.scatter(y_test, y_pred, alpha=0.6)
             ax.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'r--')
             ax.set_xlabel("Actual Yield")